@@ -0,0 +1,73 @@
+"""Docs/sec and allocations of the structured distortion stages.
+
+Usage: python benchmarks/bench_distortions.py [--docs N] [--locale CODE] [--repeat N]
+
+Builds ``--docs`` structured documents (every facility and doc type of the
+locale, OCR and digital sources mixed as in a real run), then times
+``apply_field_distortions`` followed by ``inject_garbage_typed`` over all of
+them. Also reports, from :mod:`tracemalloc`, the memory the distorted
+documents hold on to and the peak allocated during one pass.
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from medsynth import config
+from medsynth.distortions import apply_field_distortions, inject_garbage_typed
+from medsynth.locales import load_locale
+from medsynth.patients import iter_patients
+from medsynth.schemas import build_structured_fields
+
+
+def _sample(locale, n: int) -> list[tuple[dict, str, str]]:
+    rng = random.Random(0)
+    pairs = [(f["id"], t) for f in locale.facilities for t in f["doc_types"]]
+    docs = []
+    for patient in iter_patients(-(-n // len(pairs)), 0, locale):
+        for facility_id, doc_type in pairs:
+            doc = build_structured_fields(patient, facility_id, doc_type, config.DOC_DATE_END.toordinal(),
+                                          rng, locale)
+            docs.append((doc, facility_id, doc_type))
+    return docs[:n]
+
+
+def _distort(docs, locale) -> list[dict]:
+    rng = random.Random(1)
+    out = []
+    for doc, facility_id, doc_type in docs:
+        doc = apply_field_distortions(doc, facility_id, doc_type, rng, locale)
+        out.append(inject_garbage_typed(doc, rng, locale)[0])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=50_000)
+    parser.add_argument("--locale", default="he_IL")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    locale = load_locale(args.locale)
+    docs = _sample(locale, args.docs)
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        _distort(docs, locale)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    out = _distort(docs, locale)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del out
+
+    print(f"{len(docs)} {args.locale} docs: {len(docs) / best:,.0f} docs/sec, "
+          f"{(held - base) / len(docs):,.0f} B/doc held, {(peak - base) / 2**20:.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Cold-start cost of loading locales in a fresh interpreter.
+
+Usage: python benchmarks/bench_locale_load.py [--runs N]
+
+Each run starts a new Python process (as a spawned shard worker would),
+imports ``random`` (every generator process needs it), then times
+``import medsynth.locales`` and ``load_locale(CODE)`` in-process. Prints
+the medians per locale plus the median wall time of the whole process
+and of an interpreter that only imports ``random``.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from medsynth.locales import REGISTRY
+
+CHILD = """
+import json, random, time
+t0 = time.perf_counter()
+from medsynth.locales import load_locale
+t1 = time.perf_counter()
+load_locale({code!r})
+t2 = time.perf_counter()
+print(json.dumps([(t1 - t0) * 1e3, (t2 - t1) * 1e3]))
+"""
+
+
+def _wall(args: list[str]) -> tuple[float, str]:
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True).stdout
+    return (time.perf_counter() - start) * 1e3, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    _wall(["-c", CHILD.format(code="he_IL")])  # warm the .pyc files
+    print(f"{'locale':<8} {'import ms':>10} {'load ms':>8} {'process ms':>11}")
+    for code in REGISTRY:
+        imports, loads, walls = [], [], []
+        for _ in range(args.runs):
+            wall, out = _wall(["-c", CHILD.format(code=code)])
+            import_ms, load_ms = json.loads(out)
+            imports.append(import_ms)
+            loads.append(load_ms)
+            walls.append(wall)
+        print(f"{code:<8} {statistics.median(imports):>10.2f} {statistics.median(loads):>8.2f} "
+              f"{statistics.median(walls):>11.1f}")
+    bare = statistics.median(_wall(["-c", "import random"])[0] for _ in range(args.runs))
+    print(f"{'python':<8} {'':>10} {'':>8} {bare:>11.1f}  (import random only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compare the python and numpy OCR/typo noise backends per script.
+
+Usage: python benchmarks/bench_noise.py [--repeat N]
+
+Noises a batch of free-text-sized strings (conditions + medications of each
+locale, ~1k chars) for a Hebrew, an Arabic and a Latin locale and prints
+ms per text for both backends.
+"""
+
+import argparse
+import random
+import timeit
+
+from medsynth.distortions import apply_digital_typos, apply_ocr_noise
+from medsynth.locales import load_locale
+from medsynth.noise_numpy import digital_typos, ocr_noise
+
+LOCALES = [("Hebrew", "he_IL"), ("Arabic", "ar_SA"), ("Latin", "es_MX")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=32, help="Texts per numpy call")
+    args = parser.parse_args()
+
+    print(f"{'script':8} {'locale':6} {'chars':>6} {'kind':5} {'python':>10} {'numpy':>10} {'speedup':>8}")
+    for script, code in LOCALES:
+        locale = load_locale(code)
+        text = " ".join(locale.conditions + locale.medications) * 2
+        texts = [text] * args.batch
+        model = locale.ocr_model
+        cases = [
+            ("ocr",
+             lambda: [apply_ocr_noise(t, rng, model) for t in texts],
+             lambda: ocr_noise(texts, rng, model)),
+            ("typo",
+             lambda: [apply_digital_typos(t, rng) for t in texts],
+             lambda: digital_typos(texts, rng)),
+        ]
+        for kind, python_fn, numpy_fn in cases:
+            rng = random.Random(0)
+            t_py = min(timeit.repeat(python_fn, number=1, repeat=args.repeat)) / args.batch
+            t_np = min(timeit.repeat(numpy_fn, number=1, repeat=args.repeat)) / args.batch
+            print(f"{script:8} {code:6} {len(text):>6} {kind:5} "
+                  f"{t_py * 1e3:>8.3f}ms {t_np * 1e3:>8.3f}ms {t_py / t_np:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
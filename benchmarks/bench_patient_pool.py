@@ -0,0 +1,65 @@
+"""Memory per patient of the patient pool: list of dicts vs PatientPool.
+
+Usage: python benchmarks/bench_patient_pool.py [--patients N] [--locale CODE]
+
+Generates the same ``--patients`` pool twice, once as the list of dicts
+batch mode uses by default and once as a :class:`PatientPool`
+(``--compact-pool``), and reports the bytes each holds per patient (from
+:mod:`tracemalloc`, so generation runs several times slower than usual).
+Then times building the structured fields of one document per facility x
+doc type for every patient from dicts and from row views.
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from medsynth import config
+from medsynth.locales import load_locale
+from medsynth.patient_pool import PatientPool
+from medsynth.patients import generate_patients, iter_patients
+from medsynth.schemas import build_structured_fields
+
+
+def _held(build) -> tuple[object, float]:
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    pool = build()
+    held = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return pool, held
+
+
+def _build_docs(patients, locale) -> float:
+    pairs = [(f["id"], t) for f in locale.facilities for t in f["doc_types"]]
+    doc_date = config.DOC_DATE_END.toordinal()
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for patient in patients:
+        for facility_id, doc_type in pairs:
+            build_structured_fields(patient, facility_id, doc_type, doc_date, rng, locale)
+    return len(patients) * len(pairs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=50_000)
+    parser.add_argument("--locale", default="he_IL")
+    args = parser.parse_args()
+
+    locale = load_locale(args.locale)
+    n = args.patients
+    dicts, dict_bytes = _held(lambda: generate_patients(n, 0, locale))
+    pool, pool_bytes = _held(lambda: PatientPool(iter_patients(n, 0, locale)))
+    assert all(row == patient for row, patient in zip(pool, dicts))
+
+    print(f"{n} {args.locale} patients")
+    print(f"  dicts: {dict_bytes / n:>6,.0f} B/patient, {_build_docs(dicts, locale):>9,.0f} docs/sec")
+    print(f"  pool:  {pool_bytes / n:>6,.0f} B/patient, {_build_docs(list(pool), locale):>9,.0f} docs/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Import cost of the CLI entry points, from ``python -X importtime``.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--top K]
+
+For each entry module, runs ``python -X importtime -c "import MODULE"`` N
+times in fresh interpreters and prints the median cumulative import time
+plus the K slowest modules by self time (median over the runs).
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+ENTRY_MODULES = ("medsynth.generate", "medsynth.fill")
+
+
+def _importtime(module: str) -> dict[str, tuple[int, int]]:
+    """Module -> (self us, cumulative us) for one fresh ``import module``."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in ENTRY_MODULES:
+        _importtime(module)  # warm the .pyc files
+        runs = [_importtime(module) for _ in range(args.runs)]
+        total = statistics.median(run[module][1] for run in runs) / 1e3
+        own = {name: statistics.median(run.get(name, (0, 0))[0] for run in runs) / 1e3 for name in runs[0]}
+        print(f"{module}: {total:.1f} ms")
+        for name, ms in sorted(own.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {ms:>7.2f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Docs/sec of the NDJSON write phase for each serialization path.
+
+Usage: python benchmarks/bench_write.py [--docs N] [--locale CODE]
+
+Builds a sample of real documents (structured fields from the generator,
+free text replaced by ~1k chars of locale text to mimic LLM output), then
+writes ``--docs`` documents (default 1M, cycling the sample) to a temp file:
+
+- legacy:          per-doc ``json.dumps(doc, ensure_ascii=False)`` into a text file
+- default:         :class:`NdjsonWriter` (prebuilt encoder, batched bytes), same bytes
+- compact/stdlib:  ``json_style="compact"`` without orjson
+- compact/orjson:  ``json_style="compact"`` with orjson (if installed), same bytes
+"""
+
+import argparse
+import itertools
+import json
+import os
+import tempfile
+import time
+
+from medsynth import config, serialize
+from medsynth.generate import _patient_documents
+from medsynth.locales import load_locale
+from medsynth.patients import iter_patients
+from medsynth.seeding import RngPlan
+from medsynth.text_slots import text_field
+from medsynth.writers import NdjsonWriter
+
+SAMPLE_PATIENTS = 2000
+
+
+def _sample(locale_code: str) -> list[dict]:
+    locale = load_locale(locale_code)
+    text = " ".join(locale.conditions + locale.medications)[:1000]
+    plan = RngPlan(0)
+    docs = []
+    for p_idx, patient in enumerate(iter_patients(SAMPLE_PATIENTS, 0, locale)):
+        for _, doc, item in _patient_documents(patient, p_idx, plan, locale):
+            doc[text_field(locale, item["facility_id"])] = text
+            docs.append(doc)
+    return docs
+
+
+def _legacy(path, docs):
+    buffer = []
+    with open(path, "w", encoding="utf-8") as f:
+        for doc in docs:
+            buffer.append(json.dumps(doc, ensure_ascii=False) + "\n")
+            if len(buffer) >= config.STREAM_BUFFER_DOCS:
+                f.write("".join(buffer))
+                buffer.clear()
+        f.write("".join(buffer))
+
+
+def _writer(style, fast):
+    def run(path, docs):
+        orjson = serialize.orjson
+        if not fast:
+            serialize.orjson = None
+        try:
+            with NdjsonWriter(path, json_style=style) as writer:
+                writer.write_many(docs)
+        finally:
+            serialize.orjson = orjson
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--locale", default="he_IL")
+    args = parser.parse_args()
+
+    sample = _sample(args.locale)
+    cases = [("legacy", _legacy), ("default", _writer("default", False)),
+             ("compact/stdlib", _writer("compact", False))]
+    if serialize.orjson is not None:
+        cases.append(("compact/orjson", _writer("compact", True)))
+
+    print(f"{args.docs} docs ({len(sample)} distinct, locale={args.locale})")
+    print(f"{'path':16} {'docs/s':>10} {'MB/s':>8} {'size MB':>8} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = None
+        for name, run in cases:
+            path = os.path.join(tmp, name.replace("/", "-") + ".ndjson")
+            docs = itertools.islice(itertools.cycle(sample), args.docs)
+            start = time.perf_counter()
+            run(path, docs)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(path) / 1e6
+            base = base or elapsed
+            print(f"{name:16} {args.docs / elapsed:>10,.0f} {size / elapsed:>8.1f} {size:>8.1f} "
+                  f"{base / elapsed:>7.2f}x")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Checkpoints for resumable LLM-backed generation runs.
+
+Structured documents are cheap and fully determined by the run parameters,
+so a checkpoint only has to keep what is expensive or stateful: the final
+(noised) free text of every completed queue slot, and the state of the
+text-noise RNG after the last checkpointed slot (v1 draws all text noise
+from one shared RNG; v2 derives a fresh RNG per document and needs none).
+
+A resumed run rebuilds the structured documents, restores the completed
+texts and the RNG state, and continues with the remaining slots, so its
+final corpus equals that of an uninterrupted run.
+
+Layout inside ``<output_dir>/.medsynth-checkpoint/``:
+
+- ``texts.jsonl``: one JSON string per completed slot, in queue order.
+- ``checkpoint.json``: run parameters, number of committed slots, byte
+  length of the committed journal prefix and the RNG state.
+"""
+
+import json
+import os
+import random
+import shutil
+from .seeding import rng_state_from_json, rng_state_to_json
+
+CHECKPOINT_DIR = ".medsynth-checkpoint"
+_STATE = "checkpoint.json"
+_JOURNAL = "texts.jsonl"
+
+
+class Checkpoint:
+    """Journal of completed free-text slots, committed every ``every`` slots.
+
+    ``params`` identify the run (seed, locale, model, ...); resuming with
+    different parameters raises ValueError instead of mixing corpora.
+    """
+
+    def __init__(self, output_dir: str, params: dict, every: int):
+        if every < 1:
+            raise ValueError(f"checkpoint interval must be >= 1, got {every}")
+        self.path = os.path.join(output_dir, CHECKPOINT_DIR)
+        self.params = params
+        self.every = every
+        self.committed = 0
+        self._pending: list[str] = []
+        self._rng_state = None
+        self._journal = None
+
+    def start(self):
+        """Begin a fresh checkpoint, discarding any previous one."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path)
+        self._journal = open(os.path.join(self.path, _JOURNAL), "wb")
+        self._save(0, None)
+
+    def resume(self) -> tuple[list[str], tuple | None]:
+        """Load the committed texts and RNG state; keep journaling after them.
+
+        Raises FileNotFoundError without a checkpoint and ValueError if it was
+        written by a run with different parameters.
+        """
+        state_path = os.path.join(self.path, _STATE)
+        if not os.path.exists(state_path):
+            raise FileNotFoundError(f"No checkpoint to resume in {self.path}")
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state["params"] != self.params:
+            raise ValueError(
+                f"Checkpoint in {self.path} was written with different parameters: "
+                f"{state['params']} != {self.params}"
+            )
+        journal_path = os.path.join(self.path, _JOURNAL)
+        # Slots written after the last commit are not trusted; cut them off
+        with open(journal_path, "r+b") as f:
+            f.truncate(state["journal_bytes"])
+            f.seek(0)
+            texts = [json.loads(line) for line in f.read().decode("utf-8").splitlines()]
+        if len(texts) != state["slots"]:
+            raise ValueError(f"Checkpoint journal in {self.path} is corrupt")
+        self.committed = state["slots"]
+        self._journal = open(journal_path, "ab")
+        rng_state = state["rng_state"]
+        return texts, None if rng_state is None else rng_state_from_json(rng_state)
+
+    def record(self, text: str, rng: random.Random | None):
+        """Add the next slot's final text; commits every ``every`` slots.
+
+        ``rng`` is the shared text-noise RNG (None in v2); its state right
+        after this slot is what a resumed run continues from.
+        """
+        self._pending.append(json.dumps(text, ensure_ascii=False) + "\n")
+        self._rng_state = None if rng is None else rng_state_to_json(rng)
+        if len(self._pending) >= self.every:
+            self.commit()
+
+    def commit(self):
+        """Make all recorded slots durable (also safe to call when a run aborts)."""
+        if not self._pending:
+            return
+        self._journal.write("".join(self._pending).encode("utf-8"))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._save(self.committed + len(self._pending), self._rng_state)
+        self._pending.clear()
+
+    def _save(self, slots: int, rng_state: list | None):
+        state = {
+            "params": self.params,
+            "slots": slots,
+            "journal_bytes": self._journal.tell(),
+            "rng_state": rng_state,
+        }
+        tmp_path = os.path.join(self.path, _STATE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.path, _STATE))
+        self.committed = slots
+
+    def finish(self):
+        """Drop the checkpoint once the corpus is fully written."""
+        if self._journal is not None:
+            self._journal.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
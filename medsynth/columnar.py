@@ -0,0 +1,297 @@
+"""Parquet export of the generated indices (``--parquet``).
+
+Each finished index file ``<index>.ndjson`` (or its compressed chunks) is
+converted to ``<index>.parquet`` with a fixed Arrow schema derived from the
+index's Elasticsearch mapping (:func:`medsynth.schemas.get_es_mapping_for_index`),
+so a column has the same per-facility type the search engine would give it:
+``patient_id`` is int64, float64 or string, ``age`` int32 or a range string,
+``lab_results`` a list of structs. Files are written in row groups of
+``config.PARQUET_ROW_GROUP_ROWS`` rows, the unit DuckDB, Polars and Arrow
+datasets scan in parallel.
+
+Injected garbage does not always fit the column type (``wrong_type`` turns
+an age into ``"42"``, ``empty_field`` blanks a number). Values are coerced
+the way Elasticsearch coerces them at index time: numeric strings become
+numbers, scalars become strings, and values the mapping would reject
+(``""`` in a numeric field) become null.
+
+The ground truth (:mod:`medsynth.ground_truth`), when present, is exported
+to ``ground_truth/patients.parquet`` and ``ground_truth/linkage.parquet``.
+
+Requires pyarrow: ``pip install e2llm-medsynth[parquet]``.
+"""
+
+import glob
+import gzip
+import io
+import json
+import os
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain, islice
+from . import config
+from .ground_truth import GROUND_TRUTH_DIR, LINKAGE_FILE, PATIENTS_FILE
+from .locales.base import LocaleConfig
+from .schemas import get_es_mapping_for_index, index_name
+
+# Concepts whose values are lists of keywords (see schemas.build_structured_fields)
+_LIST_CONCEPTS = ("conditions", "medications", "icd10")
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "Parquet output requires pyarrow. Install it with: pip install e2llm-medsynth[parquet]"
+        ) from None
+    return pyarrow, pyarrow.parquet
+
+
+# -- Value coercion -------------------------------------------------------------
+
+def _to_str(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bool, int, float, list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _to_int(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            number = _to_float(value)
+            return int(number) if number is not None and number.is_integer() else None
+    return None
+
+
+def _to_float(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if value in ("true", "false", ""):
+        return value == "true"  # ES reads "" as false
+    return None
+
+
+def _to_str_list(value):
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [_to_str(v) for v in value]
+    return [_to_str(value)]
+
+
+_SCALAR_COERCE = {"long": _to_int, "integer": _to_int, "float": _to_float, "boolean": _to_bool}
+
+
+def _struct_coercer(fields: dict[str, Callable]):
+    def _coerce(value):
+        if not isinstance(value, list):
+            return None
+        rows = []
+        for item in value:
+            if isinstance(item, dict):
+                rows.append({name: coerce(item.get(name)) for name, coerce in fields.items()})
+        return rows
+    return _coerce
+
+
+# -- Schema ---------------------------------------------------------------------
+
+def _arrow_type(pa, es_type: str):
+    return {
+        "long": pa.int64(),
+        "integer": pa.int32(),
+        "float": pa.float64(),  # ES stores float32; keep the JSON value exactly
+        "boolean": pa.bool_(),
+    }.get(es_type, pa.string())
+
+
+def index_schema(facility_id: str, doc_type: str, locale: LocaleConfig):
+    """Return ``(arrow_schema, coercers)`` for one facility x doctype index.
+
+    ``coercers`` maps each column name to a ``value -> value`` function
+    fitting the document's value to the column type.
+    """
+    pa, _ = require_pyarrow()
+    fnames = locale.field_names[facility_id]
+    concepts = locale.field_concepts[facility_id]
+    props = get_es_mapping_for_index(facility_id, doc_type, locale)["mappings"]["properties"]
+    # Free text lands in a default field when the facility names none
+    props.setdefault(fnames.get("free_text", "clinical_notes"), {"type": "text"})
+
+    fields, coercers = [], {}
+    for name, mapping in props.items():
+        es_type = mapping["type"]
+        if es_type == "nested":
+            sub = mapping["properties"]
+            arrow = pa.list_(pa.struct([pa.field(k, _arrow_type(pa, m["type"])) for k, m in sub.items()]))
+            coercers[name] = _struct_coercer({k: _SCALAR_COERCE.get(m["type"], _to_str) for k, m in sub.items()})
+        elif concepts.get(name) in _LIST_CONCEPTS:
+            arrow = pa.list_(pa.string())
+            coercers[name] = _to_str_list
+        else:
+            arrow = _arrow_type(pa, es_type)
+            coercers[name] = _SCALAR_COERCE.get(es_type, _to_str)
+        fields.append(pa.field(name, arrow))
+    return pa.schema(fields), coercers
+
+
+def _row_schema(pa, row: dict):
+    """``(arrow_schema, coercers)`` inferred from the Python types of one ground-truth row."""
+    kinds = {
+        bool: (pa.bool_(), _to_bool),
+        int: (pa.int64(), _to_int),
+        float: (pa.float64(), _to_float),
+        list: (pa.list_(pa.string()), _to_str_list),
+    }
+    fields, coercers = [], {}
+    for name, value in row.items():
+        arrow, coercers[name] = kinds.get(type(value), (pa.string(), _to_str))
+        fields.append(pa.field(name, arrow))
+    return pa.schema(fields), coercers
+
+
+# -- Writing --------------------------------------------------------------------
+
+def write_parquet(
+    docs: Iterable[dict],
+    path: str,
+    schema,
+    coercers: dict,
+    row_group_rows: int | None = None,
+) -> int:
+    """Write ``docs`` to ``path`` in row groups of ``row_group_rows``; returns the row count.
+
+    Raises ValueError for a document field that has no column in ``schema``.
+    """
+    pa, pq = require_pyarrow()
+    if row_group_rows is None:
+        row_group_rows = config.PARQUET_ROW_GROUP_ROWS
+    if row_group_rows < 1:
+        raise ValueError(f"row_group_rows must be >= 1, got {row_group_rows}")
+    names = schema.names
+    rows = 0
+    docs = iter(docs)
+    tmp_path = path + ".tmp"
+    with pq.ParquetWriter(tmp_path, schema, compression=config.PARQUET_COMPRESSION) as writer:
+        while batch := list(islice(docs, row_group_rows)):
+            columns = {name: [] for name in names}
+            for doc in batch:
+                unknown = doc.keys() - columns.keys()
+                if unknown:
+                    raise ValueError(f"{path}: field(s) {sorted(unknown)} not in the index schema")
+                for name, coerce in coercers.items():
+                    columns[name].append(coerce(doc.get(name)))
+            writer.write_table(pa.table(columns, schema=schema), row_group_size=row_group_rows)
+            rows += len(batch)
+    os.replace(tmp_path, path)
+    return rows
+
+
+def _index_chunks(output_dir: str, idx_name: str) -> list[str]:
+    plain = os.path.join(output_dir, f"{idx_name}.ndjson")
+    if os.path.exists(plain):
+        return [plain]
+    pattern = os.path.join(glob.escape(output_dir), f"{glob.escape(idx_name)}.[0-9][0-9][0-9].ndjson.*")
+    return sorted(p for p in glob.glob(pattern) if p.endswith((".gz", ".zst")))
+
+
+def iter_index_docs(paths: list[str]) -> Iterator[dict]:
+    """Yield the documents of one index from its plain or compressed files, in order."""
+    for path in paths:
+        if path.endswith(".gz"):
+            f = gzip.open(path, "rb")
+        elif path.endswith(".zst"):
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError("Reading .zst output requires zstandard. "
+                                  "Install it with: pip install e2llm-medsynth[zstd]") from None
+            f = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(
+                open(path, "rb"), read_across_frames=True, closefd=True))
+        else:
+            f = open(path, "rb")
+        with f:
+            for line in f:
+                yield json.loads(line)
+
+
+def export_parquet(
+    output_dir: str,
+    locale: LocaleConfig,
+    row_group_rows: int | None = None,
+    verbose: bool = False,
+) -> dict[str, int]:
+    """Write ``<index>.parquet`` next to every index file in ``output_dir``.
+
+    Returns rows written per index. Indices without output are skipped.
+    """
+    require_pyarrow()
+    counts = {}
+    for facility in locale.facilities:
+        for doc_type in facility["doc_types"]:
+            idx_name = index_name(facility["id"], doc_type)
+            paths = _index_chunks(output_dir, idx_name)
+            if not paths:
+                continue
+            schema, coercers = index_schema(facility["id"], doc_type, locale)
+            path = os.path.join(output_dir, f"{idx_name}.parquet")
+            counts[idx_name] = write_parquet(iter_index_docs(paths), path, schema, coercers, row_group_rows)
+            if verbose:
+                print(f"  {idx_name}.parquet: {counts[idx_name]} rows")
+    if os.path.isdir(os.path.join(output_dir, GROUND_TRUTH_DIR)):
+        export_ground_truth_parquet(output_dir, row_group_rows, verbose)
+    return counts
+
+
+def export_ground_truth_parquet(
+    output_dir: str,
+    row_group_rows: int | None = None,
+    verbose: bool = False,
+) -> dict[str, int]:
+    """Convert ``ground_truth/patients.ndjson`` and ``linkage.ndjson`` to Parquet.
+
+    Column types of the patient table follow the first patient's values
+    (locales differ in their name fields). Returns rows written per file.
+    """
+    pa, _ = require_pyarrow()
+    counts = {}
+    for name in (PATIENTS_FILE, LINKAGE_FILE):
+        path = os.path.join(output_dir, GROUND_TRUTH_DIR, name)
+        rows = iter_index_docs([path])
+        first = next(rows, None)
+        if first is None:
+            continue
+        schema, coercers = _row_schema(pa, first)
+        if name == LINKAGE_FILE:
+            schema = pa.schema([(f.name, pa.int64() if f.name in ("doc", "p_idx") else pa.string())
+                                for f in schema])
+            coercers = {f.name: _to_int if f.name in ("doc", "p_idx") else _to_str for f in schema}
+        out_path = path.removesuffix(".ndjson") + ".parquet"
+        counts[name] = write_parquet(chain([first], rows), out_path, schema, coercers, row_group_rows)
+        if verbose:
+            print(f"  {GROUND_TRUTH_DIR}/{os.path.basename(out_path)}: {counts[name]} rows")
+    return counts
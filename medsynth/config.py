@@ -47,6 +47,8 @@ OCR_SPACE_INSERT_RATE = 0.008        # probability of inserting a space in OCR t
 DIGITAL_TYPO_RATE = 0.005            # per-character in digital text
 ICD10_DIGIT_SWAP_RATE = 0.05         # probability of swapping digits in an ICD code
 AGE_CONTRADICTION_OFFSETS = [-10, -5, 5, 10, 15]  # fake age deltas for contradictions
+NOISE_BACKENDS = ("python", "numpy")  # numpy: vectorized, own determinism contract
+DEFAULT_NOISE_BACKEND = "python"
 
 # ---------------------------------------------------------------------------
 # LLM — default: Ollama + Llama 4 Maverick (local, no API key needed)
@@ -55,6 +57,12 @@ DEFAULT_API_BASE = "http://localhost:11434/v1"   # Ollama
 DEFAULT_MODEL = "llama4:maverick"
 LLM_TEMPERATURE = 0.8
 LLM_MAX_TOKENS = 800
+LLM_CONCURRENCY = 1                  # parallel LLM requests (1 = sequential)
+LLM_CHARS_PER_TOKEN = 4              # rough prompt-size estimate for the token limiter
+LLM_CACHE_MAX_BYTES = 1 << 30        # on-disk LLM cache cap (1 GiB); LRU entries evicted beyond it
+TEXT_POOL_MAX_ENTRIES = 100_000      # pooled texts kept in memory per run (LRU)
+LLM_BATCH_COMPLETION_WINDOW = "24h"  # OpenAI Batch API completion window
+LLM_BATCH_POLL_SECONDS = 60          # batch status polling interval
 
 # --- Alternative providers (uncomment one block) -------------------------
 #
@@ -70,6 +78,34 @@ LLM_MAX_TOKENS = 800
 # DEFAULT_API_BASE = "https://api.moonshot.ai/v1"
 # DEFAULT_MODEL = "kimi-k2-0711-preview"
 
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+STREAM_BUFFER_DOCS = 1000            # docs buffered per index before a streaming flush
+JSON_STYLES = ("default", "compact") # default: json.dumps bytes; compact: no spaces (orjson if installed)
+DEFAULT_JSON_STYLE = "default"
+CHECKPOINT_EVERY = 100               # free texts between checkpoints of an LLM run (0 = off)
+CHUNKS_PER_WORKER = 4                # patient chunks per worker process (load balancing)
+BULK_CHUNK_BYTES = 10 << 20          # target size of one _bulk-ready output file
+COMPRESSIONS = ("gzip", "zstd")      # --compress formats (zstd needs the zstandard package)
+OUTPUT_CHUNK_BYTES = 256 << 20       # uncompressed bytes per rotated compressed output file
+COMPRESS_THREADS = 4                 # background threads compressing output blocks
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+PARQUET_ROW_GROUP_ROWS = 122_880     # rows per Parquet row group (the unit of a parallel scan)
+PARQUET_COMPRESSION = "zstd"         # Parquet column codec
+
+# ---------------------------------------------------------------------------
+# Elasticsearch sink
+# ---------------------------------------------------------------------------
+ES_BULK_BYTES = 5 << 20              # max _bulk request body size
+ES_BULK_DOCS = 1000                  # max docs per _bulk request
+ES_CONNECTIONS = 4                   # parallel _bulk requests (one keep-alive connection each)
+ES_MAX_RETRIES = 8                   # retries of a rejected (429/503) or failed request
+ES_RETRY_BACKOFF = 0.5               # first retry delay in seconds, doubled per retry
+ES_RETRY_BACKOFF_MAX = 30.0          # cap on a single retry delay
+ES_TIMEOUT = 60.0                    # socket timeout per request
+
 # ---------------------------------------------------------------------------
 # Generation defaults
 # ---------------------------------------------------------------------------
@@ -77,3 +113,5 @@ DEFAULT_NUM_PATIENTS = 500
 DEFAULT_SEED = 42
 DEFAULT_OUTPUT_DIR = "output"
 DEFAULT_LOCALE = "he_IL"
+DETERMINISM_MODES = ("v1", "v2")     # v1: shared RNG streams; v2: per-patient/per-doc RNGs
+DEFAULT_DETERMINISM = "v1"
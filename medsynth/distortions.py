@@ -1,22 +1,28 @@
 """Distortion pipeline: OCR artifacts, garbage injection, contradictions."""
 
 import random
-import copy
 from . import config
-from .locales.base import LocaleConfig, OcrPattern
+from .locales.base import LocaleConfig, OcrModel, OcrPattern, compile_ocr_model
 
 
 def apply_ocr_noise(
     text: str,
     rng: random.Random,
-    ocr_patterns: list[OcrPattern],
+    ocr_patterns: list[OcrPattern] | OcrModel,
     error_rate: float = None,
     space_drop_rate: float = None,
     space_insert_rate: float = None,
+    backend: str = "python",
 ) -> str:
     """Apply OCR character confusion and artifacts to text.
 
     Supports single-char and multi-char patterns via longest-match-first scan.
+    ``ocr_patterns`` may be a pattern list or a precompiled :class:`OcrModel`
+    (e.g. ``locale.ocr_model``); both give the same output for the same RNG
+    state, the model just skips the per-call table build.
+
+    ``backend="numpy"`` delegates to :func:`medsynth.noise_numpy.ocr_noise`,
+    which has its own determinism contract.
     """
     if error_rate is None:
         error_rate = config.OCR_CHAR_ERROR_RATE
@@ -24,62 +30,74 @@ def apply_ocr_noise(
         space_drop_rate = config.OCR_SPACE_DROP_RATE
     if space_insert_rate is None:
         space_insert_rate = config.OCR_SPACE_INSERT_RATE
-    if not ocr_patterns and space_drop_rate == 0 and space_insert_rate == 0:
+    model = ocr_patterns if isinstance(ocr_patterns, OcrModel) else compile_ocr_model(ocr_patterns)
+    if backend == "numpy":
+        from .noise_numpy import ocr_noise
+        return ocr_noise([text], rng, model, error_rate, space_drop_rate, space_insert_rate)[0]
+    if not model.trie and space_drop_rate == 0 and space_insert_rate == 0:
         return text
 
-    # Index patterns by source string for O(1) lookup
-    pattern_index: dict[str, list[OcrPattern]] = {}
-    max_len = 1
-    for p in ocr_patterns:
-        pattern_index.setdefault(p.source, []).append(p)
-        if len(p.source) > max_len:
-            max_len = len(p.source)
-
-    chars = text
+    trie = model.trie
+    max_len = model.max_len
+    draw = rng.random
+    n = len(text)
     result = []
+    append = result.append
     i = 0
-    while i < len(chars):
-        c = chars[i]
+    while i < n:
+        c = text[i]
 
         # Space noise
-        if c == " " and rng.random() < space_drop_rate:
-            i += 1
-            continue
-
-        if c != " " and rng.random() < space_insert_rate:
-            result.append(" ")
+        if c == " ":
+            if draw() < space_drop_rate:
+                i += 1
+                continue
+        elif draw() < space_insert_rate:
+            append(" ")
 
         # Try OCR confusion (longest match first)
-        if rng.random() < error_rate:
-            matched = False
-            for window in range(min(max_len, len(chars) - i), 0, -1):
-                substring = chars[i:i + window]
-                candidates = pattern_index.get(substring)
-                if candidates:
+        if draw() < error_rate:
+            node = trie.get(c)
+            if node is not None:
+                ends = []
+                if "" in node:
+                    ends.append((1, node[""]))
+                j = i + 1
+                limit = min(i + max_len, n)
+                while j < limit:
+                    node = node.get(text[j])
+                    if node is None:
+                        break
+                    j += 1
+                    if "" in node:
+                        ends.append((j - i, node[""]))
+
+                matched = False
+                for window, (targets, cumulative, total) in reversed(ends):
                     # Weighted random selection
-                    total_weight = sum(p.weight for p in candidates)
-                    pick = rng.random() * total_weight
-                    cumulative = 0.0
-                    for p in candidates:
-                        cumulative += p.weight
-                        if pick <= cumulative:
-                            result.append(p.target)
+                    pick = draw() * total
+                    for target, upper in zip(targets, cumulative):
+                        if pick <= upper:
+                            append(target)
                             i += window
                             matched = True
                             break
                     if matched:
                         break
-            if matched:
-                continue
+                if matched:
+                    continue
 
-        result.append(c)
+        append(c)
         i += 1
 
     return "".join(result)
 
 
-def apply_digital_typos(text: str, rng: random.Random) -> str:
+def apply_digital_typos(text: str, rng: random.Random, backend: str = "python") -> str:
     """Apply minor typos to digitally-sourced text (doctor shorthand)."""
+    if backend == "numpy":
+        from .noise_numpy import digital_typos
+        return digital_typos([text], rng)[0]
     chars = list(text)
     result = []
     for c in chars:
@@ -99,67 +117,57 @@ def apply_ocr_to_field(value: str, rng: random.Random, locale: LocaleConfig) ->
     """
     if not isinstance(value, str):
         return value
-    # Build char→replacement map (first pattern wins for each source char)
-    if not hasattr(apply_ocr_to_field, "_char_maps"):
-        apply_ocr_to_field._char_maps = {}
-    cache_key = locale.code
-    if cache_key not in apply_ocr_to_field._char_maps:
-        char_map = {}
-        for p in locale.ocr_patterns:
-            # Exclude digit→letter patterns (those only apply in full OCR noise)
-            if len(p.source) == 1 and not p.source.isdigit() and p.source not in char_map:
-                char_map[p.source] = p.target
-        apply_ocr_to_field._char_maps[cache_key] = char_map
-    char_map = apply_ocr_to_field._char_maps[cache_key]
-
+    char_map = locale.ocr_model.field_map
     error_rate = config.OCR_FIELD_ERROR_RATE
-    chars = list(value)
-    result = []
-    for c in chars:
-        if rng.random() < error_rate:
-            c = char_map.get(c, c)
-        result.append(c)
-    return "".join(result)
+    draw = rng.random
+    return "".join(char_map.get(c, c) if draw() < error_rate else c for c in value)
+
 
+_NO_FIELDS: frozenset[str] = frozenset()
 
-def _concept_field_names(locale: LocaleConfig, concept: str) -> set[str]:
-    """Get all field names for a concept across all facilities."""
-    names = set()
-    for fnames in locale.field_names.values():
-        field = fnames.get(concept)
-        if field is not None:
-            names.add(field)
-    return names
+GARBAGE_TYPES = ("zero_age", "empty_field", "generic_location", "wrong_type", "empty_text")
 
 
 def inject_garbage(doc: dict, rng: random.Random, locale: LocaleConfig) -> dict:
     """Inject garbage values into a document (~6% of records)."""
-    if rng.random() > config.GARBAGE_RATE:
-        return doc
+    return inject_garbage_typed(doc, rng, locale)[0]
+
 
-    doc = copy.deepcopy(doc)
-    garbage_type = rng.choice(["zero_age", "empty_field", "generic_location",
-                                "wrong_type", "empty_text"])
+def inject_garbage_typed(doc: dict, rng: random.Random, locale: LocaleConfig) -> tuple[dict, str | None]:
+    """Like :func:`inject_garbage`, also returning the garbage type applied.
 
-    age_fields = _concept_field_names(locale, "age")
-    address_fields = _concept_field_names(locale, "address")
-    text_fields = _concept_field_names(locale, "free_text")
+    The type is None when the document was left unchanged, including when
+    the drawn type found no field to corrupt. Draws the same random numbers
+    as :func:`inject_garbage`.
+    """
+    if rng.random() > config.GARBAGE_RATE:
+        return doc, None
 
+    doc = dict(doc)  # only top-level values are replaced
+    garbage_type = rng.choice(GARBAGE_TYPES)
+    changed = False
+
+    concept_fields = locale.concept_fields
     if garbage_type == "zero_age":
+        age_fields = concept_fields.get("age", _NO_FIELDS)
         for key in doc:
             if key in age_fields or "age" in key.lower():
                 doc[key] = 0
+                changed = True
                 break
 
     elif garbage_type == "empty_field":
         candidates = [k for k in doc if k not in ("doc_type",) and doc[k]]
         if candidates:
             doc[rng.choice(candidates)] = ""
+            changed = True
 
     elif garbage_type == "generic_location":
+        address_fields = concept_fields.get("address", _NO_FIELDS)
         for key in doc:
             if key in address_fields or "address" in key.lower():
                 doc[key] = locale.generic_location
+                changed = True
                 break
 
     elif garbage_type == "wrong_type":
@@ -167,18 +175,22 @@ def inject_garbage(doc: dict, rng: random.Random, locale: LocaleConfig) -> dict:
         for key in doc:
             if isinstance(doc[key], int) and key not in ("doc_type",):
                 doc[key] = str(doc[key])
+                changed = True
                 break
             elif isinstance(doc[key], str) and doc[key].isdigit():
                 doc[key] = int(doc[key])
+                changed = True
                 break
 
     elif garbage_type == "empty_text":
+        text_fields = concept_fields.get("free_text", _NO_FIELDS)
         for key in doc:
             if key in text_fields or "text" in key.lower() or "notes" in key.lower():
                 doc[key] = ""
+                changed = True
                 break
 
-    return doc
+    return doc, garbage_type if changed else None
 
 
 def pick_contradiction(patient: dict, doc: dict, rng: random.Random, locale: LocaleConfig) -> dict | None:
@@ -195,11 +207,12 @@ def pick_contradiction(patient: dict, doc: dict, rng: random.Random, locale: Loc
         return {
             "type": "smoking",
             "structured_value": structured_smoking,
+            "text_value": not structured_smoking,
             "text_should_say": text,
         }
     elif contradiction_type == "age":
         # Use the doc's computed age (per document date) instead of static patient age
-        age_fields = _concept_field_names(locale, "age")
+        age_fields = locale.concept_fields.get("age", _NO_FIELDS)
         real_age = None
         for k in doc:
             if k in age_fields:
@@ -215,17 +228,19 @@ def pick_contradiction(patient: dict, doc: dict, rng: random.Random, locale: Loc
         return {
             "type": "age",
             "structured_value": real_age,
+            "text_value": fake_age,
             "text_should_say": templates["age"].format(age=fake_age),
         }
     elif contradiction_type == "medication":
-        all_meds = set(locale.medications)
-        patient_meds = set(patient.get("medications", []))
-        extra_meds = list(all_meds - patient_meds)
+        # Keep locale order (not set order) so the pick is independent of PYTHONHASHSEED
+        patient_meds = patient.get("medications", [])
+        extra_meds = [m for m in locale.medications if m not in patient_meds]
         if extra_meds:
             med = rng.choice(extra_meds)
             return {
                 "type": "medication",
                 "structured_value": list(patient_meds),
+                "text_value": med,
                 "text_should_say": templates["medication"].format(med=med),
             }
 
@@ -238,13 +253,24 @@ def apply_field_distortions(
     doc_type: str,
     rng: random.Random,
     locale: LocaleConfig,
+    noise_backend: str = "python",
 ) -> dict:
-    """Apply field-level distortions based on source type (OCR vs digital)."""
+    """Apply field-level distortions based on source type (OCR vs digital).
+
+    With ``noise_backend="numpy"`` all OCR-eligible strings of the doc are
+    noised in one vectorized batch (see :mod:`medsynth.noise_numpy`).
+
+    Returns a shallow copy: distorted fields get new values, and lists are
+    copied before they change, so ``doc`` and the lists it shares with the
+    patient are never modified.
+    """
     facility = locale.facility_by_id[facility_id]
     source = facility["source"].get(doc_type, "digital")
-    doc = copy.deepcopy(doc)
+    doc = dict(doc)
 
-    if source == "ocr":
+    if source == "ocr" and noise_backend == "numpy":
+        _apply_ocr_to_fields_numpy(doc, rng, locale)
+    elif source == "ocr":
         for key, value in doc.items():
             if key in ("doc_type", "lab_results"):
                 continue
@@ -259,16 +285,43 @@ def apply_field_distortions(
     # ICD10 digit swap (occasional, both sources)
     for key, value in doc.items():
         if isinstance(value, list):
-            new_list = []
-            for v in value:
+            swapped = None
+            for j, v in enumerate(value):
                 if isinstance(v, str) and len(v) >= 3 and v[0].isalpha() and rng.random() < config.ICD10_DIGIT_SWAP_RATE:
                     chars = list(v)
                     digit_positions = [i for i, c in enumerate(chars) if c.isdigit()]
                     if len(digit_positions) >= 2:
                         a, b = rng.sample(digit_positions, 2)
                         chars[a], chars[b] = chars[b], chars[a]
-                    v = "".join(chars)
-                new_list.append(v)
-            doc[key] = new_list
+                        if swapped is None:
+                            swapped = list(value)
+                        swapped[j] = "".join(chars)
+            if swapped is not None:
+                doc[key] = swapped
 
     return doc
+
+
+def _apply_ocr_to_fields_numpy(doc: dict, rng: random.Random, locale: LocaleConfig):
+    """Batch counterpart of the per-field OCR loop in :func:`apply_field_distortions`."""
+    from .noise_numpy import ocr_fields
+
+    slots = []  # (key, list index or None)
+    values = []
+    for key, value in doc.items():
+        if key in ("doc_type", "lab_results"):
+            continue
+        if isinstance(value, str) and len(value) > 2:
+            slots.append((key, None))
+            values.append(value)
+        elif isinstance(value, list):
+            doc[key] = list(value)
+            for j, v in enumerate(value):
+                if isinstance(v, str):
+                    slots.append((key, j))
+                    values.append(v)
+    for (key, j), noised in zip(slots, ocr_fields(values, rng, locale.ocr_model)):
+        if j is None:
+            doc[key] = noised
+        else:
+            doc[key][j] = noised
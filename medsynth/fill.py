@@ -0,0 +1,258 @@
+"""Phase 2 of the two-phase pipeline: fill free text from a manifest.
+
+``medsynth --freetext-manifest`` (phase 1) leaves empty free-text fields
+and a manifest of slots (see :mod:`medsynth.manifest`). This module runs
+the LLM over those slots, applies the same text noise a one-shot run would,
+and writes *patch* files; :func:`apply_patches` then patches the texts into
+the NDJSON files. The result is byte-identical to a one-shot run.
+
+With v2 determinism the slots can be split into parts (``--part K/N``) and
+filled on separate machines or processes; copy the patch files back next
+to the NDJSON files and run ``medsynth-fill DIR --apply``. v1 draws all text
+noise from one RNG stream, so it is filled as a single part. Re-running
+phase 2 with another model simply overwrites the texts.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from itertools import islice
+from . import config
+from .columnar import export_parquet, require_pyarrow
+from .freetext import is_local_endpoint, iter_clinical_texts, resolve_api_base, resolve_api_key
+from .llm_cache import LlmCache
+from .es_sink import EsBulkError, EsSink
+from .locales import load_locale
+from .manifest import iter_manifest, read_manifest_header
+from .schemas import all_index_configs
+from .seeding import RngPlan, rng_state_from_json
+from .shards import parse_shard, shard_range
+from .text_pool import DEFAULT_POOL_FIELDS, POOL_FIELDS, TextPool
+from .text_slots import noised_text, rate_limiter, text_field, text_rng
+from .writers import BulkFileSink, NdjsonWriter
+
+
+def patch_name(part: tuple[int, int]) -> str:
+    k, n = part
+    return f"medsynth-patches-{k:05d}-of-{n:05d}.jsonl"
+
+
+def fill_freetext(
+    output_dir: str,
+    part: tuple[int, int] | None = None,
+    model: str | None = None,
+    api_base: str | None = None,
+    api_key: str | None = None,
+    concurrency: int = config.LLM_CONCURRENCY,
+    requests_per_minute: int | None = None,
+    tokens_per_minute: int | None = None,
+    llm_cache: LlmCache | None = None,
+    text_pool: TextPool | None = None,
+    verbose: bool = False,
+) -> str:
+    """Generate the free texts of one part of the manifest into a patch file.
+
+    ``part=(K, N)`` (1-based, default all slots) takes the K-th of N
+    contiguous slot ranges; N > 1 requires a v2 manifest. Returns the patch
+    file path.
+    """
+    header = read_manifest_header(output_dir)
+    params = header["params"]
+    locale = load_locale(params["locale"])
+    plan = RngPlan(params["seed"], params["determinism"], params["noise_backend"])
+    part = part or (1, 1)
+    if part[1] > 1 and not plan.v2:
+        raise ValueError("Splitting phase 2 into parts requires a determinism='v2' manifest")
+    if not plan.v2:
+        plan.shared.setstate(rng_state_from_json(header["rng_state"]))
+
+    start, stop = shard_range(header["slots"], part)
+    if verbose:
+        print(f"Filling free-text slots {start}-{stop - 1} of {header['slots']} "
+              f"(part {part[0]}/{part[1]}, locale={locale.code})...")
+    llm = {
+        "model": model,
+        "api_base": api_base,
+        "api_key": api_key,
+        "concurrency": concurrency,
+        "rate_limiter": rate_limiter(requests_per_minute, tokens_per_minute),
+        "cache": llm_cache,
+        "pool": text_pool,
+    }
+    path = os.path.join(output_dir, patch_name(part))
+    rows = islice(iter_manifest(output_dir), start, stop)
+    with NdjsonWriter(path + ".tmp") as out:
+        for i, (item, text) in enumerate(iter_clinical_texts(rows, locale, **llm), start):
+            text = noised_text(text, item, text_rng(plan, item), locale, verbose, i, plan.noise_backend)
+            out.write({
+                "slot": i,
+                "index": item["index"],
+                "doc": item["doc"],
+                "field": text_field(locale, item["facility_id"]),
+                "text": text,
+            })
+            if verbose and (i - start + 1) % 100 == 0:
+                print(f"  Generated text for {i - start + 1}/{stop - start} slots")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def _patch_files(output_dir: str) -> list[str]:
+    paths = sorted(glob.glob(os.path.join(output_dir, "medsynth-patches-*-of-*.jsonl")))
+    if not paths:
+        raise FileNotFoundError(f"No patch files in {output_dir}/")
+    num_parts = {os.path.basename(p).rsplit("-of-", 1)[1] for p in paths}
+    expected = int(num_parts.pop().removesuffix(".jsonl")) if len(num_parts) == 1 else None
+    if expected is None or len(paths) != expected:
+        raise ValueError(f"Incomplete or mixed patch files in {output_dir}/: "
+                         f"{', '.join(os.path.basename(p) for p in paths)}")
+    return paths
+
+
+def apply_patches(output_dir: str, verbose: bool = False, sink: EsSink | BulkFileSink | None = None) -> dict[str, int]:
+    """Patch the texts of all parts into the NDJSON files; returns doc counts.
+
+    Streams every index file once and passes the final documents to ``sink``
+    (see :func:`medsynth.generate.generate_documents`). Patch files are removed afterwards.
+    """
+    header = read_manifest_header(output_dir)
+    paths = _patch_files(output_dir)
+    if sink is not None:
+        sink.create_indices(all_index_configs(load_locale(header["params"]["locale"])))
+    readers, writers = {}, {}
+    slot = 0
+    try:
+        for path in paths:
+            with open(path, encoding="utf-8") as patches:
+                for line in patches:
+                    patch = json.loads(line)
+                    if patch["slot"] != slot:
+                        raise ValueError(f"{path}: expected slot {slot}, found {patch['slot']}")
+                    idx_name = patch["index"]
+                    if idx_name not in readers:
+                        ndjson = os.path.join(output_dir, f"{idx_name}.ndjson")
+                        readers[idx_name] = open(ndjson, encoding="utf-8")
+                        writers[idx_name] = NdjsonWriter(ndjson + ".tmp", sink=sink, index=idx_name,
+                                                         json_style=header["params"].get("json_style"))
+                    writer = writers[idx_name]
+                    if writer.count != patch["doc"]:
+                        raise ValueError(f"{idx_name}: patch for doc {patch['doc']} out of order")
+                    doc = json.loads(readers[idx_name].readline())
+                    doc[patch["field"]] = patch["text"]
+                    writer.write(doc)
+                    slot += 1
+        if slot != header["slots"]:
+            raise ValueError(f"Patches cover {slot} slots, manifest has {header['slots']}")
+        for idx_name, reader in readers.items():
+            if reader.readline():
+                raise ValueError(f"{idx_name}.ndjson has documents without a free-text slot")
+    except BaseException:
+        for idx_name, writer in writers.items():
+            writer.close()
+            os.remove(writer.path)
+        raise
+    finally:
+        for reader in readers.values():
+            reader.close()
+
+    counts = {}
+    for idx_name, writer in writers.items():
+        writer.close()
+        os.replace(writer.path, os.path.join(output_dir, f"{idx_name}.ndjson"))
+        counts[idx_name] = writer.count
+        if verbose:
+            print(f"  {idx_name}: {writer.count} documents")
+    for path in paths:
+        os.remove(path)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Phase 2: fill free text into a corpus written with medsynth --freetext-manifest"
+    )
+    parser.add_argument("output_dir", help="Directory holding the phase-1 NDJSON files and manifest")
+    parser.add_argument("--part", type=parse_shard, default=None, metavar="K/N",
+                        help="Fill only part K of N of the slots and write its patch file "
+                             "(v2 manifests); apply later with --apply")
+    parser.add_argument("--apply", action="store_true",
+                        help="Only patch the texts of all part files into the NDJSON files")
+    parser.add_argument("--model", default=config.DEFAULT_MODEL)
+    parser.add_argument("--api-base", default=None)
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--concurrency", type=int, default=config.LLM_CONCURRENCY)
+    parser.add_argument("--rpm", type=int, default=None)
+    parser.add_argument("--tpm", type=int, default=None)
+    parser.add_argument("--llm-cache", default=None, metavar="PATH")
+    parser.add_argument("--llm-cache-readonly", action="store_true",
+                        help="Read from --llm-cache but never write to it")
+    parser.add_argument("--text-pool", type=int, default=None, metavar="K",
+                        help="Reuse up to K LLM texts per prompt class, as medsynth --text-pool")
+    parser.add_argument("--text-pool-fields", default=",".join(DEFAULT_POOL_FIELDS),
+                        help=f"Comma-separated fields replaced by placeholders in pooled prompts; "
+                             f"choose from {','.join(POOL_FIELDS)} (default: name,age)")
+    sinks = parser.add_mutually_exclusive_group()
+    sinks.add_argument("--es-url", default=None, metavar="URL",
+                       help="Index the final documents into this Elasticsearch cluster when applying")
+    sinks.add_argument("--bulk-files", default=None, metavar="DIR",
+                       help="Write mappings and _bulk-ready chunks of the final documents to DIR")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Also export every index as <index>.parquet when applying (needs pyarrow)")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    args = parser.parse_args()
+
+    if not args.apply:
+        # Same .env and API key handling as a one-shot medsynth run
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        if not is_local_endpoint(resolve_api_base(args.api_base)) and not resolve_api_key(args.api_key):
+            print("Error: API key not set for remote provider. Use --api-key or set LLM_API_KEY env var.",
+                  file=sys.stderr)
+            sys.exit(1)
+
+    try:
+        if args.parquet:
+            require_pyarrow()
+        if not args.apply:
+            text_pool = None
+            if args.text_pool:
+                fields = tuple(f.strip() for f in args.text_pool_fields.split(",") if f.strip())
+                seed = read_manifest_header(args.output_dir)["params"]["seed"]
+                text_pool = TextPool(args.text_pool, seed=seed, fields=fields)
+            llm_cache = LlmCache(args.llm_cache, readonly=args.llm_cache_readonly) if args.llm_cache else None
+            try:
+                path = fill_freetext(
+                    args.output_dir, args.part, args.model, args.api_base, args.api_key,
+                    args.concurrency, args.rpm, args.tpm, llm_cache, text_pool, verbose=args.verbose,
+                )
+            finally:
+                if llm_cache is not None:
+                    llm_cache.close()
+            print(f"Wrote {path}")
+            if args.part is not None:
+                return
+        sink = None
+        if args.es_url:
+            sink = EsSink(args.es_url)
+        elif args.bulk_files:
+            sink = BulkFileSink(args.bulk_files)
+        counts = apply_patches(args.output_dir, args.verbose, sink)
+        if sink is not None:
+            sink.close()
+        if args.parquet:
+            header = read_manifest_header(args.output_dir)
+            export_parquet(args.output_dir, load_locale(header["params"]["locale"]), verbose=args.verbose)
+    except (FileNotFoundError, ValueError, EsBulkError, ImportError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"\nDone. {sum(counts.values())} documents across {len(counts)} indices.")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,32 +5,66 @@ Any OpenAI-compatible endpoint works — set --api-base and --model.
 """
 
 import os
+import threading
 import time
-from openai import OpenAI, APIConnectionError, APITimeoutError, RateLimitError
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
 from . import config
+from .llm_cache import LlmCache, cache_key
 from .locales.base import LocaleConfig
+from .text_pool import TextPool
 
-_RETRYABLE = (APIConnectionError, APITimeoutError, RateLimitError)
+# openai (and its httpx/pydantic stack) is imported on first use, so
+# structured-only runs never pay for it
+_RETRYABLE: tuple[type[Exception], ...] | None = None
 _MAX_RETRIES = 3
 
 _client = None
 _client_key = None
 
 
-def _get_client(api_base: str | None = None, api_key: str | None = None) -> OpenAI:
-    global _client, _client_key
-    base = api_base or os.environ.get("LLM_API_BASE", config.DEFAULT_API_BASE)
-    key = (
+def _retryable() -> tuple[type[Exception], ...]:
+    """Transient API errors worth retrying."""
+    global _RETRYABLE
+    if _RETRYABLE is None:
+        from openai import APIConnectionError, APITimeoutError, RateLimitError
+        _RETRYABLE = (APIConnectionError, APITimeoutError, RateLimitError)
+    return _RETRYABLE
+
+
+def resolve_api_base(api_base: str | None = None) -> str:
+    """API base URL: ``api_base`` > ``LLM_API_BASE`` env var > config default."""
+    return api_base or os.environ.get("LLM_API_BASE", config.DEFAULT_API_BASE)
+
+
+def resolve_api_key(api_key: str | None = None) -> str | None:
+    """API key: ``api_key`` > ``LLM_API_KEY`` / ``OPENAI_API_KEY`` / ``MOONSHOT_API_KEY``."""
+    return (
         api_key
         or os.environ.get("LLM_API_KEY")
         or os.environ.get("OPENAI_API_KEY")
         or os.environ.get("MOONSHOT_API_KEY")
-        or "ollama"  # Ollama ignores the key but the client requires one
     )
-    cache_key = (base, key)
-    if _client is None or _client_key != cache_key:
+
+
+def is_local_endpoint(url: str) -> bool:
+    """Check if a URL points to a local endpoint."""
+    hostname = urlparse(url).hostname or ""
+    return hostname in ("localhost", "127.0.0.1", "::1", "0.0.0.0") or hostname.endswith(".local")
+
+
+def _get_client(api_base: str | None = None, api_key: str | None = None):
+    """Return the shared ``openai.OpenAI`` client for this endpoint and key."""
+    global _client, _client_key
+    base = resolve_api_base(api_base)
+    key = resolve_api_key(api_key) or "ollama"  # Ollama ignores the key but the client requires one
+    client_key = (base, key)
+    if _client is None or _client_key != client_key:
+        from openai import OpenAI
         _client = OpenAI(base_url=base, api_key=key)
-        _client_key = cache_key
+        _client_key = client_key
     return _client
 
 
@@ -41,6 +75,70 @@ def reset_client():
     _client_key = None
 
 
+class RateLimiter:
+    """Thread-safe token-bucket limiter for requests and tokens per minute.
+
+    Either limit may be None (unlimited). Each bucket starts full, so a burst
+    of up to one minute's budget goes out immediately.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self._limits = [requests_per_minute, tokens_per_minute]
+        self._levels = [float(v or 0) for v in self._limits]
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0):
+        """Block until one request costing ``tokens`` fits in both buckets."""
+        wanted = [1.0, float(tokens)]
+        while True:
+            with self._lock:
+                now = self._clock()
+                elapsed = now - self._last
+                self._last = now
+                wait = 0.0
+                for i, limit in enumerate(self._limits):
+                    if not limit:
+                        continue
+                    self._levels[i] = min(limit, self._levels[i] + elapsed * limit / 60.0)
+                    need = min(wanted[i], limit)  # never wait for more than a full bucket
+                    if self._levels[i] < need:
+                        wait = max(wait, (need - self._levels[i]) * 60.0 / limit)
+                if wait == 0.0:
+                    for i, limit in enumerate(self._limits):
+                        if limit:
+                            self._levels[i] -= min(wanted[i], limit)
+                    return
+            self._sleep(wait)
+
+
+def _estimate_tokens(*texts: str) -> int:
+    """Rough request cost for rate limiting: prompt chars plus the completion cap."""
+    chars = sum(len(t) for t in texts)
+    return chars // config.LLM_CHARS_PER_TOKEN + config.LLM_MAX_TOKENS
+
+
+def chat_params(model: str, locale: LocaleConfig, prompt: str) -> dict:
+    """Chat completion parameters for one clinical prompt (also used for batch files)."""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": locale.system_prompt},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": config.LLM_TEMPERATURE,
+        "max_tokens": config.LLM_MAX_TOKENS,
+    }
+
+
 def generate_clinical_text(
     patient: dict,
     facility_id: str,
@@ -50,13 +148,19 @@ def generate_clinical_text(
     model: str | None = None,
     api_base: str | None = None,
     api_key: str | None = None,
+    rate_limiter: RateLimiter | None = None,
+    cache: LlmCache | None = None,
+    variant: int = 0,
 ) -> str:
     """Generate clinical narrative via any OpenAI-compatible API.
 
-    Retries transient errors up to 3 times.
+    Retries transient errors up to 3 times. If ``rate_limiter`` is given,
+    every attempt (including retries) waits for its budget first. With a
+    ``cache``, a stored text for the same model and prompts is returned
+    without calling the API, and fresh texts are stored; ``variant`` keeps
+    several cached texts for one prompt apart.
     """
     model = model or os.environ.get("LLM_MODEL", config.DEFAULT_MODEL)
-    client = _get_client(api_base, api_key)
 
     prompt = locale.format_clinical_prompt(
         patient=patient,
@@ -65,43 +169,150 @@ def generate_clinical_text(
         contradiction=contradiction,
     )
 
+    key = None
+    if cache is not None:
+        key = cache_key(
+            model, locale.system_prompt, prompt, config.LLM_TEMPERATURE, config.LLM_MAX_TOKENS, variant,
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    client = _get_client(api_base, api_key)
     for attempt in range(_MAX_RETRIES):
+        if rate_limiter is not None:
+            rate_limiter.acquire(_estimate_tokens(locale.system_prompt, prompt))
         try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": locale.system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=config.LLM_TEMPERATURE,
-                max_tokens=config.LLM_MAX_TOKENS,
-            )
-            return response.choices[0].message.content.strip()
-        except _RETRYABLE:
+            response = client.chat.completions.create(**chat_params(model, locale, prompt))
+            text = response.choices[0].message.content.strip()
+            if cache is not None:
+                cache.put(key, text)
+            return text
+        except _retryable():
             if attempt == _MAX_RETRIES - 1:
                 raise
             time.sleep(2 ** attempt)
 
 
+def iter_clinical_texts(
+    items: Iterable[dict],
+    locale: LocaleConfig,
+    model: str | None = None,
+    api_base: str | None = None,
+    api_key: str | None = None,
+    concurrency: int = 1,
+    rate_limiter: RateLimiter | None = None,
+    cache: LlmCache | None = None,
+    pool: TextPool | None = None,
+) -> Iterator[tuple[dict, str | Exception]]:
+    """Yield ``(item, text)`` for every item, in item order.
+
+    With ``concurrency > 1`` requests run on a bounded thread pool; at most
+    ``2 * concurrency`` items are in flight, so ``items`` may be a lazy
+    stream. Failures are yielded as the exception instead of raising, so the
+    caller decides how to fill the slot and the remaining items still run.
+
+    With a ``pool`` only one LLM text per (prompt class, variant) is
+    requested; items sharing it get that text with their own placeholders
+    filled in. Up to ``config.TEXT_POOL_MAX_ENTRIES`` texts are kept.
+    """
+
+    def _one(item: dict, variant: int = 0) -> tuple[dict, str | Exception]:
+        try:
+            return item, generate_clinical_text(
+                patient=item["patient"],
+                facility_id=item["facility_id"],
+                doc_type=item["doc_type"],
+                locale=locale,
+                contradiction=item.get("contradiction"),
+                model=model,
+                api_base=api_base,
+                api_key=api_key,
+                rate_limiter=rate_limiter,
+                cache=cache,
+                variant=variant,
+            )
+        except Exception as e:
+            return item, e
+
+    if concurrency <= 1 and pool is None:
+        for item in items:
+            yield _one(item)
+        return
+
+    _get_client(api_base, api_key)  # build the shared client before threads race for it
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        if pool is not None:
+            submit = _pooled_submit(pool, locale, executor, _one)
+        else:
+            def submit(item: dict) -> Future:
+                return executor.submit(_one, item)
+        pending = deque()
+        for item in items:
+            pending.append(submit(item))
+            if len(pending) >= 2 * max(1, concurrency):
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _pooled_submit(pool: TextPool, locale: LocaleConfig, executor: ThreadPoolExecutor, one):
+    """Return a ``submit(item)`` that shares one LLM request per pool slot."""
+    texts: OrderedDict[tuple[str, int], Future] = OrderedDict()
+
+    def _fill(item: dict, shared: Future) -> Future:
+        filled = Future()
+
+        def _done(f: Future):
+            # A failure here must resolve ``filled`` too, or the consumer waits forever
+            try:
+                _, text = f.result()
+                filled.set_result((item, text if isinstance(text, Exception) else pool.fill(text, item)))
+            except Exception as e:
+                filled.set_result((item, e))
+
+        shared.add_done_callback(_done)
+        return filled
+
+    def submit(item: dict) -> Future:
+        template = pool.template(item, locale)
+        prompt_class = pool.prompt_class(template, locale)
+        slot = (prompt_class, pool.variant(item, prompt_class))
+        shared = texts.get(slot)
+        if shared is None:
+            pool.requests += 1
+            shared = executor.submit(one, template, slot[1])
+            texts[slot] = shared
+            if len(texts) > config.TEXT_POOL_MAX_ENTRIES:
+                texts.popitem(last=False)
+        else:
+            pool.reused += 1
+            texts.move_to_end(slot)
+        return _fill(item, shared)
+
+    return submit
+
+
 def generate_clinical_text_batch(
     items: list[dict],
     locale: LocaleConfig,
     model: str | None = None,
     api_base: str | None = None,
     api_key: str | None = None,
+    concurrency: int = 1,
+    rate_limiter: RateLimiter | None = None,
+    cache: LlmCache | None = None,
+    pool: TextPool | None = None,
 ) -> list[str]:
-    """Generate multiple clinical texts sequentially."""
+    """Generate multiple clinical texts, optionally on a bounded thread pool.
+
+    Results keep item order; the first failure is raised.
+    """
     results = []
-    for item in items:
-        text = generate_clinical_text(
-            patient=item["patient"],
-            facility_id=item["facility_id"],
-            doc_type=item["doc_type"],
-            locale=locale,
-            contradiction=item.get("contradiction"),
-            model=model,
-            api_base=api_base,
-            api_key=api_key,
-        )
+    for _, text in iter_clinical_texts(
+        items, locale, model, api_base, api_key, concurrency, rate_limiter, cache, pool,
+    ):
+        if isinstance(text, Exception):
+            raise text
         results.append(text)
     return results
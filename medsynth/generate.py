@@ -5,35 +5,101 @@ import argparse
 import json
 import os
 import random
+import shutil
 import sys
-from datetime import timedelta
-from urllib.parse import urlparse
+import tempfile
+from collections.abc import Iterator
+from contextlib import nullcontext
 
 from . import config
 from .locales import load_locale
-from .patients import generate_patients
-from .schemas import build_structured_fields, index_name
+from .patient_pool import PatientPool
+from .patients import generate_patients, iter_patients
+from .schemas import all_index_configs, build_structured_fields, index_name
 from .distortions import (
     apply_field_distortions,
-    apply_ocr_noise,
-    apply_digital_typos,
-    inject_garbage,
+    inject_garbage_typed,
     pick_contradiction,
 )
-from .freetext import generate_clinical_text
+from .checkpoint import Checkpoint
+from .columnar import export_parquet, require_pyarrow
+from .es_sink import EsBulkError, EsSink
+from .llm_batch import (
+    REQUESTS_FILE,
+    RESULTS_FILE,
+    BatchSubmitError,
+    iter_batch_texts,
+    prepare_batch,
+    read_batch_results,
+    submit_batch,
+)
+from .llm_cache import LlmCache
+from .freetext import is_local_endpoint, iter_clinical_texts, resolve_api_base, resolve_api_key
+from .ground_truth import GroundTruthWriter
+from .manifest import MANIFEST_FILE, manifest_row, write_manifest_header
+from .seeding import RngPlan, rng_state_to_json
+from .text_pool import DEFAULT_POOL_FIELDS, POOL_FIELDS, TextPool
+from .text_slots import noised_text, rate_limiter, text_field, text_rng
+from .shards import parse_shard, shard_range, split_range, write_shard_manifest
+from .writers import BulkFileSink, IndexWriters, NdjsonWriter, remove_index_files
+
+
+def _random_doc_date(rng: random.Random) -> int:
+    """Generate a random document date within the configured range, as a day ordinal."""
+    start = config.DOC_DATE_START.toordinal()
+    return start + rng.randint(0, config.DOC_DATE_END.toordinal() - start)
 
 
-def _random_doc_date(rng: random.Random) -> str:
-    """Generate a random document date within the configured range."""
-    delta = (config.DOC_DATE_END - config.DOC_DATE_START).days
-    d = config.DOC_DATE_START + timedelta(days=rng.randint(0, delta))
-    return d.isoformat()
+def _patient_documents(
+    patient: dict,
+    p_idx: int,
+    plan: RngPlan,
+    locale,
+    truth: GroundTruthWriter | None = None,
+) -> Iterator[tuple[str, dict, dict]]:
+    """Yield ``(index_name, doc, freetext_item)`` for every document of one patient.
+
+    Draws from ``plan`` in the same order for batch and streaming generation,
+    so both modes produce identical corpora for a given seed. ``truth``
+    records the patient and each document's linkage row as they are built.
+    """
+    if truth is not None:
+        truth.patient(p_idx, patient)
+    rng = plan.assignment(p_idx)
+    num_facilities = rng.randint(
+        config.MIN_FACILITIES_PER_PATIENT,
+        config.MAX_FACILITIES_PER_PATIENT,
+    )
+    facilities = rng.sample(locale.facilities, min(num_facilities, len(locale.facilities)))
+
+    for facility in facilities:
+        num_docs = rng.randint(config.MIN_DOCS_PER_VISIT, config.MAX_DOCS_PER_VISIT)
+        doc_types = rng.sample(facility["doc_types"], min(num_docs, len(facility["doc_types"])))
+
+        for doc_type in doc_types:
+            rng = plan.document(p_idx, facility["id"], doc_type)
+            doc_date = _random_doc_date(rng)
+            idx_name = index_name(facility["id"], doc_type)
+
+            doc = build_structured_fields(
+                patient, facility["id"], doc_type, doc_date, rng, locale
+            )
 
+            contradiction = pick_contradiction(patient, doc, rng, locale)
+            doc = apply_field_distortions(doc, facility["id"], doc_type, rng, locale, plan.noise_backend)
+            doc, garbage = inject_garbage_typed(doc, rng, locale)
 
-def _is_local_endpoint(url: str) -> bool:
-    """Check if a URL points to a local endpoint."""
-    hostname = urlparse(url).hostname or ""
-    return hostname in ("localhost", "127.0.0.1", "::1", "0.0.0.0") or hostname.endswith(".local")
+            item = {
+                "p_idx": p_idx,
+                "facility_id": facility["id"],
+                "doc_type": doc_type,
+                "contradiction": contradiction,
+                "source": facility["source"].get(doc_type, "digital"),
+                "garbage": garbage,
+            }
+            if truth is not None:
+                truth.link(idx_name, item)
+            yield idx_name, doc, item
 
 
 def generate_documents(
@@ -47,56 +113,248 @@ def generate_documents(
     skip_freetext: bool = False,
     verbose: bool = False,
     force: bool = False,
+    stream: bool = False,
+    buffer_docs: int | None = None,
+    concurrency: int = config.LLM_CONCURRENCY,
+    requests_per_minute: int | None = None,
+    tokens_per_minute: int | None = None,
+    determinism: str = config.DEFAULT_DETERMINISM,
+    workers: int = 1,
+    shard: tuple[int, int] | None = None,
+    noise_backend: str = config.DEFAULT_NOISE_BACKEND,
+    llm_cache: LlmCache | None = None,
+    text_pool: TextPool | None = None,
+    llm_batch: str | None = None,
+    llm_batch_submit: bool = False,
+    resume: bool = False,
+    checkpoint_every: int = config.CHECKPOINT_EVERY,
+    freetext_manifest: bool = False,
+    sink: EsSink | BulkFileSink | None = None,
+    compress: str | None = None,
+    chunk_bytes: int | None = None,
+    json_style: str | None = None,
+    ground_truth: bool = False,
+    compact_pool: bool = False,
     # Backwards compat — ignored if model is set
     openai_model: str | None = None,
 ) -> dict[str, int]:
-    """Generate all documents and write NDJSON files."""
+    """Generate all documents and write NDJSON files.
+
+    With ``stream=True`` patients are generated one at a time and every
+    finished document goes straight to a per-index writer that holds at most
+    ``buffer_docs`` documents in memory. The output is byte-identical to the
+    default batch mode for the same seed.
+
+    ``concurrency`` runs that many LLM requests in parallel, throttled by
+    the optional per-minute request and token limits. Text noise is still
+    applied in document order, so the output does not depend on it.
+
+    ``determinism="v2"`` gives every patient and document its own RNG derived
+    from ``(seed, patient_index, facility_id, doc_type)`` (see
+    :mod:`medsynth.seeding`), so any subset of patients can be generated
+    independently and bit-identically. It yields a different corpus than the
+    default ``"v1"`` for the same seed.
+
+    ``workers > 1`` (v2 only) splits the patient range across a process pool;
+    each worker streams its chunk to per-index shard files, which are merged
+    in patient order into output identical to a single-process v2 run. Any
+    request/token limits are divided evenly between workers.
+
+    ``shard=(K, N)`` (v2 only, 1-based) generates just the K-th of N
+    contiguous patient slices of the same logical corpus and writes a shard
+    manifest next to the NDJSON files (see :mod:`medsynth.shards`).
+
+    ``noise_backend="numpy"`` draws OCR/typo noise as arrays (optional numpy
+    dependency); it is faster on long OCR texts but has its own determinism
+    contract, so the corpus differs from the default ``"python"`` backend.
+
+    ``llm_cache`` is a persistent cache of LLM texts (see
+    :mod:`medsynth.llm_cache`); texts for prompts already in it are reused
+    instead of calling the API. The caller owns and closes it.
+
+    ``text_pool`` requests at most a few LLM texts per prompt class (prompts
+    equal up to patient name and age) and fills placeholders locally (see
+    :mod:`medsynth.text_pool`). Its counters report requests vs. reuse.
+
+    ``llm_batch`` is a directory for offline free text via batch JSONL
+    files (see :mod:`medsynth.llm_batch`). The run writes the requests file
+    there; if the matching results file exists its texts are used, otherwise
+    with ``llm_batch_submit`` the file goes to the provider's Batch API and
+    the run waits for it. Without results the run stops after writing the
+    requests file and returns ``{}``; re-run once the results are in place.
+
+    LLM-backed runs in the default (non-streaming, single-process) mode
+    commit a checkpoint every ``checkpoint_every`` free texts (0 disables;
+    see :mod:`medsynth.checkpoint`). ``resume=True`` continues from the
+    checkpoint left by an interrupted run with the same parameters and
+    produces the same corpus as an uninterrupted run.
+
+    ``freetext_manifest=True`` is phase 1 of the two-phase pipeline: it
+    streams the structured documents with empty free-text fields plus a
+    compact free-text manifest and makes no LLM calls. Phase 2
+    (:mod:`medsynth.fill`, ``medsynth-fill``) fills the texts in later,
+    possibly on other machines, giving the same corpus as a one-shot run.
+
+    ``sink`` receives every document as it is written: an
+    :class:`medsynth.es_sink.EsSink` indexes it into Elasticsearch, a
+    :class:`medsynth.writers.BulkFileSink` writes ``_bulk``-ready files.
+    Indices (or mapping files) are created from the schema mappings first.
+    With ``stream`` or ``shard`` the sink keeps pace with generation. The
+    caller closes the sink.
+
+    ``compress`` ("gzip" or "zstd") writes each index as compressed chunks
+    ``<index>.000.ndjson.gz`` rotated every ``chunk_bytes`` uncompressed
+    bytes, compressing on background threads; the decompressed chunks
+    concatenate to the uncompressed files. ``json_style="compact"`` drops
+    the spaces after JSON separators (see :mod:`medsynth.serialize`).
+
+    ``ground_truth=True`` also writes the patient pool and a document ->
+    patient linkage table (contradiction, garbage and source per document)
+    to ``<output_dir>/ground_truth/`` (see :mod:`medsynth.ground_truth`).
+    With ``shard`` the doc positions are those in the shard's own files.
+
+    ``compact_pool=True`` holds the patient pool of the default batch mode
+    as a :class:`medsynth.patient_pool.PatientPool` (columnar arrays, row
+    views) instead of a list of dicts, for a fraction of the memory on very
+    large pools; the corpus is the same. The streaming modes (``stream``,
+    ``workers``, ``shard``, ``freetext_manifest``) never hold the pool and
+    reject it.
+    """
     model = model or openai_model
     locale = load_locale(locale_code or config.DEFAULT_LOCALE)
-    rng = random.Random(seed + 1)  # offset from patient seed to avoid RNG correlation
+    plan = RngPlan(seed, determinism, noise_backend)
     os.makedirs(output_dir, exist_ok=True)
 
     if not force and os.path.isdir(output_dir):
-        existing = [f for f in os.listdir(output_dir) if f.endswith(".ndjson")]
+        existing = sorted(f for f in os.listdir(output_dir)
+                          if f.endswith((".ndjson", ".ndjson.gz", ".ndjson.zst", ".parquet")))
         if existing:
+            more = f" and {len(existing) - 3} more" if len(existing) > 3 else ""
             raise FileExistsError(
-                f"{output_dir}/ contains {len(existing)} .ndjson files. "
+                f"{output_dir}/ already has output files ({', '.join(existing[:3])}{more}). "
                 f"Use --force to overwrite."
             )
 
+    llm = {
+        "model": model,
+        "api_base": api_base,
+        "api_key": api_key,
+        "concurrency": concurrency,
+        "rate_limiter": rate_limiter(requests_per_minute, tokens_per_minute),
+        "cache": None if skip_freetext else llm_cache,
+        "pool": None if skip_freetext else text_pool,
+    }
+
+    if compact_pool and (stream or workers > 1 or shard is not None or freetext_manifest):
+        raise ValueError("compact_pool only applies to the default batch mode; "
+                         "stream, workers, shard and freetext_manifest never hold the patient pool")
+
+    if llm_batch is not None and not skip_freetext:
+        if stream or workers > 1 or shard is not None:
+            raise ValueError("llm_batch cannot be combined with stream, workers or shard")
+        if text_pool is not None or llm_cache is not None:
+            raise ValueError("llm_batch cannot be combined with text_pool or llm_cache")
+
+    if freetext_manifest:
+        if (skip_freetext or llm_batch is not None or resume or workers > 1 or shard is not None
+                or sink is not None or compress is not None):
+            raise ValueError(
+                "freetext_manifest cannot be combined with skip_freetext, llm_batch, resume, workers, "
+                "shard, compress or an output sink (pass the sink to medsynth-fill instead)"
+            )
+        return _generate_manifest(num_patients, seed, output_dir, plan, locale, verbose, buffer_docs,
+                                  json_style, ground_truth)
+
+    checkpoint = None
+    if not skip_freetext and llm_batch is None and (resume or checkpoint_every):
+        if stream or workers > 1 or shard is not None:
+            if resume:
+                raise ValueError("resume cannot be combined with stream, workers or shard")
+        else:
+            checkpoint = Checkpoint(output_dir, {
+                "locale": locale.code,
+                "seed": seed,
+                "num_patients": num_patients,
+                "determinism": determinism,
+                "noise_backend": noise_backend,
+                "model": model,
+                "text_pool": None if text_pool is None else [text_pool.variants, list(text_pool.fields)],
+            }, checkpoint_every or config.CHECKPOINT_EVERY)
+
+    if workers > 1 or shard is not None:
+        if not plan.v2:
+            raise ValueError("workers > 1 and shard require determinism='v2'")
+    if compress is not None:
+        if compress not in config.COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compress!r}; choose from {', '.join(config.COMPRESSIONS)}")
+        if shard is not None:
+            raise ValueError("compress cannot be combined with shard (shard manifests hash plain files)")
+
+    # Output options shared by every final writer (see IndexWriters)
+    out = {"sink": sink, "compress": compress, "chunk_bytes": chunk_bytes, "json_style": json_style}
+
+    if sink is not None:
+        if shard is not None:
+            # Doc positions restart in every shard; keep _ids unique across shards
+            sink.id_prefix = f"{shard[0]}of{shard[1]}-"
+        if verbose:
+            print("Creating indices from the schema mappings")
+        sink.create_indices(all_index_configs(locale))
+
+    if workers > 1 or shard is not None:
+        start, stop = (0, num_patients) if shard is None else shard_range(num_patients, shard)
+        if workers > 1:
+            counts = _generate_parallel(
+                start, stop, seed, output_dir, locale, llm,
+                requests_per_minute, tokens_per_minute,
+                skip_freetext, verbose, buffer_docs, workers, noise_backend, out, ground_truth,
+            )
+        else:
+            if verbose:
+                print(f"Streaming patients {start}-{stop - 1} of {num_patients} "
+                      f"(shard {shard[0]}/{shard[1]}, seed={seed}, locale={locale.code})...")
+            counts = _stream_patient_range(
+                start, stop, seed, output_dir, plan, locale,
+                llm, skip_freetext, verbose, buffer_docs, out, ground_truth,
+            )
+        if shard is not None:
+            path = write_shard_manifest(output_dir, shard, (start, stop), counts, {
+                "locale": locale.code,
+                "seed": seed,
+                "num_patients": num_patients,
+                "determinism": determinism,
+                "noise_backend": noise_backend,
+                "skip_freetext": skip_freetext,
+                "model": None if skip_freetext else model,
+            })
+            if verbose:
+                print(f"Wrote shard manifest {path}")
+        return counts
+
+    if stream:
+        return _generate_streaming(
+            num_patients, seed, output_dir, plan, locale,
+            llm, skip_freetext, verbose, buffer_docs, out, ground_truth,
+        )
+
     # Step 1: Generate patient pool
     if verbose:
         print(f"Generating {num_patients} patients (seed={seed}, locale={locale.code})...")
-    patients = generate_patients(num_patients, seed, locale)
+    if compact_pool:
+        patients = PatientPool(iter_patients(num_patients, seed, locale, determinism))
+    else:
+        patients = generate_patients(num_patients, seed, locale, determinism)
 
     # Step 2: Assign facilities and generate documents
     index_docs: dict[str, list[dict]] = {}
     total_docs = 0
     freetext_queue: list[dict] = []
 
-    for p_idx, patient in enumerate(patients):
-        num_facilities = rng.randint(
-            config.MIN_FACILITIES_PER_PATIENT,
-            config.MAX_FACILITIES_PER_PATIENT,
-        )
-        facilities = rng.sample(locale.facilities, min(num_facilities, len(locale.facilities)))
-
-        for facility in facilities:
-            num_docs = rng.randint(config.MIN_DOCS_PER_VISIT, config.MAX_DOCS_PER_VISIT)
-            doc_types = rng.sample(facility["doc_types"], min(num_docs, len(facility["doc_types"])))
-
-            for doc_type in doc_types:
-                doc_date = _random_doc_date(rng)
-                idx_name = index_name(facility["id"], doc_type)
-
-                doc = build_structured_fields(
-                    patient, facility["id"], doc_type, doc_date, rng, locale
-                )
-
-                contradiction = pick_contradiction(patient, doc, rng, locale)
-                doc = apply_field_distortions(doc, facility["id"], doc_type, rng, locale)
-                doc = inject_garbage(doc, rng, locale)
-
+    with GroundTruthWriter(output_dir, buffer_docs, json_style) if ground_truth else nullcontext() as truth:
+        for p_idx, patient in enumerate(patients):
+            # Build from a transient dict; the queue keeps only the row view
+            record = dict(patient) if compact_pool else patient
+            for idx_name, doc, item in _patient_documents(record, p_idx, plan, locale, truth):
                 if idx_name not in index_docs:
                     index_docs[idx_name] = []
 
@@ -104,18 +362,10 @@ def generate_documents(
                 index_docs[idx_name].append(doc)
                 total_docs += 1
 
-                freetext_queue.append({
-                    "index": idx_name,
-                    "doc_idx": doc_idx,
-                    "patient": patient,
-                    "facility_id": facility["id"],
-                    "doc_type": doc_type,
-                    "contradiction": contradiction,
-                    "source": facility["source"].get(doc_type, "digital"),
-                })
+                freetext_queue.append({"index": idx_name, "doc_idx": doc_idx, "patient": patient, **item})
 
-        if verbose and (p_idx + 1) % 50 == 0:
-            print(f"  Processed {p_idx + 1}/{num_patients} patients ({total_docs} docs so far)")
+            if verbose and (p_idx + 1) % 50 == 0:
+                print(f"  Processed {p_idx + 1}/{num_patients} patients ({total_docs} docs so far)")
 
     if verbose:
         print(f"Generated {total_docs} structured documents across {len(index_docs)} indices")
@@ -125,60 +375,421 @@ def generate_documents(
         if verbose:
             print(f"Generating free text for {len(freetext_queue)} documents...")
 
-        for i, item in enumerate(freetext_queue):
-            doc = index_docs[item["index"]][item["doc_idx"]]
-
-            # Get free text field name from locale
-            fnames = locale.field_names[item["facility_id"]]
-            text_field = fnames.get("free_text", "clinical_notes")
-
-            try:
-                text = generate_clinical_text(
-                    patient=item["patient"],
-                    facility_id=item["facility_id"],
-                    doc_type=item["doc_type"],
-                    locale=locale,
-                    contradiction=item["contradiction"],
-                    model=model,
-                    api_base=api_base,
-                    api_key=api_key,
-                )
-
-                if item["source"] == "ocr":
-                    text = apply_ocr_noise(text, rng, locale.ocr_patterns)
-                else:
-                    text = apply_digital_typos(text, rng)
+        done = 0
+        if checkpoint is not None and resume:
+            restored, rng_state = checkpoint.resume()
+            if rng_state is not None:
+                plan.shared.setstate(rng_state)
+            for item, text in zip(freetext_queue, restored):
+                index_docs[item["index"]][item["doc_idx"]][text_field(locale, item["facility_id"])] = text
+            done = len(restored)
+            if verbose:
+                print(f"Resuming from checkpoint: {done}/{len(freetext_queue)} free texts done")
+        elif checkpoint is not None:
+            checkpoint.start()
 
-                doc[text_field] = text
-            except Exception as e:
-                if verbose:
-                    print(f"  Warning: free text generation failed for doc {i}: {e}")
-                doc[text_field] = ""
+        if llm_batch is not None:
+            texts = _batch_texts(freetext_queue, locale, llm, llm_batch, llm_batch_submit, verbose)
+            if texts is None:
+                return {}
+        else:
+            texts = iter_clinical_texts(freetext_queue[done:], locale, **llm)
+        try:
+            for i, (item, text) in enumerate(texts, start=done):
+                doc = index_docs[item["index"]][item["doc_idx"]]
+                text = noised_text(text, item, text_rng(plan, item), locale, verbose, i, plan.noise_backend)
+                doc[text_field(locale, item["facility_id"])] = text
+                if checkpoint is not None:
+                    checkpoint.record(text, None if plan.v2 else plan.shared)
 
-            if verbose and (i + 1) % 100 == 0:
-                print(f"  Generated text for {i + 1}/{len(freetext_queue)} documents")
+                if verbose and (i + 1) % 100 == 0:
+                    print(f"  Generated text for {i + 1}/{len(freetext_queue)} documents")
+        except BaseException:
+            # Keep every finished slot so --resume loses as little work as possible
+            if checkpoint is not None:
+                checkpoint.commit()
+                checkpoint.close()
+            raise
     else:
         if verbose:
             print("Skipping free text generation (--skip-freetext)")
         for item in freetext_queue:
             doc = index_docs[item["index"]][item["doc_idx"]]
-            fnames = locale.field_names[item["facility_id"]]
-            text_field = fnames.get("free_text", "clinical_notes")
-            doc[text_field] = "[free text generation skipped]"
+            doc[text_field(locale, item["facility_id"])] = "[free text generation skipped]"
 
     # Step 4: Write NDJSON files
     if verbose:
         print(f"Writing NDJSON files to {output_dir}/")
 
     counts = {}
-    for idx_name, docs in index_docs.items():
-        filepath = os.path.join(output_dir, f"{idx_name}.ndjson")
-        with open(filepath, "w", encoding="utf-8") as f:
-            for doc in docs:
-                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
-        counts[idx_name] = len(docs)
+    with IndexWriters(output_dir, buffer_docs, **out) as writers:
+        for idx_name, docs in index_docs.items():
+            writers.write_many(idx_name, docs)
+            counts[idx_name] = len(docs)
+            if verbose:
+                print(f"  {idx_name}: {len(docs)} documents")
+
+    if checkpoint is not None:
+        checkpoint.finish()
+    return counts
+
+
+def _batch_texts(
+    queue: list[dict],
+    locale,
+    llm: dict,
+    batch_dir: str,
+    submit: bool,
+    verbose: bool,
+) -> Iterator[tuple[dict, str | Exception]] | None:
+    """Free texts from a batch results file, or None while results are pending."""
+    requests_path, has_results = prepare_batch(queue, locale, batch_dir, llm["model"])
+    if verbose:
+        print(f"Wrote {len(queue)} batch requests to {requests_path}")
+    if not has_results:
+        if not submit:
+            return None
+        submit_batch(batch_dir, llm["api_base"], llm["api_key"], verbose=verbose)
+    results = read_batch_results(os.path.join(batch_dir, RESULTS_FILE))
+    return iter_batch_texts(queue, results)
+
+
+def _generate_streaming(
+    num_patients: int,
+    seed: int,
+    output_dir: str,
+    plan: RngPlan,
+    locale,
+    llm: dict,
+    skip_freetext: bool,
+    verbose: bool,
+    buffer_docs: int | None,
+    out: dict | None = None,
+    ground_truth: bool = False,
+) -> dict[str, int]:
+    """Streaming variant of :func:`generate_documents`.
+
+    Structured-only and v2 runs write each document as soon as it is built.
+    With free text in v1 mode, batch mode applies text noise only after
+    *all* structured docs have consumed the shared RNG, so the stream runs in
+    two passes to keep the same RNG order: pass 1 spools structured docs and
+    a compact free-text queue to disk, pass 2 replays the queue (regenerating
+    patients from the seed) and writes the final files.
+    """
+    if verbose:
+        print(f"Streaming {num_patients} patients (seed={seed}, locale={locale.code})...")
+
+    if skip_freetext or plan.v2:
+        counts = _stream_patient_range(
+            0, num_patients, seed, output_dir, plan, locale,
+            llm, skip_freetext, verbose, buffer_docs, out, ground_truth,
+        )
         if verbose:
-            print(f"  {idx_name}: {len(docs)} documents")
+            for idx_name, count in counts.items():
+                print(f"  {idx_name}: {count} documents")
+        return counts
+
+    spool_dir = tempfile.mkdtemp(prefix=".medsynth-spool-", dir=output_dir)
+    try:
+        # Pass 1: structured docs and free-text queue to disk
+        queue_path = os.path.join(spool_dir, "freetext_queue.ndjson")
+        truth = GroundTruthWriter(output_dir, buffer_docs, (out or {}).get("json_style")) if ground_truth else None
+        with IndexWriters(spool_dir, buffer_docs) as spool, NdjsonWriter(queue_path, buffer_docs) as queue, \
+                truth or nullcontext():
+            for p_idx, patient in enumerate(iter_patients(num_patients, seed, locale, plan.determinism)):
+                for idx_name, doc, item in _patient_documents(patient, p_idx, plan, locale, truth):
+                    spool.write(idx_name, doc)
+                    queue.write({"index": idx_name, **item})
+                if verbose and (p_idx + 1) % 50 == 0:
+                    print(f"  Processed {p_idx + 1}/{num_patients} patients ({queue.count} docs so far)")
+        total_docs = queue.count
+        if verbose:
+            print(f"Generated {total_docs} structured documents across {len(spool.counts)} indices")
+            print(f"Generating free text for {total_docs} documents...")
+
+        # Pass 2: replay the queue in order; docs of an index appear in spool order
+        def _queued_items():
+            patients = enumerate(iter_patients(num_patients, seed, locale, plan.determinism))
+            p_idx, patient = -1, None
+            with open(queue_path, encoding="utf-8") as queue_file:
+                for line in queue_file:
+                    item = json.loads(line)
+                    while p_idx < item["p_idx"]:
+                        p_idx, patient = next(patients)
+                    item["patient"] = patient
+                    yield item
+
+        readers = {
+            name: open(os.path.join(spool_dir, f"{name}.ndjson"), encoding="utf-8")
+            for name in spool.counts
+        }
+        try:
+            with IndexWriters(output_dir, buffer_docs, **(out or {})) as writers:
+                texts = iter_clinical_texts(_queued_items(), locale, **llm)
+                for i, (item, text) in enumerate(texts):
+                    doc = json.loads(readers[item["index"]].readline())
+                    doc[text_field(locale, item["facility_id"])] = noised_text(
+                        text, item, text_rng(plan, item), locale, verbose, i, plan.noise_backend,
+                    )
+                    writers.write(item["index"], doc)
+
+                    if verbose and (i + 1) % 100 == 0:
+                        print(f"  Generated text for {i + 1}/{total_docs} documents")
+        finally:
+            for reader in readers.values():
+                reader.close()
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+    counts = writers.counts
+    if verbose:
+        for idx_name, count in counts.items():
+            print(f"  {idx_name}: {count} documents")
+    return counts
+
+
+def _stream_patient_range(
+    start: int,
+    stop: int,
+    seed: int,
+    output_dir: str,
+    plan: RngPlan,
+    locale,
+    llm: dict,
+    skip_freetext: bool,
+    verbose: bool,
+    buffer_docs: int | None,
+    out: dict | None = None,
+    ground_truth: bool = False,
+) -> dict[str, int]:
+    """Generate patients ``start .. stop - 1`` straight into per-index writers.
+
+    Single pass: only valid when text noise does not depend on the order of
+    the whole corpus, i.e. structured-only runs or v2 determinism.
+    """
+    out = out or {}
+    truth = GroundTruthWriter(output_dir, buffer_docs, out.get("json_style")) if ground_truth else None
+
+    def _items():
+        patients = iter_patients(stop, seed, locale, plan.determinism, start)
+        for p_idx, patient in enumerate(patients, start):
+            for idx_name, doc, item in _patient_documents(patient, p_idx, plan, locale, truth):
+                yield {"index": idx_name, "doc": doc, "patient": patient, **item}
+            if verbose and (p_idx + 1) % 50 == 0:
+                print(f"  Processed {p_idx + 1}/{stop} patients")
+
+    with IndexWriters(output_dir, buffer_docs, **out) as writers, truth or nullcontext():
+        if skip_freetext:
+            results = ((item, None) for item in _items())
+        else:
+            results = iter_clinical_texts(_items(), locale, **llm)
+        for i, (item, text) in enumerate(results):
+            doc = item["doc"]
+            if skip_freetext:
+                text = "[free text generation skipped]"
+            else:
+                text = noised_text(
+                    text, item, text_rng(plan, item), locale, verbose, i, plan.noise_backend,
+                )
+            doc[text_field(locale, item["facility_id"])] = text
+            writers.write(item["index"], doc)
+    return writers.counts
+
+
+def _generate_manifest(
+    num_patients: int,
+    seed: int,
+    output_dir: str,
+    plan: RngPlan,
+    locale,
+    verbose: bool,
+    buffer_docs: int | None,
+    json_style: str | None = None,
+    ground_truth: bool = False,
+) -> dict[str, int]:
+    """Phase 1: structured docs with empty free text plus the free-text manifest.
+
+    One pass over the patients; the manifest header records everything
+    phase 2 needs to apply the same text noise, including (v1) the shared
+    RNG state after all structured documents.
+    """
+    if verbose:
+        print(f"Streaming {num_patients} patients (seed={seed}, locale={locale.code}) "
+              f"with a free-text manifest...")
+    slots = 0
+    truth = GroundTruthWriter(output_dir, buffer_docs, json_style) if ground_truth else None
+    with IndexWriters(output_dir, buffer_docs, json_style=json_style) as writers, \
+            NdjsonWriter(os.path.join(output_dir, MANIFEST_FILE), buffer_docs) as manifest, \
+            truth or nullcontext():
+        for p_idx, patient in enumerate(iter_patients(num_patients, seed, locale, plan.determinism)):
+            for idx_name, doc, item in _patient_documents(patient, p_idx, plan, locale, truth):
+                doc[text_field(locale, item["facility_id"])] = ""
+                manifest.write(manifest_row(idx_name, writers.count(idx_name), patient, item))
+                writers.write(idx_name, doc)
+                slots += 1
+            if verbose and (p_idx + 1) % 50 == 0:
+                print(f"  Processed {p_idx + 1}/{num_patients} patients ({slots} docs so far)")
+        counts = writers.counts
+    write_manifest_header(output_dir, {
+        "locale": locale.code,
+        "seed": seed,
+        "num_patients": num_patients,
+        "determinism": plan.determinism,
+        "noise_backend": plan.noise_backend,
+        "json_style": json_style or config.DEFAULT_JSON_STYLE,
+    }, slots, None if plan.v2 else rng_state_to_json(plan.shared))
+    if verbose:
+        print(f"Wrote {slots} free-text slots to {os.path.join(output_dir, MANIFEST_FILE)}")
+    return counts
+
+
+def _llm_counters(llm: dict) -> dict[str, int]:
+    """Cache and text-pool counters of one process, for merging across workers."""
+    cache, pool = llm["cache"], llm["pool"]
+    return {
+        "hits": cache.hits if cache is not None else 0,
+        "misses": cache.misses if cache is not None else 0,
+        "requests": pool.requests if pool is not None else 0,
+        "reused": pool.reused if pool is not None else 0,
+    }
+
+
+def _add_llm_counters(llm: dict, counters: dict[str, int]):
+    cache, pool = llm["cache"], llm["pool"]
+    if cache is not None:
+        cache.hits += counters["hits"]
+        cache.misses += counters["misses"]
+    if pool is not None:
+        pool.requests += counters["requests"]
+        pool.reused += counters["reused"]
+
+
+def _generate_shard(task: dict) -> tuple[dict[str, int], dict[str, int]]:
+    """Process-pool entry point: stream one v2 patient range into ``task["output_dir"]``.
+
+    Returns the per-index counts and this worker's :func:`_llm_counters`.
+    """
+    locale = load_locale(task["locale_code"])
+    llm = dict(task["llm"])
+    llm["rate_limiter"] = rate_limiter(llm.pop("requests_per_minute"), llm.pop("tokens_per_minute"))
+    cache_spec = llm.pop("cache_spec")
+    llm["cache"] = LlmCache(**cache_spec) if cache_spec is not None else None
+    os.makedirs(task["output_dir"], exist_ok=True)
+    try:
+        counts = _stream_patient_range(
+            task["start"], task["stop"], task["seed"], task["output_dir"],
+            RngPlan(task["seed"], "v2", task["noise_backend"]), locale, llm,
+            task["skip_freetext"], False, task["buffer_docs"], {"json_style": task["json_style"]},
+            task["ground_truth"],
+        )
+    finally:
+        if llm["cache"] is not None:
+            llm["cache"].close()
+    return counts, _llm_counters(llm)
+
+
+def _generate_parallel(
+    start: int,
+    stop: int,
+    seed: int,
+    output_dir: str,
+    locale,
+    llm: dict,
+    requests_per_minute: int | None,
+    tokens_per_minute: int | None,
+    skip_freetext: bool,
+    verbose: bool,
+    buffer_docs: int | None,
+    workers: int,
+    noise_backend: str,
+    out: dict,
+    ground_truth: bool = False,
+) -> dict[str, int]:
+    """Split patients ``start .. stop - 1`` across a process pool and merge.
+
+    Each chunk writes its own per-index NDJSON parts; parts are concatenated
+    in chunk order, which is patient order, so the merged files equal a
+    single-process v2 run.
+    """
+    chunks = [
+        (start + a, start + b)
+        for a, b in split_range(stop - start, workers * config.CHUNKS_PER_WORKER)
+    ]
+    if verbose:
+        print(f"Generating patients {start}-{stop - 1} on {workers} workers "
+              f"({len(chunks)} chunks, seed={seed}, locale={locale.code})...")
+
+    # Rate limiters and cache connections cannot be pickled; each worker builds its own
+    worker_llm = {k: v for k, v in llm.items() if k not in ("rate_limiter", "cache")}
+    cache = llm["cache"]
+    worker_llm["cache_spec"] = None if cache is None else {
+        "path": cache.path, "readonly": cache.readonly, "max_bytes": cache.max_bytes,
+    }
+    worker_llm["requests_per_minute"] = requests_per_minute and max(1, requests_per_minute // workers)
+    worker_llm["tokens_per_minute"] = tokens_per_minute and max(1, tokens_per_minute // workers)
+
+    parts_dir = tempfile.mkdtemp(prefix=".medsynth-parts-", dir=output_dir)
+    try:
+        tasks = [
+            {
+                "start": chunk_start,
+                "stop": chunk_stop,
+                "seed": seed,
+                "locale_code": locale.code,
+                "output_dir": os.path.join(parts_dir, f"{k:05d}"),
+                "llm": worker_llm,
+                "skip_freetext": skip_freetext,
+                "buffer_docs": buffer_docs,
+                "noise_backend": noise_backend,
+                "json_style": out["json_style"],
+                "ground_truth": ground_truth,
+            }
+            for k, (chunk_start, chunk_stop) in enumerate(chunks)
+        ]
+        from concurrent.futures import ProcessPoolExecutor  # multiprocessing only when workers > 1
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            part_counts = []
+            for k, (counts, counters) in enumerate(pool.map(_generate_shard, tasks)):
+                part_counts.append(counts)
+                _add_llm_counters(llm, counters)
+                if verbose:
+                    print(f"  Finished chunk {k + 1}/{len(tasks)} "
+                          f"(patients {tasks[k]['start']}-{tasks[k]['stop'] - 1})")
+
+        counts: dict[str, int] = {}
+        for part in part_counts:
+            for idx_name, count in part.items():
+                counts[idx_name] = counts.get(idx_name, 0) + count
+
+        if verbose:
+            print(f"Merging shards into {output_dir}/")
+        if out["sink"] is None and out["compress"] is None:
+            for idx_name in counts:
+                remove_index_files(output_dir, idx_name)
+                with open(os.path.join(output_dir, f"{idx_name}.ndjson"), "wb") as merged:
+                    for task, part in zip(tasks, part_counts):
+                        if idx_name in part:
+                            with open(os.path.join(task["output_dir"], f"{idx_name}.ndjson"), "rb") as f:
+                                shutil.copyfileobj(f, merged)
+        else:
+            # Re-chunk / feed the sink line by line; parts stay uncompressed
+            with IndexWriters(output_dir, buffer_docs, **out) as writers:
+                for idx_name in counts:
+                    for task, part in zip(tasks, part_counts):
+                        if idx_name in part:
+                            with open(os.path.join(task["output_dir"], f"{idx_name}.ndjson"), "rb") as f:
+                                for line in f:
+                                    writers.write_line(idx_name, line)
+        if ground_truth:
+            with GroundTruthWriter(output_dir, buffer_docs, out["json_style"]) as truth:
+                for task in tasks:
+                    truth.merge(task["output_dir"])
+        if verbose:
+            for idx_name, count in counts.items():
+                print(f"  {idx_name}: {count} documents")
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
 
     return counts
 
@@ -202,28 +813,136 @@ def main():
                         help="Skip LLM calls for free text generation")
     parser.add_argument("--force", action="store_true",
                         help="Overwrite existing output files")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream documents to disk patient by patient (bounded memory)")
+    parser.add_argument("--buffer-docs", type=int, default=config.STREAM_BUFFER_DOCS,
+                        help=f"Docs buffered per index before flushing "
+                             f"(default: {config.STREAM_BUFFER_DOCS})")
+    parser.add_argument("--concurrency", type=int, default=config.LLM_CONCURRENCY,
+                        help="Parallel LLM requests for free text (default: 1)")
+    parser.add_argument("--rpm", type=int, default=None,
+                        help="Max LLM requests per minute (default: unlimited)")
+    parser.add_argument("--tpm", type=int, default=None,
+                        help="Max estimated LLM tokens per minute (default: unlimited)")
+    parser.add_argument("--determinism", choices=config.DETERMINISM_MODES,
+                        default=config.DEFAULT_DETERMINISM,
+                        help="v1: shared RNG streams (historical output); "
+                             "v2: per-patient/per-doc RNGs, shardable (default: v1)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for generation; requires --determinism v2 (default: 1)")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="K/N",
+                        help="Generate only shard K of N (1-based) of the corpus and write a "
+                             "shard manifest; requires --determinism v2")
+    parser.add_argument("--noise-backend", choices=config.NOISE_BACKENDS,
+                        default=config.DEFAULT_NOISE_BACKEND,
+                        help="OCR/typo noise engine; numpy is vectorized but yields a "
+                             "different corpus (default: python)")
+    parser.add_argument("--llm-cache", default=None, metavar="PATH",
+                        help="SQLite cache of LLM texts; re-runs with the same prompts skip the API")
+    parser.add_argument("--llm-cache-readonly", action="store_true",
+                        help="Read from --llm-cache but never write to it")
+    parser.add_argument("--text-pool", type=int, default=None, metavar="K",
+                        help="Reuse up to K LLM texts per prompt class (prompts equal up to "
+                             "patient name/age), filling name/age in locally (default: off)")
+    parser.add_argument("--text-pool-fields", default=",".join(DEFAULT_POOL_FIELDS),
+                        help=f"Comma-separated fields replaced by placeholders in pooled prompts; "
+                             f"choose from {','.join(POOL_FIELDS)} (default: name,age)")
+    parser.add_argument("--llm-batch", default=None, metavar="DIR",
+                        help="Write free-text requests as an OpenAI batch JSONL file in DIR; "
+                             "re-run with the results file in DIR to fill in free text")
+    parser.add_argument("--llm-batch-submit", action="store_true",
+                        help="Submit the --llm-batch file to the provider's Batch API and wait")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted LLM run from its checkpoint in --output-dir")
+    parser.add_argument("--checkpoint-every", type=int, default=config.CHECKPOINT_EVERY, metavar="N",
+                        help=f"Checkpoint every N free texts; 0 disables "
+                             f"(default: {config.CHECKPOINT_EVERY})")
+    parser.add_argument("--freetext-manifest", action="store_true",
+                        help="Phase 1: write structured docs and a free-text manifest without "
+                             "calling the LLM; fill the texts later with medsynth-fill")
+    sinks = parser.add_mutually_exclusive_group()
+    sinks.add_argument("--es-url", default=None, metavar="URL",
+                       help="Also index every document into this Elasticsearch cluster via _bulk")
+    sinks.add_argument("--bulk-files", default=None, metavar="DIR",
+                       help="Also write <index>.mapping.json and _bulk-ready NDJSON chunks to DIR")
+    parser.add_argument("--bulk-chunk-bytes", type=int, default=config.BULK_CHUNK_BYTES,
+                        help=f"Target size of one --bulk-files chunk (default: {config.BULK_CHUNK_BYTES})")
+    parser.add_argument("--es-bulk-bytes", type=int, default=config.ES_BULK_BYTES,
+                        help=f"Max _bulk request size in bytes (default: {config.ES_BULK_BYTES})")
+    parser.add_argument("--es-bulk-docs", type=int, default=config.ES_BULK_DOCS,
+                        help=f"Max docs per _bulk request (default: {config.ES_BULK_DOCS})")
+    parser.add_argument("--es-connections", type=int, default=config.ES_CONNECTIONS,
+                        help=f"Parallel _bulk requests (default: {config.ES_CONNECTIONS})")
+    parser.add_argument("--compress", choices=config.COMPRESSIONS, default=None,
+                        help="Write compressed, rotated files <index>.000.ndjson.gz|.zst "
+                             "(zstd needs the zstandard package)")
+    parser.add_argument("--chunk-bytes", type=int, default=config.OUTPUT_CHUNK_BYTES,
+                        help=f"Uncompressed bytes per --compress output file "
+                             f"(default: {config.OUTPUT_CHUNK_BYTES})")
+    parser.add_argument("--json-style", choices=config.JSON_STYLES, default=config.DEFAULT_JSON_STYLE,
+                        help="default: json.dumps output; compact: no spaces after separators, "
+                             "encoded with orjson when installed (same bytes)")
+    parser.add_argument("--ground-truth", action="store_true",
+                        help="Also write the patient pool and a doc -> patient linkage table "
+                             "to OUTPUT_DIR/ground_truth/")
+    parser.add_argument("--compact-pool", action="store_true",
+                        help="Hold the patient pool in columnar arrays instead of dicts "
+                             "(less memory in batch mode, same output)")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Also export every index as <index>.parquet (needs pyarrow)")
+    parser.add_argument("--parquet-row-group-rows", type=int, default=config.PARQUET_ROW_GROUP_ROWS,
+                        help=f"Rows per Parquet row group (default: {config.PARQUET_ROW_GROUP_ROWS})")
     parser.add_argument("--verbose", "-v", action="store_true")
     args = parser.parse_args()
 
-    # Load .env if present
-    try:
-        from dotenv import load_dotenv
-        load_dotenv()
-    except ImportError:
-        pass
+    if args.parquet:
+        if args.freetext_manifest:
+            print("Error: --parquet cannot be combined with --freetext-manifest; "
+                  "use medsynth-fill --parquet when applying the texts", file=sys.stderr)
+            sys.exit(1)
+        try:
+            require_pyarrow()
+        except ImportError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    if args.compact_pool and (args.stream or args.workers > 1 or args.shard or args.freetext_manifest):
+        print("Error: --compact-pool only applies to the default batch mode; --stream, --workers, "
+              "--shard and --freetext-manifest never hold the patient pool", file=sys.stderr)
+        sys.exit(1)
+
+    if (args.workers > 1 or args.shard) and args.determinism != "v2":
+        print("Error: --workers > 1 and --shard require --determinism v2", file=sys.stderr)
+        sys.exit(1)
+    if args.freetext_manifest and (args.skip_freetext or args.llm_batch or args.resume or args.workers > 1
+                                   or args.shard or args.es_url or args.bulk_files or args.compress
+                                   or args.text_pool or args.llm_cache):
+        print("Error: --freetext-manifest cannot be combined with --skip-freetext, --llm-batch, --resume, "
+              "--workers, --shard, --compress or an output sink; pass --es-url, --bulk-files, "
+              "--text-pool and --llm-cache to medsynth-fill instead", file=sys.stderr)
+        sys.exit(1)
+    if args.llm_batch and not args.skip_freetext and (args.text_pool or args.llm_cache):
+        print("Error: --llm-batch cannot be combined with --text-pool or --llm-cache", file=sys.stderr)
+        sys.exit(1)
+    if args.compress and args.shard:
+        print("Error: --compress cannot be combined with --shard (shard manifests hash plain files)",
+              file=sys.stderr)
+        sys.exit(1)
+
+    # Load .env if present; structured-only runs never talk to an LLM
+    if not args.skip_freetext and not args.freetext_manifest:
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
 
     # Resolve API base — CLI > env > config default
-    api_base = args.api_base or os.environ.get("LLM_API_BASE", config.DEFAULT_API_BASE)
+    api_base = resolve_api_base(args.api_base)
 
     # Only require an API key for remote providers (not Ollama)
-    if not args.skip_freetext and not _is_local_endpoint(api_base):
-        key = (
-            args.api_key
-            or os.environ.get("LLM_API_KEY")
-            or os.environ.get("OPENAI_API_KEY")
-            or os.environ.get("MOONSHOT_API_KEY")
-        )
-        if not key:
+    if not args.skip_freetext and not args.freetext_manifest and not is_local_endpoint(api_base):
+        if not resolve_api_key(args.api_key):
             print(
                 "Error: API key not set for remote provider. "
                 "Use --api-key, set LLM_API_KEY env var, or use --skip-freetext.",
@@ -231,22 +950,106 @@ def main():
             )
             sys.exit(1)
 
-    counts = generate_documents(
-        num_patients=args.num_patients,
-        seed=args.seed,
-        output_dir=args.output_dir,
-        model=args.model,
-        api_base=api_base,
-        api_key=args.api_key,
-        locale_code=args.locale,
-        skip_freetext=args.skip_freetext,
-        verbose=args.verbose,
-        force=args.force,
-    )
+    text_pool = None
+    if args.text_pool and not args.skip_freetext:
+        fields = tuple(f.strip() for f in args.text_pool_fields.split(",") if f.strip())
+        try:
+            text_pool = TextPool(args.text_pool, seed=args.seed, fields=fields)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    llm_cache = None
+    if args.llm_cache and not args.skip_freetext:
+        try:
+            llm_cache = LlmCache(args.llm_cache, readonly=args.llm_cache_readonly)
+        except FileNotFoundError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    es_sink = None
+    if args.es_url:
+        try:
+            es_sink = EsSink(args.es_url, args.es_bulk_bytes, args.es_bulk_docs, args.es_connections)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    bulk_sink = BulkFileSink(args.bulk_files, args.bulk_chunk_bytes) if args.bulk_files else None
+
+    try:
+        counts = generate_documents(
+            num_patients=args.num_patients,
+            seed=args.seed,
+            output_dir=args.output_dir,
+            model=args.model,
+            api_base=api_base,
+            api_key=args.api_key,
+            locale_code=args.locale,
+            skip_freetext=args.skip_freetext,
+            verbose=args.verbose,
+            force=args.force,
+            stream=args.stream,
+            buffer_docs=args.buffer_docs,
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            determinism=args.determinism,
+            workers=args.workers,
+            shard=args.shard,
+            noise_backend=args.noise_backend,
+            llm_cache=llm_cache,
+            text_pool=text_pool,
+            llm_batch=args.llm_batch,
+            llm_batch_submit=args.llm_batch_submit,
+            resume=args.resume,
+            checkpoint_every=args.checkpoint_every,
+            freetext_manifest=args.freetext_manifest,
+            sink=es_sink or bulk_sink,
+            compress=args.compress,
+            chunk_bytes=args.chunk_bytes,
+            json_style=args.json_style,
+            ground_truth=args.ground_truth,
+            compact_pool=args.compact_pool,
+        )
+        for sink in (es_sink, bulk_sink):
+            if sink is not None:
+                sink.close()
+        parquet = None
+        if args.parquet and counts:
+            if args.verbose:
+                print(f"Exporting Parquet files to {args.output_dir}/")
+            parquet = export_parquet(args.output_dir, load_locale(args.locale),
+                                     args.parquet_row_group_rows, args.verbose)
+    except (FileExistsError, FileNotFoundError, ValueError, EsBulkError, BatchSubmitError, ImportError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if llm_cache is not None:
+            llm_cache.close()
+
+    if args.llm_batch and not args.skip_freetext and not counts:
+        print(f"\nWrote batch requests to {args.llm_batch}/{REQUESTS_FILE}. Run them (or use "
+              f"--llm-batch-submit), place the results at {args.llm_batch}/{RESULTS_FILE} "
+              f"and re-run the same command.")
+        return
 
     print(f"\nDone. {sum(counts.values())} documents across {len(counts)} indices.")
     for name, count in sorted(counts.items()):
         print(f"  {name}: {count}")
+    if llm_cache is not None:
+        print(f"LLM cache: {llm_cache.hits} hits, {llm_cache.misses} misses")
+    if text_pool is not None:
+        print(f"Text pool: {text_pool.requests} LLM texts for "
+              f"{text_pool.requests + text_pool.reused} documents")
+    if es_sink is not None:
+        print(f"Elasticsearch: {es_sink.indexed} indexed, {es_sink.failed} rejected "
+              f"({es_sink.requests} bulk requests, {es_sink.retries} retries)")
+        for error in es_sink.errors:
+            print(f"  {error}")
+    if bulk_sink is not None:
+        print(f"Bulk files: {len(bulk_sink.chunks)} chunks in {args.bulk_files}/")
+    if parquet is not None:
+        print(f"Parquet: {len(parquet)} files in {args.output_dir}/")
 
 
 if __name__ == "__main__":
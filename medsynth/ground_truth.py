@@ -0,0 +1,99 @@
+"""Ground truth of a run: the patient pool and a document -> patient linkage table.
+
+With ``ground_truth=True`` (``--ground-truth``) a run also writes, inside
+``<output_dir>/ground_truth/``:
+
+- ``patients.ndjson``: every generated patient, in pool order, as
+  ``{"p_idx": 0, "id": ..., "full_name": ..., ...}``;
+- ``linkage.ndjson``: one row per document::
+
+      {"index": "medical_alon_lab", "doc": 17, "p_idx": 4,
+       "contradiction": "smoking", "garbage": null, "source": "ocr"}
+
+``doc`` is the document's position (line number) in its index file and
+``p_idx`` the patient it was generated from. ``contradiction`` is the type
+of contradiction the free text was asked to carry and ``garbage`` the type
+of garbage injected into the structured fields (null when none was).
+Scoring entity resolution or contradiction detection then becomes a join
+on ``(index, doc)`` instead of regenerating the pool.
+"""
+
+import json
+import os
+from .writers import NdjsonWriter
+
+GROUND_TRUTH_DIR = "ground_truth"
+PATIENTS_FILE = "patients.ndjson"
+LINKAGE_FILE = "linkage.ndjson"
+
+
+def linkage_row(idx_name: str, doc_no: int, item: dict) -> dict:
+    """One linkage table row for the document at ``doc_no`` in ``idx_name``."""
+    contradiction = item.get("contradiction")
+    return {
+        "index": idx_name,
+        "doc": doc_no,
+        "p_idx": item["p_idx"],
+        "contradiction": contradiction["type"] if contradiction else None,
+        "garbage": item.get("garbage"),
+        "source": item["source"],
+    }
+
+
+class GroundTruthWriter:
+    """Stream patients and linkage rows into ``<output_dir>/ground_truth/``.
+
+    Call :meth:`patient` for every patient and :meth:`link` for each of its
+    documents in the order they land in the index files; doc positions are
+    counted per index.
+    """
+
+    def __init__(self, output_dir: str, buffer_docs: int | None = None, json_style: str | None = None):
+        self.path = os.path.join(output_dir, GROUND_TRUTH_DIR)
+        os.makedirs(self.path, exist_ok=True)
+        self._patients = NdjsonWriter(os.path.join(self.path, PATIENTS_FILE), buffer_docs,
+                                      json_style=json_style)
+        self._linkage = NdjsonWriter(os.path.join(self.path, LINKAGE_FILE), buffer_docs,
+                                     json_style=json_style)
+        self._docs: dict[str, int] = {}
+
+    def _next_doc(self, idx_name: str) -> int:
+        doc_no = self._docs.get(idx_name, 0)
+        self._docs[idx_name] = doc_no + 1
+        return doc_no
+
+    def patient(self, p_idx: int, patient: dict):
+        self._patients.write({"p_idx": p_idx, **patient})
+
+    def link(self, idx_name: str, item: dict):
+        self._linkage.write(linkage_row(idx_name, self._next_doc(idx_name), item))
+
+    def merge(self, output_dir: str):
+        """Append the ground truth written into ``output_dir`` for the next patient range.
+
+        Its doc positions restart at 0 and are renumbered to follow the
+        documents already written.
+        """
+        path = os.path.join(output_dir, GROUND_TRUTH_DIR)
+        with open(os.path.join(path, PATIENTS_FILE), "rb") as f:
+            for line in f:
+                self._patients.write_line(line)
+        with open(os.path.join(path, LINKAGE_FILE), encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                row["doc"] = self._next_doc(row["index"])
+                self._linkage.write(row)
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return {"patients": self._patients.count, "documents": self._linkage.count}
+
+    def close(self):
+        self._patients.close()
+        self._linkage.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,220 @@
+"""Offline free-text generation via OpenAI-compatible batch JSONL files.
+
+Instead of one chat request per document, the whole free-text queue is
+written to a batch *requests* file in the OpenAI Batch API format::
+
+    {"custom_id": "doc-00000000", "method": "POST", "url": "/v1/chat/completions", "body": {...}}
+
+The file can be submitted to a provider's Batch API (:func:`submit_batch`)
+or run by any local runner (e.g. vLLM's ``run_batch``) that writes the
+matching *results* file. Because structured generation is deterministic,
+re-running the same command with the results file in place ingests the
+texts and writes the final corpus; nothing but the batch directory has to
+survive between the two runs.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator
+from . import config, freetext
+from .locales.base import LocaleConfig
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+REQUESTS_FILE = "medsynth-batch-requests.jsonl"
+RESULTS_FILE = "medsynth-batch-results.jsonl"
+STATE_FILE = "medsynth-batch.json"
+
+_FINAL_FAILURES = ("failed", "expired", "cancelled")
+
+
+class BatchRequestError(Exception):
+    """A batch result line reported an error (or no result line exists)."""
+
+
+class BatchSubmitError(RuntimeError):
+    """Uploading, polling or downloading a batch failed, or the batch itself failed."""
+
+
+def custom_id(i: int) -> str:
+    return f"doc-{i:08d}"
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_batch_requests(
+    items: Iterable[dict],
+    locale: LocaleConfig,
+    path: str,
+    model: str | None = None,
+) -> int:
+    """Write one chat request per free-text item to ``path``; returns the count."""
+    model = model or os.environ.get("LLM_MODEL", config.DEFAULT_MODEL)
+    count = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for i, item in enumerate(items):
+            prompt = locale.format_clinical_prompt(
+                patient=item["patient"],
+                facility_id=item["facility_id"],
+                doc_type=item["doc_type"],
+                contradiction=item.get("contradiction"),
+            )
+            request = {
+                "custom_id": custom_id(i),
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": freetext.chat_params(model, locale, prompt),
+            }
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def read_batch_results(path: str) -> dict[str, str | BatchRequestError]:
+    """Map ``custom_id`` to the completion text, or to the error it reported."""
+    results: dict[str, str | BatchRequestError] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            status = response.get("status_code", 200)
+            if record.get("error") or status != 200:
+                error = record.get("error") or response.get("body")
+                results[record["custom_id"]] = BatchRequestError(f"status {status}: {error}")
+                continue
+            content = response["body"]["choices"][0]["message"]["content"]
+            if content is None:
+                # Refusals and tool-only replies carry no text
+                results[record["custom_id"]] = BatchRequestError(f"status {status}: no message content")
+                continue
+            results[record["custom_id"]] = content.strip()
+    return results
+
+
+def iter_batch_texts(
+    items: Iterable[dict],
+    results: dict[str, str | BatchRequestError],
+) -> Iterator[tuple[dict, str | Exception]]:
+    """Yield ``(item, text)`` like :func:`medsynth.freetext.iter_clinical_texts`."""
+    for i, item in enumerate(items):
+        text = results.get(custom_id(i))
+        if text is None:
+            text = BatchRequestError(f"no result for {custom_id(i)}")
+        yield item, text
+
+
+def submit_batch(
+    batch_dir: str,
+    api_base: str | None = None,
+    api_key: str | None = None,
+    poll_seconds: float | None = None,
+    sleep=time.sleep,
+    verbose: bool = False,
+) -> str:
+    """Submit ``batch_dir``'s requests file, wait for it, and save the results file.
+
+    The batch id is recorded in the state file right after submission, so an
+    interrupted wait resumes polling the same batch instead of resubmitting.
+    Returns the results path; raises :class:`BatchSubmitError` if the upload,
+    polling, the download or the batch itself fails.
+    """
+    if poll_seconds is None:
+        poll_seconds = config.LLM_BATCH_POLL_SECONDS
+    requests_path = os.path.join(batch_dir, REQUESTS_FILE)
+    results_path = os.path.join(batch_dir, RESULTS_FILE)
+    state_path = os.path.join(batch_dir, STATE_FILE)
+    digest = _sha256(requests_path)
+    client = freetext._get_client(api_base, api_key)
+
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+    if state.get("requests_sha256") == digest:
+        batch_id = state["batch_id"]
+        if verbose:
+            print(f"Resuming batch {batch_id}")
+    else:
+        try:
+            with open(requests_path, "rb") as f:
+                uploaded = client.files.create(file=f, purpose="batch")
+            batch = client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window=config.LLM_BATCH_COMPLETION_WINDOW,
+            )
+        except Exception as e:
+            raise BatchSubmitError(f"Could not submit {requests_path}: {e}") from e
+        batch_id = batch.id
+        with open(state_path, "w", encoding="utf-8") as f:
+            json.dump({"batch_id": batch_id, "input_file_id": uploaded.id, "requests_sha256": digest}, f)
+        if verbose:
+            print(f"Submitted batch {batch_id}")
+
+    while True:
+        try:
+            batch = client.batches.retrieve(batch_id)
+        except Exception as e:
+            raise BatchSubmitError(f"Could not poll batch {batch_id} (re-run to resume): {e}") from e
+        if batch.status == "completed":
+            break
+        if batch.status in _FINAL_FAILURES:
+            raise BatchSubmitError(f"Batch {batch_id} {batch.status}")
+        if verbose:
+            print(f"  Batch {batch_id}: {batch.status}")
+        sleep(poll_seconds)
+
+    # Failed requests land in the error file; keep them so they read as errors
+    lines = []
+    try:
+        for file_id in (batch.output_file_id, getattr(batch, "error_file_id", None)):
+            if file_id:
+                lines.append(client.files.content(file_id).text.rstrip("\n"))
+    except Exception as e:
+        raise BatchSubmitError(
+            f"Could not download the results of batch {batch_id} (re-run to resume): {e}"
+        ) from e
+    tmp_path = results_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(line for line in lines if line) + "\n")
+    os.replace(tmp_path, results_path)
+    return results_path
+
+
+def prepare_batch(
+    items: list[dict],
+    locale: LocaleConfig,
+    batch_dir: str,
+    model: str | None = None,
+) -> tuple[str, bool]:
+    """(Re)write the requests file and report whether results are ready.
+
+    Returns ``(requests_path, has_results)``. Raises ValueError if a results
+    file exists but was produced for different requests (other seed, locale,
+    model, ...), since its texts would land on the wrong documents.
+    """
+    os.makedirs(batch_dir, exist_ok=True)
+    requests_path = os.path.join(batch_dir, REQUESTS_FILE)
+    results_path = os.path.join(batch_dir, RESULTS_FILE)
+    new_path = requests_path + ".new"
+    write_batch_requests(items, locale, new_path, model)
+    has_results = os.path.exists(results_path)
+    if has_results and os.path.exists(requests_path) and _sha256(requests_path) != _sha256(new_path):
+        os.remove(new_path)
+        raise ValueError(
+            f"{results_path} belongs to a different set of batch requests; "
+            f"remove it (and {STATE_FILE}) or use another batch directory"
+        )
+    os.replace(new_path, requests_path)
+    return requests_path, has_results
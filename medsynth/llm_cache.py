@@ -0,0 +1,150 @@
+"""Persistent on-disk cache for LLM clinical text.
+
+Entries live in a single SQLite file keyed by a fingerprint of everything
+that determines a completion: ``(model, system_prompt, prompt, temperature,
+max_tokens)``. Re-running a corpus with the same seed after changing
+distortions or field mappings then reuses every text instead of paying for
+the LLM calls again.
+
+The cache is safe to share between threads and processes. When the stored
+text exceeds ``max_bytes`` the least recently used entries are evicted.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from . import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS texts (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS texts_last_used ON texts (last_used);
+"""
+
+_EVICT_TO = 0.9  # evict down to this fraction of max_bytes to amortize deletes
+
+
+def cache_key(
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    variant: int = 0,
+) -> str:
+    """Fingerprint of one completion request.
+
+    ``variant`` tells apart several texts requested for the same prompt (see
+    :mod:`medsynth.text_pool`); variant 0 keys match plain requests.
+    """
+    fields = [model, system_prompt, prompt, temperature, max_tokens]
+    if variant:
+        fields.append(variant)
+    payload = json.dumps(fields, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LlmCache:
+    """SQLite-backed text cache with hit/miss counters and LRU eviction.
+
+    ``readonly=True`` opens an existing cache without ever writing to it
+    (no inserts, no LRU bookkeeping), e.g. to replay a shared cache.
+    """
+
+    def __init__(self, path: str, readonly: bool = False, max_bytes: int | None = None):
+        self.path = path
+        self.readonly = readonly
+        self.max_bytes = config.LLM_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        if readonly:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"LLM cache {path} does not exist")
+            uri = "file:" + os.path.abspath(path) + "?mode=ro"
+            self._db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            parent = os.path.dirname(path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            self._db.commit()
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[0]
+
+    def get(self, key: str) -> str | None:
+        """Return the cached text for ``key`` (counting a hit or miss)."""
+        with self._lock:
+            row = self._db.execute("SELECT text FROM texts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if not self.readonly:
+                self._db.execute("UPDATE texts SET last_used = ? WHERE key = ?", (self._now(), key))
+                self._db.commit()
+            return row[0]
+
+    def put(self, key: str, text: str):
+        """Store ``text`` under ``key``; a no-op for read-only caches."""
+        if self.readonly:
+            return
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            old = self._db.execute("SELECT size FROM texts WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO texts (key, text, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, text, size, self._now()),
+            )
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _now(self) -> float:
+        # Strictly increasing within a process so LRU order never ties
+        self._last_used = max(time.time(), self._last_used + 1e-6)
+        return self._last_used
+
+    def _evict(self):
+        # Other processes may have written too; start from the real total
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[0]
+        target = int(self.max_bytes * _EVICT_TO)
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM texts ORDER BY last_used, key"):
+            if self._bytes <= target:
+                break
+            doomed.append((key,))
+            self._bytes -= size
+        self._db.executemany("DELETE FROM texts WHERE key = ?", doomed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM texts").fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self), "bytes": self._bytes}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
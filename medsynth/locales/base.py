@@ -1,7 +1,8 @@
-"""Locale data model: OcrPattern and LocaleConfig."""
+"""Locale data model: OcrPattern, OcrModel and LocaleConfig."""
 
+from collections.abc import Callable
 from dataclasses import dataclass, field
-from typing import Callable
+from functools import lru_cache
 
 
 @dataclass
@@ -17,6 +18,56 @@ class OcrPattern:
     weight: float = 1.0
 
 
+class OcrModel:
+    """Precompiled OCR confusion table, built once per pattern list.
+
+    trie: nested ``{char: node}`` dicts over pattern sources; a node that ends
+        a source holds ``(targets, cumulative_weights, total_weight)`` under
+        the ``""`` key (never a real character). Cumulative weights are summed
+        in pattern order, matching the old per-call weighted pick exactly.
+    max_len: longest pattern source.
+    field_map: single-char replacements for parsed fields (first pattern wins
+        per source char; digit sources excluded).
+    """
+
+    __slots__ = ("trie", "max_len", "field_map")
+
+    def __init__(self, patterns: list[OcrPattern]):
+        grouped: dict[str, list[OcrPattern]] = {}
+        for p in patterns:
+            grouped.setdefault(p.source, []).append(p)
+
+        self.trie: dict = {}
+        self.max_len = 1
+        for source, candidates in grouped.items():
+            node = self.trie
+            for ch in source:
+                node = node.setdefault(ch, {})
+            cumulative = []
+            running = 0.0
+            for p in candidates:
+                running += p.weight
+                cumulative.append(running)
+            total = sum(p.weight for p in candidates)
+            node[""] = (tuple(p.target for p in candidates), tuple(cumulative), total)
+            self.max_len = max(self.max_len, len(source))
+
+        self.field_map: dict[str, str] = {}
+        for p in patterns:
+            if len(p.source) == 1 and not p.source.isdigit() and p.source not in self.field_map:
+                self.field_map[p.source] = p.target
+
+
+@lru_cache(maxsize=64)
+def _compile_cached(key: tuple[tuple[str, str, float], ...]) -> OcrModel:
+    return OcrModel([OcrPattern(*k) for k in key])
+
+
+def compile_ocr_model(patterns: list[OcrPattern]) -> OcrModel:
+    """Return the compiled :class:`OcrModel` for ``patterns`` (cached by content)."""
+    return _compile_cached(tuple((p.source, p.target, p.weight) for p in patterns))
+
+
 @dataclass
 class LocaleConfig:
     """All locale-specific content for synthetic medical data generation."""
@@ -46,9 +97,17 @@ class LocaleConfig:
     facilities: list[dict] = field(default_factory=list)
     facility_by_id: dict[str, dict] = field(default_factory=dict)
     field_names: dict[str, dict] = field(default_factory=dict)
+    # Reverse index of field_names, built once: concept -> its field names
+    # across all facilities, and per facility field name -> concept
+    concept_fields: dict[str, frozenset[str]] = field(init=False, repr=False, compare=False)
+    field_concepts: dict[str, dict[str, str]] = field(init=False, repr=False, compare=False)
+    # (facility_id, doc_type) -> schemas.DocBuilder, compiled on first use
+    doc_builders: dict[tuple[str, str], object] = field(default_factory=dict, init=False, repr=False,
+                                                        compare=False)
 
     # OCR — unified pattern model
     ocr_patterns: list[OcrPattern] = field(default_factory=list)
+    ocr_model: OcrModel = field(init=False, repr=False, compare=False)
 
     # National ID
     generate_id: Callable = field(default=None)
@@ -69,3 +128,15 @@ class LocaleConfig:
     generic_location: str = ""
     gender_labels: dict[str, str] = field(default_factory=dict)
     urgency_values: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.ocr_model = compile_ocr_model(self.ocr_patterns)
+        concept_fields: dict[str, set[str]] = {}
+        self.field_concepts = {}
+        for facility_id, fnames in self.field_names.items():
+            concepts = self.field_concepts[facility_id] = {}
+            for concept, name in fnames.items():
+                if name is not None:
+                    concept_fields.setdefault(concept, set()).add(name)
+                    concepts.setdefault(name, concept)
+        self.concept_fields = {c: frozenset(names) for c, names in concept_fields.items()}
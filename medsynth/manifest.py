@@ -0,0 +1,72 @@
+"""Free-text manifest: the hand-off between the two pipeline phases.
+
+Phase 1 (``medsynth --freetext-manifest``) writes the structured NDJSON
+files with empty free-text fields, plus:
+
+- ``medsynth-freetext.jsonl``: one row per free-text slot, in generation
+  order, with the target index and document number, the patient's prompt
+  fields, facility, doc type, contradiction and source.
+- ``medsynth-freetext.json``: header with the corpus parameters, the slot
+  count and (v1) the shared RNG state that text noise continues from.
+
+Phase 2 (:mod:`medsynth.fill`) turns slots into texts and patches them in.
+"""
+
+import json
+import os
+from collections.abc import Iterator
+
+MANIFEST_FORMAT = 1
+MANIFEST_FILE = "medsynth-freetext.jsonl"
+MANIFEST_HEADER = "medsynth-freetext.json"
+
+# Patient fields the locales' clinical prompts use
+PROMPT_PATIENT_FIELDS = ("full_name", "age", "gender", "conditions", "medications", "smoking")
+
+
+def manifest_row(idx_name: str, doc_no: int, patient: dict, item: dict) -> dict:
+    """Compact manifest row for one free-text slot."""
+    return {
+        "index": idx_name,
+        "doc": doc_no,
+        "p_idx": item["p_idx"],
+        "patient_id": patient["id"],
+        "facility_id": item["facility_id"],
+        "doc_type": item["doc_type"],
+        "source": item["source"],
+        "contradiction": item["contradiction"],
+        "patient": {k: patient[k] for k in PROMPT_PATIENT_FIELDS},
+    }
+
+
+def write_manifest_header(output_dir: str, params: dict, slots: int, rng_state: list | None) -> str:
+    from . import __version__
+
+    header = {
+        "format": MANIFEST_FORMAT,
+        "medsynth_version": __version__,
+        "params": params,
+        "slots": slots,
+        "rng_state": rng_state,
+    }
+    path = os.path.join(output_dir, MANIFEST_HEADER)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(header, f, ensure_ascii=False)
+        f.write("\n")
+    return path
+
+
+def read_manifest_header(output_dir: str) -> dict:
+    """Load the phase-1 header. Raises FileNotFoundError if phase 1 has not run."""
+    path = os.path.join(output_dir, MANIFEST_HEADER)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No free-text manifest in {output_dir}/ (run medsynth --freetext-manifest first)")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_manifest(output_dir: str) -> Iterator[dict]:
+    """Yield manifest rows in slot order."""
+    with open(os.path.join(output_dir, MANIFEST_FILE), encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
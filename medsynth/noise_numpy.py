@@ -0,0 +1,215 @@
+"""Vectorized NumPy backend for OCR/typo noise (``noise_backend="numpy"``).
+
+Requires the optional ``numpy`` dependency (``pip install e2llm-medsynth[numpy]``).
+
+Instead of one ``rng.random()`` call per character, every random decision
+for a batch of texts is drawn at once as arrays; single-char confusions are
+resolved with lookup tables and only multi-char patterns are matched in a
+Python loop over the (sparse) error positions.
+
+Determinism contract (differs from the pure-Python backend):
+
+- Each call consumes exactly one ``rng.getrandbits(64)`` from the caller's
+  RNG and seeds a ``numpy.random.Generator`` (PCG64) with it, so the
+  pipeline RNG advances by a fixed amount regardless of text length.
+- Output is reproducible for the same seed, inputs and NumPy version, but
+  is *not* equal to the pure-Python backend's output.
+- Batching changes the draws: noising ``[a, b]`` in one call differs from
+  noising ``a`` and ``b`` separately.
+- Where a multi-char match is possible only the longest match is tried (the
+  Python scan falls back to shorter ones only for degenerate weights).
+"""
+
+import random
+from . import config
+from .locales.base import OcrModel
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "noise_backend='numpy' requires numpy. Install it with: pip install e2llm-medsynth[numpy]"
+        )
+
+
+def _generator(rng: random.Random):
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+def _codepoints(texts: list[str]):
+    """Concatenate ``texts`` into one uint32 code point array plus text offsets."""
+    joined = "".join(texts)
+    cps = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return joined, cps, offsets
+
+
+def _split(pieces: list[str], offsets) -> list[str]:
+    bounds = offsets.tolist()
+    return ["".join(pieces[a:b]) for a, b in zip(bounds, bounds[1:])]
+
+
+class _Tables:
+    """Array form of an :class:`OcrModel` for vectorized lookups."""
+
+    def __init__(self, model: OcrModel):
+        singles = [(ch, node[""]) for ch, node in model.trie.items() if "" in node]
+        singles.sort(key=lambda item: ord(item[0]))
+        width = max((len(entry[0]) for _, entry in singles), default=1)
+        self.single_cps = np.array([ord(ch) for ch, _ in singles], dtype=np.uint32)
+        self.targets = [list(entry[0]) for _, entry in singles]
+        self.cumulative = np.full((len(singles), width), np.inf)
+        self.totals = np.zeros(len(singles))
+        for g, (_, (targets, cumulative, total)) in enumerate(singles):
+            self.cumulative[g, :len(cumulative)] = cumulative
+            self.totals[g] = total
+        self.multi_cps = np.array(
+            sorted(ord(ch) for ch, node in model.trie.items() if len(node) > ("" in node)),
+            dtype=np.uint32,
+        )
+        self.start_cps = np.array(sorted(ord(ch) for ch in model.trie), dtype=np.uint32)
+
+
+_TABLES: dict[int, tuple[OcrModel, _Tables]] = {}
+
+
+def _tables(model: OcrModel) -> _Tables:
+    cached = _TABLES.get(id(model))
+    if cached is None or cached[0] is not model:
+        cached = (model, _Tables(model))
+        _TABLES[id(model)] = cached
+    return cached[1]
+
+
+def ocr_noise(
+    texts: list[str],
+    rng: random.Random,
+    model: OcrModel,
+    error_rate: float = None,
+    space_drop_rate: float = None,
+    space_insert_rate: float = None,
+) -> list[str]:
+    """Vectorized counterpart of :func:`medsynth.distortions.apply_ocr_noise` for a batch."""
+    _require_numpy()
+    if error_rate is None:
+        error_rate = config.OCR_CHAR_ERROR_RATE
+    if space_drop_rate is None:
+        space_drop_rate = config.OCR_SPACE_DROP_RATE
+    if space_insert_rate is None:
+        space_insert_rate = config.OCR_SPACE_INSERT_RATE
+    gen = _generator(rng)
+    joined, cps, offsets = _codepoints(texts)
+    n = len(cps)
+    if n == 0:
+        return list(texts)
+
+    u_space, u_error, u_pick = gen.random((3, n))
+    is_space = cps == 32
+    drop = is_space & (u_space < space_drop_rate)
+    insert = ~is_space & (u_space < space_insert_rate)
+    error = (u_error < error_rate) & ~drop
+
+    tables = _tables(model)
+    error &= np.isin(cps, tables.start_cps)
+    multi = error & np.isin(cps, tables.multi_cps)
+    single = error & ~multi
+
+    pieces = list(joined)
+    consumed = np.zeros(n, dtype=bool)
+
+    # Multi-char capable positions: longest trie match, in text order
+    if multi.any():
+        text_end = np.repeat(offsets[1:], np.diff(offsets))
+        skip_until = 0
+        for i in np.flatnonzero(multi).tolist():
+            if i < skip_until:
+                continue
+            node = model.trie[joined[i]]
+            best = (1, node[""]) if "" in node else None
+            j, limit = i + 1, min(i + model.max_len, int(text_end[i]))
+            while j < limit:
+                node = node.get(joined[j])
+                if node is None:
+                    break
+                j += 1
+                if "" in node:
+                    best = (j - i, node[""])
+            if best is None:
+                continue
+            window, (targets, cumulative, total) = best
+            pick = u_pick[i] * total
+            k = next((k for k, upper in enumerate(cumulative) if pick <= upper), len(targets) - 1)
+            pieces[i] = targets[k]
+            if window > 1:
+                pieces[i + 1:i + window] = [""] * (window - 1)
+                consumed[i + 1:i + window] = True
+                skip_until = i + window
+
+    # Single-char confusions via lookup tables
+    single &= ~consumed
+    if single.any():
+        positions = np.flatnonzero(single)
+        groups = np.searchsorted(tables.single_cps, cps[positions])
+        picks = u_pick[positions] * tables.totals[groups]
+        choice = (picks[:, None] > tables.cumulative[groups]).sum(axis=1)
+        for i, g, k in zip(positions.tolist(), groups.tolist(), choice.tolist()):
+            targets = tables.targets[g]
+            pieces[i] = targets[min(k, len(targets) - 1)]
+
+    for i in np.flatnonzero(drop).tolist():
+        pieces[i] = ""
+    for i in np.flatnonzero(insert & ~consumed).tolist():
+        pieces[i] = " " + pieces[i]
+
+    return _split(pieces, offsets)
+
+
+def digital_typos(texts: list[str], rng: random.Random, rate: float = None) -> list[str]:
+    """Vectorized counterpart of :func:`medsynth.distortions.apply_digital_typos` for a batch."""
+    _require_numpy()
+    if rate is None:
+        rate = config.DIGITAL_TYPO_RATE
+    gen = _generator(rng)
+    _, cps, offsets = _codepoints(texts)
+    n = len(cps)
+    if n == 0:
+        return list(texts)
+
+    u_typo, u_kind = gen.random((2, n))
+    whitespace = (cps == 32) | (cps == 10) | (cps == 9)
+    typo = (u_typo < rate) & ~whitespace
+    # 0 = dropped char, 1 = unchanged, 2 = doubled char
+    repeats = np.where(typo, np.where(u_kind < 0.5, 0, 2), 1)
+    out = np.repeat(cps, repeats).astype("<u4")
+    new_offsets = np.concatenate(([0], np.cumsum(repeats)))[offsets]
+    joined = out.tobytes().decode("utf-32-le")
+    bounds = new_offsets.tolist()
+    return [joined[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def ocr_fields(values: list[str], rng: random.Random, model: OcrModel, rate: float = None) -> list[str]:
+    """Vectorized counterpart of :func:`medsynth.distortions.apply_ocr_to_field` for a batch."""
+    _require_numpy()
+    if rate is None:
+        rate = config.OCR_FIELD_ERROR_RATE
+    gen = _generator(rng)
+    joined, cps, offsets = _codepoints(values)
+    n = len(cps)
+    if n == 0:
+        return list(values)
+
+    hits = np.flatnonzero(gen.random(n) < rate)
+    if hits.size == 0:
+        return list(values)
+    char_map = model.field_map
+    pieces = list(joined)
+    for i in hits.tolist():
+        pieces[i] = char_map.get(pieces[i], pieces[i])
+    return _split(pieces, offsets)
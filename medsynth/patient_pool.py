@@ -0,0 +1,184 @@
+"""Compact, array-backed patient pool for very large batch runs.
+
+Batch mode holds the whole patient pool until every free text is written,
+and as a list of dicts each patient costs a ~16-key dict plus its own
+conditions, medications and ICD-10 lists. :class:`PatientPool` stores the
+pool column by column instead:
+
+- scalar fields as ``array("I")`` codes into a per-column table of interned
+  values (city, gender, blood type, ... repeat a lot); a column whose values
+  turn out to be mostly distinct (ID, full name, address) switches to a
+  plain list of values, where interning would only add overhead;
+- list fields as one flat ``array("I")`` of interned element codes plus an
+  offsets array, which keeps each patient's order.
+
+``pool[i]`` (and iteration) returns a :class:`PatientRow`, a read-only
+mapping view that builds the values on access, with the keys and key order
+of the original dict. It stands in for the patient dict everywhere a
+patient is read (structured fields, contradictions, prompts, ground truth).
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+
+# A column stays interned until it holds more than _MAX_DISTINCT distinct
+# values and they are more than _DISTINCT_SHARE of its rows: dates of birth
+# (~33k possible) stay interned in any pool size, IDs switch to plain values
+_MAX_DISTINCT = 1 << 16
+_DISTINCT_SHARE = 0.5
+
+
+class _Column:
+    """One scalar field: interned codes, or plain values once mostly distinct."""
+
+    __slots__ = ("values", "lookup", "codes")
+
+    def __init__(self, rows: int):
+        self.values: list = [None]
+        self.lookup: dict | None = {}
+        # Rows without this key (none so far in practice) point at the None slot
+        self.codes: array | None = array("I", bytes(4 * rows))
+
+    def append(self, value):
+        if self.codes is None:
+            self.values.append(value)
+            return
+        self.codes.append(_intern(self.values, self.lookup, value))
+        distinct = len(self.values)
+        if distinct > _MAX_DISTINCT and distinct > len(self.codes) * _DISTINCT_SHARE:
+            values = self.values
+            self.values = [values[c] for c in self.codes]
+            self.lookup = self.codes = None
+
+    def get(self, i: int):
+        if self.codes is None:
+            return self.values[i]
+        return self.values[self.codes[i]]
+
+
+class _ListColumn:
+    """One list field: a flat array of interned element codes plus offsets."""
+
+    __slots__ = ("values", "lookup", "flat", "offsets")
+
+    def __init__(self, rows: int):
+        self.values: list = []
+        self.lookup: dict = {}
+        self.flat = array("I")
+        self.offsets = array("I", bytes(4 * (rows + 1)))
+
+    def append(self, value: list):
+        values, lookup = self.values, self.lookup
+        self.flat.extend(_intern(values, lookup, v) for v in value)
+        self.offsets.append(len(self.flat))
+
+    def get(self, i: int) -> list:
+        values = self.values
+        return [values[c] for c in self.flat[self.offsets[i]:self.offsets[i + 1]]]
+
+
+def _intern(values: list, lookup: dict, value) -> int:
+    """Code of ``value`` in ``values``, adding it on first sight.
+
+    Keyed by value, plus its type when equal values of different types meet
+    (``True == 1``), so a row view gives back exactly what was stored.
+    """
+    try:
+        code = lookup.get(value)
+        if code is not None and type(values[code]) is type(value):
+            return code
+        key = value if code is None else (type(value), value)
+        code = lookup.get(key)
+    except TypeError:
+        raise TypeError(f"cannot store unhashable {type(value).__name__} in a PatientPool") from None
+    if code is None:
+        code = lookup[key] = len(values)
+        values.append(value)
+    return code
+
+
+class PatientPool:
+    """Array-backed sequence of patients; ``pool[i]`` is a :class:`PatientRow`.
+
+    Build it from patient dicts (``PatientPool(iter_patients(...))``) or
+    with :meth:`append`. Patients are read-only once added.
+    """
+
+    def __init__(self, patients: Iterable[dict] = ()):
+        self._columns: dict[str, _Column | _ListColumn] = {}
+        self._shapes: list[tuple[str, ...]] = []   # distinct key tuples, in key order
+        self._shape_keys: list[frozenset[str]] = []
+        self._shape_codes: dict[tuple[str, ...], int] = {}
+        self._shape = array("H")                     # per row: index into _shapes
+        for patient in patients:
+            self.append(patient)
+
+    def append(self, patient: dict):
+        keys = tuple(patient)
+        shape = self._shape_codes.get(keys)
+        if shape is None:
+            shape = self._shape_codes[keys] = len(self._shapes)
+            self._shapes.append(keys)
+            self._shape_keys.append(frozenset(keys))
+        rows = len(self._shape)
+        for key, value in patient.items():
+            column = self._columns.get(key)
+            if column is None:
+                column = self._columns[key] = (_ListColumn if isinstance(value, list) else _Column)(rows)
+            elif isinstance(value, list) is not isinstance(column, _ListColumn):
+                raise TypeError(f"patient field {key!r} mixes list and non-list values")
+            column.append(value)
+        if len(patient) < len(self._columns):
+            # Keep every column one entry per row for patients without the key
+            for key, column in self._columns.items():
+                if key not in patient:
+                    column.append([] if isinstance(column, _ListColumn) else None)
+        self._shape.append(shape)
+
+    def __len__(self) -> int:
+        return len(self._shape)
+
+    def __getitem__(self, i: int) -> "PatientRow":
+        n = len(self._shape)
+        if not -n <= i < n:
+            raise IndexError("patient index out of range")
+        return PatientRow(self, i % n)
+
+    def __iter__(self) -> Iterator["PatientRow"]:
+        for i in range(len(self._shape)):
+            yield PatientRow(self, i)
+
+
+class PatientRow(Mapping):
+    """Read-only mapping view of one patient of a :class:`PatientPool`.
+
+    Equal to (and iterates like) the dict it was built from; list fields are
+    returned as new lists on every access.
+    """
+
+    __slots__ = ("_pool", "_i")
+
+    def __init__(self, pool: PatientPool, i: int):
+        self._pool = pool
+        self._i = i
+
+    def __getitem__(self, key: str):
+        pool, i = self._pool, self._i
+        if key in pool._shape_keys[pool._shape[i]]:
+            return pool._columns[key].get(i)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        pool, i = self._pool, self._i
+        if key in pool._shape_keys[pool._shape[i]]:
+            return pool._columns[key].get(i)
+        return default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pool._shapes[self._pool._shape[self._i]])
+
+    def __len__(self) -> int:
+        return len(self._pool._shapes[self._pool._shape[self._i]])
+
+    def __repr__(self) -> str:
+        return f"PatientRow({dict(self)!r})"
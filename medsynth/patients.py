@@ -1,57 +1,89 @@
 """Generate ground-truth patient pool."""
 
 import random
+from collections.abc import Iterator
 from datetime import date, timedelta
 from . import config
 from .locales.base import LocaleConfig
+from .seeding import check_determinism, derive_rng
 
 
-def generate_patients(num_patients: int, seed: int, locale: LocaleConfig) -> list[dict]:
+def generate_patients(
+    num_patients: int,
+    seed: int,
+    locale: LocaleConfig,
+    determinism: str = config.DEFAULT_DETERMINISM,
+) -> list[dict]:
     """Return a list of ground-truth patient profiles."""
+    return list(iter_patients(num_patients, seed, locale, determinism))
+
+
+def iter_patients(
+    num_patients: int,
+    seed: int,
+    locale: LocaleConfig,
+    determinism: str = config.DEFAULT_DETERMINISM,
+    start: int = 0,
+) -> Iterator[dict]:
+    """Yield ground-truth patient profiles ``start .. num_patients - 1``.
+
+    Produces exactly the same sequence as :func:`generate_patients` without
+    holding the whole pool in memory. In v1 mode all patients share one RNG,
+    so the ones before ``start`` are still generated and discarded; in v2
+    mode each patient has its own derived RNG and is generated directly.
+    """
+    if check_determinism(determinism) == "v2":
+        for p_idx in range(start, num_patients):
+            yield generate_patient(derive_rng(seed, "patient", p_idx), locale)
+        return
+
     rng = random.Random(seed)
-    patients = []
-
-    for _ in range(num_patients):
-        gender = rng.choice(["male", "female"])
-        name = locale.generate_name(gender, rng)
-        dob = config.DOB_START + timedelta(days=rng.randint(0, config.DOB_RANGE_DAYS))
-        age = (config.DOC_DATE_END - dob).days // 365
-        num_conditions = rng.randint(0, config.MAX_CONDITIONS_PER_PATIENT)
-        conditions = rng.sample(locale.conditions, min(num_conditions, len(locale.conditions)))
-        num_meds = rng.randint(0, config.MAX_MEDICATIONS_PER_PATIENT)
-        medications = rng.sample(locale.medications, min(num_meds, len(locale.medications)))
-
-        city = rng.choice(locale.cities)
-        street = rng.choice(locale.streets)
-        house_num = rng.randint(1, config.MAX_HOUSE_NUMBER)
-
-        # Generate ID here to preserve RNG sequence (original position in dict literal).
-        # Spread name dict so locale-specific keys (e.g. apellido_materno) reach ID generators.
-        partial_patient = {
-            **name,
-            "gender": gender,
-            "date_of_birth": dob.isoformat(),
-            "age": age,
-            "city": city,
-        }
-        patient_id = locale.generate_id(partial_patient, rng)
-
-        patient = {
-            "id": patient_id,
-            **name,
-            "gender": gender,
-            "date_of_birth": dob.isoformat(),
-            "age": age,
-            "address": locale.address_format.format(street=street, num=house_num, city=city),
-            "city": city,
-            "conditions": conditions,
-            "icd10_codes": [locale.icd10_codes[c] for c in conditions if c in locale.icd10_codes],
-            "medications": medications,
-            "smoking": rng.random() < config.SMOKING_PREVALENCE,
-            "blood_type": rng.choice(config.BLOOD_TYPES),
-            "occupation": rng.choice(locale.occupations),
-            "emergency_contact": locale.emergency_contact_name(rng),
-        }
-        patients.append(patient)
-
-    return patients
+    for p_idx in range(num_patients):
+        patient = generate_patient(rng, locale)
+        if p_idx >= start:
+            yield patient
+
+
+def generate_patient(rng: random.Random, locale: LocaleConfig) -> dict:
+    """Draw one ground-truth patient profile from ``rng``."""
+    gender = rng.choice(["male", "female"])
+    name = locale.generate_name(gender, rng)
+    dob = config.DOB_START + timedelta(days=rng.randint(0, config.DOB_RANGE_DAYS))
+    age = (config.DOC_DATE_END - dob).days // 365
+    num_conditions = rng.randint(0, config.MAX_CONDITIONS_PER_PATIENT)
+    conditions = rng.sample(locale.conditions, min(num_conditions, len(locale.conditions)))
+    num_meds = rng.randint(0, config.MAX_MEDICATIONS_PER_PATIENT)
+    medications = rng.sample(locale.medications, min(num_meds, len(locale.medications)))
+
+    city = rng.choice(locale.cities)
+    street = rng.choice(locale.streets)
+    house_num = rng.randint(1, config.MAX_HOUSE_NUMBER)
+
+    # Generate ID here to preserve RNG sequence (original position in dict literal).
+    # Spread name dict so locale-specific keys (e.g. apellido_materno) reach ID generators.
+    partial_patient = {
+        **name,
+        "gender": gender,
+        "date_of_birth": dob.isoformat(),
+        "age": age,
+        "city": city,
+    }
+    patient_id = locale.generate_id(partial_patient, rng)
+
+    patient = {
+        "id": patient_id,
+        **name,
+        "gender": gender,
+        "date_of_birth": dob.isoformat(),
+        "age": age,
+        "address": locale.address_format.format(street=street, num=house_num, city=city),
+        "city": city,
+        "conditions": conditions,
+        "icd10_codes": [locale.icd10_codes[c] for c in conditions if c in locale.icd10_codes],
+        "medications": medications,
+        "smoking": rng.random() < config.SMOKING_PREVALENCE,
+        "blood_type": rng.choice(config.BLOOD_TYPES),
+        "occupation": rng.choice(locale.occupations),
+        "emergency_contact": locale.emergency_contact_name(rng),
+    }
+    return patient
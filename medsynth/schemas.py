@@ -6,111 +6,186 @@ concept (e.g. age) maps to different field names, types, and conventions
 across facilities.
 """
 
+from datetime import date as _date
+
 from . import config
 from .locales.base import LocaleConfig
 
 
-def _age_value(patient: dict, facility: dict, rng, doc_date: str) -> object:
-    """Return age in the facility's convention, computed from DOB + doc date."""
-    from datetime import date as _date
-    dob = _date.fromisoformat(patient["date_of_birth"])
-    d = _date.fromisoformat(doc_date)
-    age = (d - dob).days // 365
-    if facility.get("age_format") == "range":
-        bucket = config.AGE_RANGE_BUCKET
-        low = (age // bucket) * bucket
-        return f"{low}-{low + bucket}"
-    return age
+class DocBuilder:
+    """:func:`build_structured_fields` compiled for one facility x doc type.
+
+    Field names, the ID/age/date conventions of the facility and the lab
+    keys are resolved once; :meth:`build` then only reads the patient and
+    draws from ``rng``, in the same order as the generic builder always did.
+    Build one with :func:`doc_builder`, which caches it on the locale.
+    """
+
+    __slots__ = ("doc_type", "fields", "to_id", "age_range", "date_format", "date_strings", "facility_name",
+                 "departments", "urgency_values", "fallback", "lab_keys", "lab_tests", "extra")
+
+    def __init__(self, facility_id: str, doc_type: str, locale: LocaleConfig):
+        fnames = locale.field_names[facility_id]
+        facility = locale.facility_by_id[facility_id]
+        self.doc_type = doc_type
+        self.fields = tuple(fnames.get(concept) for concept in _CONCEPTS)
+        self.to_id = _ID_TYPES.get(facility["id_type"])
+        self.age_range = facility.get("age_format") == "range"
+        self.date_format = facility["date_format"]
+        self.date_strings = _date_strings(self.date_format)
+        self.facility_name = facility["name"]
+        self.departments = locale.departments
+        self.urgency_values = locale.urgency_values
+        self.fallback = locale.fallback_strings.get(
+            "referral_default" if doc_type == "referral" else "no_diagnosis", "")
+        self.lab_keys = tuple(fnames.get(concept, default) for concept, default in _LAB_KEYS)
+        # (name, unit, ref_range, normal, abnormal), a range being (low, high, is_float);
+        # sampled in place of locale.lab_tests (same length, so the same picks)
+        self.lab_tests = [
+            (t["name"], t["unit"], f"{t['normal_range'][0]}-{t['normal_range'][1]}",
+             _lab_range(t["normal_range"]), _lab_range(t["abnormal_range"]))
+            for t in locale.lab_tests
+        ]
+        self.extra = {"discharge": self._diagnosis, "visit": self._diagnosis,
+                      "lab": self._lab, "referral": self._referral}.get(doc_type)
+
+    def build(self, patient: dict, doc_date: int, rng) -> dict:
+        """Build the structured fields of one document dated ``doc_date`` (a day ordinal)."""
+        (f_id, f_name, f_age, f_gender, f_date, f_facility, f_address, f_smoking,
+         f_blood_type, f_occupation, f_conditions, f_medications, f_icd10) = self.fields[:13]
+        doc = {}
+
+        # Universal fields
+        if f_id is not None:
+            raw = patient["id"]
+            value = raw if self.to_id is None else self.to_id(raw)
+            if value is not None:
+                doc[f_id] = value
+        if f_name is not None and patient["full_name"] is not None:
+            doc[f_name] = patient["full_name"]
+        if f_age is not None:
+            age = (doc_date - _date.fromisoformat(patient["date_of_birth"]).toordinal()) // 365
+            if self.age_range:
+                bucket = config.AGE_RANGE_BUCKET
+                low = (age // bucket) * bucket
+                age = f"{low}-{low + bucket}"
+            doc[f_age] = age
+        if f_gender is not None and patient["gender"] is not None:
+            doc[f_gender] = patient["gender"]
+        if f_date is not None:
+            date_string = self.date_strings.get(doc_date)
+            if date_string is None:
+                date_string = self.date_strings[doc_date] = _date.fromordinal(doc_date).strftime(self.date_format)
+            doc[f_date] = date_string
+        if f_facility is not None and self.facility_name is not None:
+            doc[f_facility] = self.facility_name
+        if f_address is not None and patient["address"] is not None:
+            doc[f_address] = patient["address"]
+
+        # Conditionally present fields
+        if f_smoking is not None and patient["smoking"] is not None:
+            doc[f_smoking] = patient["smoking"]
+        for field, key in ((f_blood_type, "blood_type"), (f_occupation, "occupation"),
+                           (f_conditions, "conditions"), (f_medications, "medications"),
+                           (f_icd10, "icd10_codes")):
+            if field is not None:
+                value = patient.get(key)
+                if value is not None:
+                    doc[field] = value
+
+        # Doc-type-specific fields
+        if self.extra is not None:
+            self.extra(doc, patient, rng)
+        doc["doc_type"] = self.doc_type
+        return doc
+
+    def _set(self, doc: dict, k: int, value):
+        field = self.fields[k]
+        if field is not None and value is not None:
+            doc[field] = value
 
+    def _diagnosis(self, doc: dict, patient: dict, rng):
+        self._set(doc, _DEPARTMENT, rng.choice(self.departments))
+        self._set(doc, _DIAGNOSIS, rng.choice(patient["conditions"]) if patient["conditions"] else self.fallback)
 
-def _id_value(patient: dict, facility: dict) -> object:
-    """Return patient ID in the facility's storage type."""
-    raw = patient["id"]
-    if facility["id_type"] == "int":
-        return int(raw)
-    if facility["id_type"] == "float":
-        return float(int(raw))
-    return raw
+    def _referral(self, doc: dict, patient: dict, rng):
+        self._set(doc, _REFERRAL_TO, rng.choice(self.departments))
+        self._set(doc, _REFERRAL_REASON,
+                  rng.choice(patient["conditions"]) if patient["conditions"] else self.fallback)
+        self._set(doc, _URGENCY, rng.choice(self.urgency_values))
+
+    def _lab(self, doc: dict, patient: dict, rng):
+        key_name, key_value, key_unit, key_ref, key_flag = self.lab_keys
+        num_tests = rng.randint(config.MIN_LAB_TESTS_PER_DOC, config.MAX_LAB_TESTS_PER_DOC)
+        tests = rng.sample(self.lab_tests, min(num_tests, len(self.lab_tests)))
+        abnormal_rate = config.LAB_ABNORMAL_RATE
+        lab_results = []
+        for name, unit, ref_range, normal, abnormal in tests:
+            is_abnormal = rng.random() < abnormal_rate
+            low, high, is_float = abnormal if is_abnormal else normal
+            value = round(rng.uniform(low, high), 1) if is_float else rng.randint(low, high)
+            lab_results.append({
+                key_name: name,
+                key_value: value,
+                key_unit: unit,
+                key_ref: ref_range,
+                key_flag: "H" if is_abnormal else "N",
+            })
+        doc["lab_results"] = lab_results
+
+
+# Concept order of DocBuilder.fields; the first 13 are set for every doc type
+_CONCEPTS = (
+    "patient_id", "patient_name", "age", "gender", "date", "facility", "address",
+    "smoking", "blood_type", "occupation", "conditions", "medications", "icd10",
+    "department", "diagnosis", "referral_to", "referral_reason", "urgency",
+)
+_DEPARTMENT, _DIAGNOSIS, _REFERRAL_TO, _REFERRAL_REASON, _URGENCY = range(13, 18)
+_LAB_KEYS = (("lab_test_name", "test_name"), ("lab_value", "result"), ("lab_unit", "units"),
+             ("lab_reference", "ref_range"), ("lab_flag", "flag"))
+_ID_TYPES = {"int": int, "float": lambda raw: float(int(raw))}
+
+
+# date_format -> {day ordinal: formatted date}, shared by every facility using
+# the format; a run only ever formats the ~1,100 days of the doc date range
+_DATE_STRINGS: dict[str, dict[int, str]] = {}
+
+
+def _date_strings(date_format: str) -> dict[int, str]:
+    return _DATE_STRINGS.setdefault(date_format, {})
 
 
-def _format_date(dt_str: str, facility: dict) -> str:
-    """Format a date string according to facility convention."""
-    from datetime import datetime
-    dt = datetime.fromisoformat(dt_str)
-    return dt.strftime(facility["date_format"])
+def _lab_range(r) -> tuple:
+    if isinstance(r[0], float):
+        return r[0], r[1], True
+    return int(r[0]), int(r[1]), False
+
+
+def doc_builder(locale: LocaleConfig, facility_id: str, doc_type: str) -> DocBuilder:
+    """Return the :class:`DocBuilder` for a facility x doc type (cached on ``locale``)."""
+    key = (facility_id, doc_type)
+    builder = locale.doc_builders.get(key)
+    if builder is None:
+        builder = locale.doc_builders[key] = DocBuilder(facility_id, doc_type, locale)
+    return builder
 
 
 def build_structured_fields(
     patient: dict,
     facility_id: str,
     doc_type: str,
-    doc_date: str,
+    doc_date: str | int,
     rng,
     locale: LocaleConfig,
 ) -> dict:
-    """Build the structured (non-free-text) fields for a document."""
-    fnames = locale.field_names[facility_id]
-    facility = locale.facility_by_id[facility_id]
-    doc = {}
-
-    def _set(concept: str, value):
-        field = fnames.get(concept)
-        if field is not None and value is not None:
-            doc[field] = value
-
-    # Universal fields
-    _set("patient_id", _id_value(patient, facility))
-    _set("patient_name", patient["full_name"])
-    _set("age", _age_value(patient, facility, rng, doc_date))
-    _set("gender", patient["gender"])
-    _set("date", _format_date(doc_date, facility))
-    _set("facility", facility["name"])
-    _set("address", patient["address"])
-
-    # Conditionally present fields
-    _set("smoking", patient["smoking"])
-    _set("blood_type", patient.get("blood_type"))
-    _set("occupation", patient.get("occupation"))
-    _set("conditions", patient.get("conditions"))
-    _set("medications", patient.get("medications"))
-    _set("icd10", patient.get("icd10_codes"))
-
-    # Doc-type-specific fields
-    if doc_type == "discharge":
-        _set("department", rng.choice(locale.departments))
-        _set("diagnosis", rng.choice(patient["conditions"]) if patient["conditions"] else locale.fallback_strings.get("no_diagnosis", ""))
-
-    elif doc_type == "lab":
-        num_tests = rng.randint(config.MIN_LAB_TESTS_PER_DOC, config.MAX_LAB_TESTS_PER_DOC)
-        tests = rng.sample(locale.lab_tests, min(num_tests, len(locale.lab_tests)))
-        lab_results = []
-        for test in tests:
-            is_abnormal = rng.random() < config.LAB_ABNORMAL_RATE
-            r = test["abnormal_range"] if is_abnormal else test["normal_range"]
-            if isinstance(r[0], float):
-                value = round(rng.uniform(r[0], r[1]), 1)
-            else:
-                value = rng.randint(int(r[0]), int(r[1]))
-            lab_results.append({
-                fnames.get("lab_test_name", "test_name"): test["name"],
-                fnames.get("lab_value", "result"): value,
-                fnames.get("lab_unit", "units"): test["unit"],
-                fnames.get("lab_reference", "ref_range"): f"{test['normal_range'][0]}-{test['normal_range'][1]}",
-                fnames.get("lab_flag", "flag"): "H" if is_abnormal else "N",
-            })
-        doc["lab_results"] = lab_results
-
-    elif doc_type == "visit":
-        _set("department", rng.choice(locale.departments))
-        _set("diagnosis", rng.choice(patient["conditions"]) if patient["conditions"] else locale.fallback_strings.get("no_diagnosis", ""))
-
-    elif doc_type == "referral":
-        _set("referral_to", rng.choice(locale.departments))
-        _set("referral_reason", rng.choice(patient["conditions"]) if patient["conditions"] else locale.fallback_strings.get("referral_default", ""))
-        _set("urgency", rng.choice(locale.urgency_values))
-
-    doc["doc_type"] = doc_type
-    return doc
+    """Build the structured (non-free-text) fields for a document.
+
+    ``doc_date`` is an ISO date string (``"2024-03-01"``) or, as the
+    generator passes it, a day ordinal (:meth:`datetime.date.toordinal`).
+    """
+    if isinstance(doc_date, str):
+        doc_date = _date.fromisoformat(doc_date).toordinal()
+    return doc_builder(locale, facility_id, doc_type).build(patient, doc_date, rng)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,91 @@
+"""Seed derivation for order-independent ("v2") determinism.
+
+In v1 mode the whole pipeline draws from two shared ``random.Random``
+streams, so document N depends on every draw made before it. In v2 mode every
+patient and every document gets its own RNG derived from a stable key such as
+``(seed, "doc", patient_index, facility_id, doc_type)``; any subset of
+patients can then be generated on its own and still match a full run.
+"""
+
+import hashlib
+import random
+from . import config
+
+
+def derive_seed(seed: int, *key) -> int:
+    """Return a stable 64-bit seed for ``key`` under ``seed``.
+
+    Keys are hashed via their ``repr``, so only ints and strings should be
+    used; the result does not depend on ``PYTHONHASHSEED`` or the process.
+    """
+    digest = hashlib.blake2b(repr((seed, *key)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def derive_rng(seed: int, *key) -> random.Random:
+    """Return a fresh ``random.Random`` seeded from ``(seed, *key)``."""
+    return random.Random(derive_seed(seed, *key))
+
+
+def rng_state_to_json(rng: random.Random) -> list:
+    """``rng.getstate()`` as a JSON-serializable list."""
+    version, internal, gauss_next = rng.getstate()
+    return [version, list(internal), gauss_next]
+
+
+def rng_state_from_json(state: list) -> tuple:
+    """Inverse of :func:`rng_state_to_json`, ready for ``rng.setstate``."""
+    version, internal, gauss_next = state
+    return version, tuple(internal), gauss_next
+
+
+def check_determinism(determinism: str) -> str:
+    """Validate a determinism mode name. Raises ValueError for unknown modes."""
+    if determinism not in config.DETERMINISM_MODES:
+        available = ", ".join(config.DETERMINISM_MODES)
+        raise ValueError(f"Unknown determinism mode '{determinism}'. Available: {available}")
+    return determinism
+
+
+class RngPlan:
+    """Hands out the RNG for each generation step under a determinism mode.
+
+    v1 returns the single shared document RNG (``seed + 1``) for every step,
+    reproducing the historical corpus. v2 derives one RNG per patient for
+    facility/doc-type assignment, one per document for structured fields and
+    distortions, and one per document for free-text noise.
+
+    ``noise_backend`` selects how OCR/typo noise draws from those RNGs
+    (``"python"``: one draw per character; ``"numpy"``: vectorized, see
+    :mod:`medsynth.noise_numpy` for its own determinism contract).
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        determinism: str = config.DEFAULT_DETERMINISM,
+        noise_backend: str = config.DEFAULT_NOISE_BACKEND,
+    ):
+        if noise_backend not in config.NOISE_BACKENDS:
+            available = ", ".join(config.NOISE_BACKENDS)
+            raise ValueError(f"Unknown noise backend '{noise_backend}'. Available: {available}")
+        self.seed = seed
+        self.determinism = check_determinism(determinism)
+        self.noise_backend = noise_backend
+        self.shared = random.Random(seed + 1)  # offset from patient seed to avoid RNG correlation
+
+    @property
+    def v2(self) -> bool:
+        return self.determinism == "v2"
+
+    def assignment(self, p_idx: int) -> random.Random:
+        """RNG for choosing a patient's facilities and doc types."""
+        return derive_rng(self.seed, "assign", p_idx) if self.v2 else self.shared
+
+    def document(self, p_idx: int, facility_id: str, doc_type: str) -> random.Random:
+        """RNG for one document's structured fields and distortions."""
+        return derive_rng(self.seed, "doc", p_idx, facility_id, doc_type) if self.v2 else self.shared
+
+    def freetext(self, p_idx: int, facility_id: str, doc_type: str) -> random.Random:
+        """RNG for one document's free-text noise."""
+        return derive_rng(self.seed, "text", p_idx, facility_id, doc_type) if self.v2 else self.shared
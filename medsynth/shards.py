@@ -0,0 +1,204 @@
+"""Node-level sharding: split one logical corpus across machines.
+
+Shard ``K/N`` (1-based) owns a contiguous slice of the patient range. With v2
+determinism every patient's documents depend only on ``(seed, patient_index)``,
+so the shards are disjoint slices of the same corpus: concatenating each
+index file across shards in shard order reproduces a single-node run.
+
+Every shard writes a small JSON manifest next to its NDJSON files; run
+``medsynth-verify-shards DIR...`` (or :func:`verify_shards`) to check that all
+N manifests are present and consistent before loading.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+
+MANIFEST_FORMAT = 1
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse ``"K/N"`` into ``(K, N)``. Raises ValueError unless 1 <= K <= N."""
+    try:
+        k, n = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}'. Expected K/N, e.g. 1/4") from None
+    if n < 1 or not 1 <= k <= n:
+        raise ValueError(f"Invalid shard '{spec}'. Need 1 <= K <= N")
+    return k, n
+
+
+def split_range(total: int, parts: int) -> list[tuple[int, int]]:
+    """Split ``range(total)`` into at most ``parts`` contiguous ``(start, stop)`` ranges."""
+    parts = max(1, min(parts, total))
+    size, extra = divmod(total, parts)
+    ranges, start = [], 0
+    for k in range(parts):
+        stop = start + size + (1 if k < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def shard_range(num_patients: int, shard: tuple[int, int]) -> tuple[int, int]:
+    """Return the ``(start, stop)`` patient range owned by ``shard``.
+
+    Unlike :func:`split_range`, always yields N ranges (possibly empty), so
+    every shard of a small corpus still exists and writes a manifest.
+    """
+    k, n = shard
+    size, extra = divmod(num_patients, n)
+    start = (k - 1) * size + min(k - 1, extra)
+    return start, start + size + (1 if k - 1 < extra else 0)
+
+
+def manifest_name(shard: tuple[int, int]) -> str:
+    k, n = shard
+    return f"medsynth-shard-{k:05d}-of-{n:05d}.json"
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_shard_manifest(
+    output_dir: str,
+    shard: tuple[int, int],
+    patient_range: tuple[int, int],
+    counts: dict[str, int],
+    params: dict,
+) -> str:
+    """Write the manifest for one finished shard and return its path.
+
+    ``params`` holds the corpus-defining settings (locale, seed, num_patients,
+    determinism, ...) that must match across shards.
+    """
+    from . import __version__
+
+    files = {}
+    for idx_name, count in counts.items():
+        filename = f"{idx_name}.ndjson"
+        path = os.path.join(output_dir, filename)
+        files[filename] = {
+            "docs": count,
+            "bytes": os.path.getsize(path),
+            "sha256": _sha256(path),
+        }
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "medsynth_version": __version__,
+        "shard": shard[0],
+        "num_shards": shard[1],
+        "patients": list(patient_range),
+        "params": params,
+        "docs": sum(counts.values()),
+        "files": files,
+    }
+    path = os.path.join(output_dir, manifest_name(shard))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    return path
+
+
+def _find_manifests(paths: list[str]) -> list[str]:
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(glob.glob(os.path.join(path, "medsynth-shard-*-of-*.json"))))
+        else:
+            found.append(path)
+    return found
+
+
+def verify_shards(paths: list[str], check_files: bool = True) -> dict:
+    """Check that a complete, consistent set of shard manifests is present.
+
+    ``paths`` may be manifest files or directories containing them. With
+    ``check_files`` the NDJSON files next to each manifest are re-hashed.
+    Returns a summary dict; raises ValueError describing the first problem.
+    """
+    manifests = []
+    for path in _find_manifests(paths):
+        with open(path, encoding="utf-8") as f:
+            manifests.append((path, json.load(f)))
+    if not manifests:
+        raise ValueError("No shard manifests found")
+
+    first_path, first = manifests[0]
+    num_shards = first["num_shards"]
+    by_shard = {}
+    for path, m in manifests:
+        for key in ("format", "medsynth_version", "num_shards", "params"):
+            if m[key] != first[key]:
+                raise ValueError(f"{path}: {key} {m[key]!r} differs from {first_path}: {first[key]!r}")
+        if m["shard"] in by_shard:
+            raise ValueError(f"Shard {m['shard']}/{num_shards} found twice: {by_shard[m['shard']][0]} and {path}")
+        by_shard[m["shard"]] = (path, m)
+
+    missing = [k for k in range(1, num_shards + 1) if k not in by_shard]
+    if missing:
+        raise ValueError(f"Missing shards: {', '.join(f'{k}/{num_shards}' for k in missing)}")
+
+    expected_start = 0
+    for k in range(1, num_shards + 1):
+        path, m = by_shard[k]
+        start, stop = m["patients"]
+        if start != expected_start:
+            raise ValueError(f"{path}: patient range starts at {start}, expected {expected_start}")
+        expected_start = stop
+        if check_files:
+            base = os.path.dirname(path)
+            for filename, info in m["files"].items():
+                file_path = os.path.join(base, filename)
+                if not os.path.exists(file_path):
+                    raise ValueError(f"{path}: missing {filename}")
+                if _sha256(file_path) != info["sha256"]:
+                    raise ValueError(f"{path}: checksum mismatch for {filename}")
+    num_patients = first["params"].get("num_patients")
+    if num_patients is not None and expected_start != num_patients:
+        raise ValueError(f"Shards cover {expected_start} patients, expected {num_patients}")
+
+    counts: dict[str, int] = {}
+    for k in range(1, num_shards + 1):
+        for filename, info in by_shard[k][1]["files"].items():
+            idx_name = filename.removesuffix(".ndjson")
+            counts[idx_name] = counts.get(idx_name, 0) + info["docs"]
+    return {
+        "num_shards": num_shards,
+        "params": first["params"],
+        "docs": sum(counts.values()),
+        "counts": counts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Verify that all shard manifests of a sharded MedSynth corpus are present and consistent"
+    )
+    parser.add_argument("paths", nargs="+", help="Shard output directories or manifest files")
+    parser.add_argument("--skip-checksums", action="store_true",
+                        help="Only compare manifests; do not re-hash NDJSON files")
+    args = parser.parse_args()
+
+    try:
+        summary = verify_shards(args.paths, check_files=not args.skip_checksums)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"OK: {summary['num_shards']} shards, {summary['docs']} documents "
+          f"across {len(summary['counts'])} indices.")
+    for name, count in sorted(summary["counts"].items()):
+        print(f"  {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Text pool: reuse LLM texts across patients with equivalent prompts.
+
+The pool renders each clinical prompt with placeholders for the patient's
+name and age (:data:`NAME_PLACEHOLDER`, :data:`AGE_PLACEHOLDER`, and
+:data:`STATED_AGE_PLACEHOLDER` for the age an age contradiction tells the
+LLM to state), so equivalent patients share one *prompt class*. Each class
+gets at most ``variants`` LLM texts; every document maps to one of them and
+the placeholders are filled in locally.
+
+Because condition and medication lists are drawn at random, name and age
+alone rarely make two prompts equal. Adding ``"conditions"`` and
+``"medications"`` to ``fields`` also replaces non-empty lists with a
+placeholder, which is what collapses most prompts into a few classes (at the
+cost of texts that list the patient's history rather than weave it in).
+
+The variant a document uses is derived from ``(seed, class, patient index,
+facility, doc type)`` alone, so it does not depend on generation order,
+concurrency, workers or shards. Contradictions stay in the prompt class
+(smoking and medication texts are part of it, the stated age becomes a
+placeholder), so every document still carries its own contradiction.
+"""
+
+from .locales.base import LocaleConfig
+from .seeding import derive_seed
+
+NAME_PLACEHOLDER = "[[NAME]]"
+AGE_PLACEHOLDER = "[[AGE]]"
+STATED_AGE_PLACEHOLDER = "[[STATED_AGE]]"
+CONDITIONS_PLACEHOLDER = "[[CONDITIONS]]"
+MEDICATIONS_PLACEHOLDER = "[[MEDICATIONS]]"
+
+POOL_FIELDS = ("name", "age", "conditions", "medications")
+DEFAULT_POOL_FIELDS = ("name", "age")
+
+
+class TextPool:
+    """Maps free-text items to ``(prompt class, variant)`` and fills placeholders.
+
+    Holds no generated text itself (see
+    :func:`medsynth.freetext.iter_clinical_texts`), so it can be shipped to
+    worker processes. ``requests`` and ``reused`` count, per process, how
+    many items needed a new LLM text and how many were served from the pool.
+    """
+
+    def __init__(self, variants: int, seed: int = 0, fields: tuple[str, ...] = DEFAULT_POOL_FIELDS):
+        if variants < 1:
+            raise ValueError(f"variants must be >= 1, got {variants}")
+        unknown = [f for f in fields if f not in POOL_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown text pool field(s) {', '.join(unknown)}. "
+                             f"Available: {', '.join(POOL_FIELDS)}")
+        self.variants = variants
+        self.seed = seed
+        self.fields = tuple(fields)
+        self.requests = 0
+        self.reused = 0
+
+    def template(self, item: dict, locale: LocaleConfig) -> dict:
+        """Return ``item`` with the pooled fields replaced by placeholders."""
+        patient = dict(item["patient"])
+        if "name" in self.fields:
+            patient["full_name"] = NAME_PLACEHOLDER
+        if "age" in self.fields:
+            patient["age"] = AGE_PLACEHOLDER
+        # Empty lists stay literal: the prompt then says "no known conditions"
+        if "conditions" in self.fields and patient["conditions"]:
+            patient["conditions"] = [CONDITIONS_PLACEHOLDER]
+        if "medications" in self.fields and patient["medications"]:
+            patient["medications"] = [MEDICATIONS_PLACEHOLDER]
+        contradiction = item.get("contradiction")
+        if "age" in self.fields and contradiction is not None and contradiction["type"] == "age":
+            contradiction = dict(
+                contradiction,
+                text_value=STATED_AGE_PLACEHOLDER,
+                text_should_say=locale.contradiction_templates["age"].format(age=STATED_AGE_PLACEHOLDER),
+            )
+        return {
+            "patient": patient,
+            "facility_id": item["facility_id"],
+            "doc_type": item["doc_type"],
+            "contradiction": contradiction,
+        }
+
+    def prompt_class(self, template: dict, locale: LocaleConfig) -> str:
+        """The placeholder prompt shared by all equivalent items."""
+        return locale.format_clinical_prompt(**template)
+
+    def variant(self, item: dict, prompt_class: str) -> int:
+        """Pick the variant ``item`` uses within its class."""
+        if self.variants == 1:
+            return 0
+        key = (prompt_class, item.get("p_idx"), item["facility_id"], item["doc_type"])
+        return derive_seed(self.seed, "pool", *key) % self.variants
+
+    def fill(self, text: str, item: dict) -> str:
+        """Substitute ``item``'s own values for the placeholders in a pooled text."""
+        patient = item["patient"]
+        if "name" in self.fields:
+            text = text.replace(NAME_PLACEHOLDER, patient["full_name"])
+        if "age" in self.fields:
+            text = text.replace(AGE_PLACEHOLDER, str(patient["age"]))
+            contradiction = item.get("contradiction")
+            if contradiction is not None and contradiction["type"] == "age":
+                text = text.replace(STATED_AGE_PLACEHOLDER, str(contradiction["text_value"]))
+        if "conditions" in self.fields:
+            text = text.replace(CONDITIONS_PLACEHOLDER, ", ".join(patient["conditions"]))
+        if "medications" in self.fields:
+            text = text.replace(MEDICATIONS_PLACEHOLDER, ", ".join(patient["medications"]))
+        return text
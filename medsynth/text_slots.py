@@ -0,0 +1,53 @@
+"""Free-text slot helpers shared by one-shot runs and phase 2 (``medsynth-fill``).
+
+Both :mod:`medsynth.generate` and :mod:`medsynth.fill` turn a free-text
+queue item into the final field value the same way: the same field name,
+the same per-slot RNG and the same source-specific noise, which is what
+keeps a two-phase corpus byte-identical to a one-shot run.
+"""
+
+import random
+from . import config
+from .distortions import apply_digital_typos, apply_ocr_noise
+from .freetext import RateLimiter
+from .seeding import RngPlan
+
+
+def text_field(locale, facility_id: str) -> str:
+    """Return the free text field name for a facility."""
+    return locale.field_names[facility_id].get("free_text", "clinical_notes")
+
+
+def noised_text(
+    text: str | Exception,
+    item: dict,
+    rng: random.Random,
+    locale,
+    verbose: bool,
+    i: int,
+    noise_backend: str = config.DEFAULT_NOISE_BACKEND,
+) -> str:
+    """Apply source-specific noise to one generated text ("" on failure).
+
+    Called in queue order, so the v1 shared RNG sees the same sequence no
+    matter in which order concurrent completions arrived.
+    """
+    if isinstance(text, Exception):
+        if verbose:
+            print(f"  Warning: free text generation failed for doc {i}: {text}")
+        return ""
+    if item["source"] == "ocr":
+        return apply_ocr_noise(text, rng, locale.ocr_model, backend=noise_backend)
+    return apply_digital_typos(text, rng, backend=noise_backend)
+
+
+def text_rng(plan: RngPlan, item: dict) -> random.Random:
+    """The RNG that noises ``item``'s text (the shared one in v1)."""
+    return plan.freetext(item["p_idx"], item["facility_id"], item["doc_type"])
+
+
+def rate_limiter(requests_per_minute: int | None, tokens_per_minute: int | None) -> RateLimiter | None:
+    """A :class:`RateLimiter` for the given limits, or None when there are none."""
+    if not requests_per_minute and not tokens_per_minute:
+        return None
+    return RateLimiter(requests_per_minute, tokens_per_minute)
@@ -0,0 +1,383 @@
+"""Output writers: per-index NDJSON files with bounded in-memory buffers."""
+
+import glob
+import gzip
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import islice
+from . import config
+from .serialize import encode_lines, line_encoder
+
+_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+_MAX_PENDING_BLOCKS = 4  # compressed blocks in flight per writer
+
+
+def remove_index_files(output_dir: str, idx_name: str):
+    """Delete the output of ``idx_name`` an earlier run left in ``output_dir``.
+
+    Covers the plain file, every rotated compressed chunk and the Parquet
+    export, so a rerun with fewer chunks (or another format) leaves nothing
+    stale for the loaders to pick up.
+    """
+    base = glob.escape(os.path.join(output_dir, idx_name))
+    for path in glob.glob(base + ".ndjson") + glob.glob(base + ".[0-9][0-9][0-9].ndjson.*") \
+            + glob.glob(base + ".parquet"):
+        os.remove(path)
+
+
+class NdjsonWriter:
+    """Append documents to one NDJSON file, flushing every ``buffer_docs`` docs.
+
+    Memory held by the writer is bounded by the buffer size, not by the number
+    of documents written, so a generator can stream a whole corpus through it.
+    With a ``sink`` (e.g. :class:`medsynth.es_sink.EsSink`) every serialized
+    line is also passed to ``sink.add(index, line)``. ``json_style`` picks the
+    encoder (see :mod:`medsynth.serialize`).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        buffer_docs: int | None = None,
+        sink=None,
+        index: str | None = None,
+        json_style: str | None = None,
+    ):
+        if buffer_docs is None:
+            buffer_docs = config.STREAM_BUFFER_DOCS
+        if buffer_docs < 1:
+            raise ValueError(f"buffer_docs must be >= 1, got {buffer_docs}")
+        self.path = path
+        self.buffer_docs = buffer_docs
+        self.count = 0
+        self.sink = sink
+        self.index = index
+        self._encode = line_encoder(json_style)
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+        self._file = open(path, "wb")
+
+    def write(self, doc: dict):
+        self.write_line(self._encode(doc))
+
+    def write_line(self, line: bytes):
+        """Append one already serialized document (UTF-8, ending in a newline)."""
+        self._buffer.append(line)
+        self._buffered += 1
+        self.count += 1
+        if self.sink is not None:
+            self.sink.add(self.index, line)
+        if self._buffered >= self.buffer_docs:
+            self.flush()
+
+    def write_many(self, docs):
+        """Write an iterable of docs, encoding ``buffer_docs`` at a time into one block."""
+        docs = iter(docs)
+        while batch := list(islice(docs, self.buffer_docs - self._buffered)):
+            if self.sink is None:
+                self._buffer.append(encode_lines(batch, self._encode))
+            else:
+                lines = list(map(self._encode, batch))
+                for line in lines:
+                    self.sink.add(self.index, line)
+                self._buffer.append(b"".join(lines))
+            self._buffered += len(batch)
+            self.count += len(batch)
+            if self._buffered >= self.buffer_docs:
+                self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(b"".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _compressor(compress: str):
+    """Return a thread-safe ``bytes -> bytes`` function for one compression format."""
+    if compress == "gzip":
+        # mtime=0 keeps the output reproducible
+        return lambda data: gzip.compress(data, config.GZIP_LEVEL, mtime=0)
+    if compress == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "compress='zstd' requires zstandard. Install it with: pip install e2llm-medsynth[zstd]"
+            ) from None
+        local = threading.local()  # ZstdCompressor objects must not be shared across threads
+
+        def _zstd(data):
+            compressor = getattr(local, "compressor", None)
+            if compressor is None:
+                compressor = local.compressor = zstandard.ZstdCompressor(level=config.ZSTD_LEVEL)
+            return compressor.compress(data)
+        return _zstd
+    raise ValueError(f"Unknown compression {compress!r}; choose from {', '.join(config.COMPRESSIONS)}")
+
+
+class CompressedNdjsonWriter:
+    """NDJSON compressed into rotated chunks ``<base>.000.ndjson.gz`` (or ``.zst``).
+
+    Every flushed buffer becomes an independent gzip member / zstd frame,
+    compressed on ``executor`` threads (zlib and zstd release the GIL) while
+    the caller keeps generating, and written in order, so concatenating the
+    decompressed chunks gives exactly the plain NDJSON file. A new chunk
+    starts before its uncompressed size would exceed ``chunk_bytes``; chunk
+    boundaries depend only on the documents, never on thread timing.
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        executor: Executor,
+        compress: str,
+        buffer_docs: int | None = None,
+        chunk_bytes: int | None = None,
+        sink=None,
+        index: str | None = None,
+        json_style: str | None = None,
+    ):
+        if buffer_docs is None:
+            buffer_docs = config.STREAM_BUFFER_DOCS
+        if chunk_bytes is None:
+            chunk_bytes = config.OUTPUT_CHUNK_BYTES
+        if buffer_docs < 1 or chunk_bytes < 1:
+            raise ValueError("buffer_docs and chunk_bytes must be >= 1")
+        self.base_path = base_path
+        self.extension = ".ndjson" + _EXTENSIONS[compress]
+        self.buffer_docs = buffer_docs
+        self.chunk_bytes = chunk_bytes
+        self.sink = sink
+        self.index = index
+        self.count = 0
+        self.paths: list[str] = []
+        self._compress = _compressor(compress)
+        self._encode = line_encoder(json_style)
+        self._executor = executor
+        self._buffer: list[bytes] = []
+        self._chunk_bytes = 0  # uncompressed bytes in the current chunk, incl. buffer
+        self._pending: deque = deque()
+        self._file = None
+
+    def write(self, doc: dict):
+        self.write_line(self._encode(doc))
+
+    def write_many(self, docs):
+        for doc in docs:
+            self.write_line(self._encode(doc))
+
+    def write_line(self, line: bytes):
+        if self._file is None or (self._chunk_bytes and self._chunk_bytes + len(line) > self.chunk_bytes):
+            self._rotate()
+        self._buffer.append(line)
+        self._chunk_bytes += len(line)
+        self.count += 1
+        if self.sink is not None:
+            self.sink.add(self.index, line)
+        if len(self._buffer) >= self.buffer_docs:
+            self.flush()
+
+    def _rotate(self):
+        self.flush()
+        self._drain(0)
+        if self._file is not None:
+            self._file.close()
+        path = f"{self.base_path}.{len(self.paths):03d}{self.extension}"
+        self.paths.append(path)
+        self._file = open(path, "wb")
+        self._chunk_bytes = 0
+
+    def _drain(self, keep: int):
+        """Write finished blocks in order until at most ``keep`` are in flight."""
+        while self._pending and (len(self._pending) > keep or self._pending[0].done()):
+            self._file.write(self._pending.popleft().result())
+
+    def flush(self):
+        if self._buffer:
+            data = b"".join(self._buffer)
+            self._buffer.clear()
+            self._pending.append(self._executor.submit(self._compress, data))
+            self._drain(_MAX_PENDING_BLOCKS)
+
+    def close(self):
+        if self._file is None or self._file.closed:
+            return
+        self.flush()
+        self._drain(0)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class IndexWriters:
+    """Lazily opened :class:`NdjsonWriter` per index inside ``output_dir``.
+
+    Writers are opened on the first document routed to an index, so the
+    resulting ``counts`` keep first-appearance order like the batch writer.
+    With ``compress`` ("gzip" or "zstd") each index is written as rotated
+    compressed chunks (:class:`CompressedNdjsonWriter`) sharing one pool of
+    compression threads. Opening an index first removes whatever an earlier
+    run left of it (:func:`remove_index_files`).
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        buffer_docs: int | None = None,
+        suffix: str = ".ndjson",
+        sink=None,
+        compress: str | None = None,
+        chunk_bytes: int | None = None,
+        json_style: str | None = None,
+    ):
+        if compress is not None:
+            _compressor(compress)  # fail before any file is opened
+        line_encoder(json_style)  # validate the style up front
+        self.output_dir = output_dir
+        self.buffer_docs = buffer_docs
+        self.suffix = suffix
+        self.sink = sink
+        self.compress = compress
+        self.chunk_bytes = chunk_bytes
+        self.json_style = json_style
+        self._executor = None
+        self._writers: dict[str, NdjsonWriter | CompressedNdjsonWriter] = {}
+
+    def _writer(self, idx_name: str) -> NdjsonWriter | CompressedNdjsonWriter:
+        writer = self._writers.get(idx_name)
+        if writer is None:
+            remove_index_files(self.output_dir, idx_name)
+            if self.compress is None:
+                path = os.path.join(self.output_dir, f"{idx_name}{self.suffix}")
+                writer = NdjsonWriter(path, self.buffer_docs, self.sink, idx_name, self.json_style)
+            else:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(config.COMPRESS_THREADS,
+                                                        thread_name_prefix="medsynth-compress")
+                writer = CompressedNdjsonWriter(
+                    os.path.join(self.output_dir, idx_name), self._executor, self.compress,
+                    self.buffer_docs, self.chunk_bytes, self.sink, idx_name, self.json_style,
+                )
+            self._writers[idx_name] = writer
+        return writer
+
+    def write(self, idx_name: str, doc: dict):
+        self._writer(idx_name).write(doc)
+
+    def write_many(self, idx_name: str, docs):
+        self._writer(idx_name).write_many(docs)
+
+    def write_line(self, idx_name: str, line: bytes):
+        self._writer(idx_name).write_line(line)
+
+    def count(self, idx_name: str) -> int:
+        """Documents written to ``idx_name`` so far (0 before its first one)."""
+        writer = self._writers.get(idx_name)
+        return 0 if writer is None else writer.count
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return {name: w.count for name, w in self._writers.items()}
+
+    def close(self):
+        try:
+            for writer in self._writers.values():
+                writer.close()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def bulk_action(idx_name: str, doc_id: str) -> str:
+    """The ``_bulk`` action line that precedes a document's source line."""
+    return '{"index":{"_index":%s,"_id":"%s"}}\n' % (json.dumps(idx_name), doc_id)
+
+
+class BulkFileSink:
+    """Elasticsearch-ready output: ``<index>.mapping.json`` plus ``_bulk`` chunks.
+
+    Each index gets action/source pairs in ``<index>.NNN.ndjson`` files inside
+    ``bulk_dir``, rotated before a chunk would exceed ``chunk_bytes`` (a pair
+    is never split, so every chunk is a valid ``_bulk`` body on its own):
+
+        curl -XPUT "$ES/$index" -H 'Content-Type: application/json' --data-binary @$index.mapping.json
+        curl -XPOST "$ES/_bulk" -H 'Content-Type: application/x-ndjson' --data-binary @$index.000.ndjson
+
+    Document ``_id`` values match :class:`medsynth.es_sink.EsSink`'s.
+    """
+
+    def __init__(self, bulk_dir: str, chunk_bytes: int | None = None, id_prefix: str = ""):
+        if chunk_bytes is None:
+            chunk_bytes = config.BULK_CHUNK_BYTES
+        if chunk_bytes < 1:
+            raise ValueError(f"chunk_bytes must be >= 1, got {chunk_bytes}")
+        self.bulk_dir = bulk_dir
+        self.chunk_bytes = chunk_bytes
+        self.id_prefix = id_prefix
+        self.chunks: list[str] = []
+        self._encode = line_encoder()
+        self._files: dict[str, list] = {}  # index -> [file, chunk bytes, docs, chunks]
+        os.makedirs(bulk_dir, exist_ok=True)
+
+    def create_indices(self, index_configs: list[tuple[str, str, dict]]):
+        """Write ``<index>.mapping.json`` for every ``(index_name, facility_id, mapping)``."""
+        for name, _, mapping in index_configs:
+            with open(os.path.join(self.bulk_dir, f"{name}.mapping.json"), "w", encoding="utf-8") as f:
+                json.dump(mapping, f, ensure_ascii=False, indent=2)
+                f.write("\n")
+
+    def add(self, idx_name: str, line: bytes):
+        state = self._files.get(idx_name)
+        if state is None:
+            state = self._files[idx_name] = [None, 0, 0, 0]
+        pair = bulk_action(idx_name, f"{self.id_prefix}{state[2]}").encode("utf-8") + line
+        if state[0] is None or (state[1] and state[1] + len(pair) > self.chunk_bytes):
+            if state[0] is not None:
+                state[0].close()
+            path = os.path.join(self.bulk_dir, f"{idx_name}.{state[3]:03d}.ndjson")
+            self.chunks.append(path)
+            state[0], state[1] = open(path, "wb"), 0
+            state[3] += 1
+        state[0].write(pair)
+        state[1] += len(pair)
+        state[2] += 1
+
+    def write(self, idx_name: str, doc: dict):
+        self.add(idx_name, self._encode(doc))
+
+    def close(self):
+        for state in self._files.values():
+            if state[0] is not None:
+                state[0].close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
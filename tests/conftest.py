@@ -0,0 +1,29 @@
+"""Shared fixtures: a deterministic stand-in for the OpenAI-compatible client."""
+
+import types
+import pytest
+from medsynth import freetext
+
+
+class FakeClient:
+    """Echoes the start of the user prompt; optional per-call hook for delays/failures."""
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **kwargs):
+        self.calls += 1
+        if self.hook is not None:
+            self.hook(messages)
+        content = messages[1]["content"][:200]
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(freetext, "_get_client", lambda *a, **k: client)
+    return client
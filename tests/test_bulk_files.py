@@ -0,0 +1,49 @@
+"""Tests for _bulk-ready output files (BulkFileSink)."""
+
+import json
+import os
+from medsynth.generate import generate_documents
+from medsynth.locales import load_locale
+from medsynth.schemas import all_index_configs
+from medsynth.writers import BulkFileSink
+
+
+def _read_chunks(bulk_dir, idx_name):
+    chunks = sorted(f for f in os.listdir(bulk_dir) if f.startswith(f"{idx_name}.") and f.endswith(".ndjson"))
+    pairs = []
+    for chunk in chunks:
+        with open(os.path.join(bulk_dir, chunk), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert len(lines) % 2 == 0
+        pairs.extend(zip(lines[::2], lines[1::2]))
+    return chunks, pairs
+
+
+def test_mappings_and_chunks_match_output(tmp_path):
+    out, bulk_dir = str(tmp_path / "out"), str(tmp_path / "bulk")
+    with BulkFileSink(bulk_dir, chunk_bytes=4096) as sink:
+        counts = generate_documents(num_patients=15, seed=3, output_dir=out, locale_code="es_MX",
+                                    skip_freetext=True, sink=sink)
+
+    for name, _, mapping in all_index_configs(load_locale("es_MX")):
+        with open(os.path.join(bulk_dir, f"{name}.mapping.json"), encoding="utf-8") as f:
+            assert json.load(f) == mapping
+
+    assert len(sink.chunks) > len(counts)
+    for path in sink.chunks:
+        assert os.path.getsize(path) <= 4096
+    for idx_name, count in counts.items():
+        chunks, pairs = _read_chunks(bulk_dir, idx_name)
+        assert chunks[0] == f"{idx_name}.000.ndjson"
+        with open(os.path.join(out, f"{idx_name}.ndjson"), encoding="utf-8") as f:
+            assert [source for _, source in pairs] == f.read().splitlines()
+        assert [json.loads(action) for action, _ in pairs] == [
+            {"index": {"_index": idx_name, "_id": str(i)}} for i in range(count)
+        ]
+
+
+def test_oversized_doc_gets_own_chunk(tmp_path):
+    with BulkFileSink(str(tmp_path), chunk_bytes=10) as sink:
+        sink.write("medical_x_lab", {"text": "long enough to exceed the chunk"})
+        sink.write("medical_x_lab", {"text": "again"})
+    assert [os.path.basename(p) for p in sink.chunks] == ["medical_x_lab.000.ndjson", "medical_x_lab.001.ndjson"]
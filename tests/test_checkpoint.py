@@ -0,0 +1,119 @@
+"""Tests for checkpointed, resumable generation runs."""
+
+import os
+import sys
+import pytest
+from medsynth.checkpoint import CHECKPOINT_DIR
+from medsynth.generate import generate_documents, main
+
+
+class Crash(BaseException):
+    """Stands in for a pre-emption or OOM kill mid-run."""
+
+
+def _read(path):
+    return {f: open(os.path.join(path, f), "rb").read() for f in sorted(os.listdir(path)) if f.endswith(".ndjson")}
+
+
+def _crash_after(client, n):
+    def hook(messages):
+        if client.calls > n:
+            raise Crash()
+    return hook
+
+
+@pytest.mark.parametrize("determinism", ["v1", "v2"])
+def test_resume_matches_uninterrupted_run(tmp_path, fake_llm, determinism):
+    common = dict(num_patients=15, seed=11, locale_code="he_IL", determinism=determinism, checkpoint_every=7)
+    full = generate_documents(output_dir=str(tmp_path / "full"), **common)
+    assert not os.path.exists(tmp_path / "full" / CHECKPOINT_DIR)
+
+    out = str(tmp_path / "resumed")
+    fake_llm.calls = 0
+    fake_llm.hook = _crash_after(fake_llm, 25)
+    with pytest.raises(Crash):
+        generate_documents(output_dir=out, **common)
+    assert not _read(out)
+
+    fake_llm.calls = 0
+    fake_llm.hook = None
+    resumed = generate_documents(output_dir=out, resume=True, **common)
+    assert fake_llm.calls == sum(full.values()) - 25
+    assert resumed == full
+    assert _read(out) == _read(tmp_path / "full")
+    assert not os.path.exists(os.path.join(out, CHECKPOINT_DIR))
+
+
+def test_resume_with_compact_pool(tmp_path, fake_llm):
+    common = dict(num_patients=12, seed=5, locale_code="ar_SA", checkpoint_every=5)
+    full = generate_documents(output_dir=str(tmp_path / "full"), **common)
+
+    out = str(tmp_path / "resumed")
+    fake_llm.calls = 0
+    fake_llm.hook = _crash_after(fake_llm, 20)
+    with pytest.raises(Crash):
+        generate_documents(output_dir=out, compact_pool=True, **common)
+
+    fake_llm.hook = None
+    assert generate_documents(output_dir=out, resume=True, compact_pool=True, **common) == full
+    assert _read(out) == _read(tmp_path / "full")
+
+
+def test_uncommitted_slots_are_redone(tmp_path, fake_llm, monkeypatch):
+    from medsynth import checkpoint
+    common = dict(num_patients=10, seed=3, locale_code="es_MX", checkpoint_every=10)
+    full = generate_documents(output_dir=str(tmp_path / "full"), **common)
+
+    # A hard kill gets no chance to commit on the way out
+    real_commit = checkpoint.Checkpoint.commit
+    monkeypatch.setattr(checkpoint.Checkpoint, "commit",
+                        lambda self: real_commit(self) if len(self._pending) >= self.every else None)
+    out = str(tmp_path / "resumed")
+    fake_llm.hook = _crash_after(fake_llm, sum(full.values()) + 15)
+    with pytest.raises(Crash):
+        generate_documents(output_dir=out, **common)
+    monkeypatch.setattr(checkpoint.Checkpoint, "commit", real_commit)
+
+    fake_llm.hook = None
+    before = fake_llm.calls
+    generate_documents(output_dir=out, resume=True, **common)
+    assert fake_llm.calls - before == sum(full.values()) - 10
+    assert _read(out) == _read(tmp_path / "full")
+
+
+def test_resume_rejects_other_parameters(tmp_path, fake_llm):
+    common = dict(num_patients=6, locale_code="ar_SA", checkpoint_every=3)
+    fake_llm.hook = _crash_after(fake_llm, 5)
+    with pytest.raises(Crash):
+        generate_documents(seed=1, output_dir=str(tmp_path), **common)
+    fake_llm.hook = None
+    with pytest.raises(ValueError, match="different parameters"):
+        generate_documents(seed=2, output_dir=str(tmp_path), resume=True, **common)
+
+
+def test_resume_without_checkpoint(tmp_path, fake_llm):
+    with pytest.raises(FileNotFoundError):
+        generate_documents(num_patients=3, seed=1, output_dir=str(tmp_path), resume=True)
+
+
+def test_cli_reports_resume_errors(tmp_path, fake_llm, monkeypatch, capsys):
+    def run(*extra):
+        monkeypatch.setattr(sys, "argv", ["medsynth", "--num-patients", "4", "--api-key", "x",
+                                          "--output-dir", str(tmp_path), "--checkpoint-every", "3", *extra])
+        main()
+
+    fake_llm.hook = _crash_after(fake_llm, 5)
+    with pytest.raises(Crash):
+        run("--seed", "1")
+    fake_llm.hook = None
+    with pytest.raises(SystemExit) as exc:
+        run("--seed", "2", "--resume")
+    assert exc.value.code == 1
+    err = capsys.readouterr().err
+    assert "Error: " in err and "different parameters" in err
+
+    run("--seed", "1", "--resume")
+    with pytest.raises(SystemExit) as exc:
+        run("--seed", "1", "--resume")  # finished: nothing left to resume
+    assert exc.value.code == 1
+    assert "Use --force" in capsys.readouterr().err
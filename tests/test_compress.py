@@ -0,0 +1,96 @@
+"""Tests for compressed, rotated output (--compress)."""
+
+import glob
+import gzip
+import os
+import sys
+import pytest
+from medsynth.generate import generate_documents, main
+from medsynth.writers import CompressedNdjsonWriter, IndexWriters
+
+
+def _plain(path):
+    return {f: open(os.path.join(path, f), "rb").read() for f in sorted(os.listdir(path)) if f.endswith(".ndjson")}
+
+
+def _decompressed(path, ext, decompress):
+    files = {}
+    for chunk in sorted(glob.glob(os.path.join(path, f"*.[0-9][0-9][0-9].ndjson{ext}"))):
+        name = os.path.basename(chunk).split(".")[0] + ".ndjson"
+        with open(chunk, "rb") as f:
+            data = decompress(f.read())
+        assert data.endswith(b"\n")  # chunks never split a document
+        files[name] = files.get(name, b"") + data
+    return files
+
+
+@pytest.mark.parametrize("extra", [{}, {"stream": True}, {"determinism": "v2", "workers": 2}])
+def test_gzip_chunks_match_plain_output(tmp_path, extra):
+    common = dict(num_patients=20, seed=8, locale_code="ar_EG", skip_freetext=True, **extra)
+    counts = generate_documents(output_dir=str(tmp_path / "plain"), **common)
+    gz = generate_documents(output_dir=str(tmp_path / "gz"), compress="gzip", chunk_bytes=3000, **common)
+    assert gz == counts
+    assert _decompressed(tmp_path / "gz", ".gz", gzip.decompress) == _plain(tmp_path / "plain")
+    assert len(os.listdir(tmp_path / "gz")) > len(counts)
+    assert not _plain(tmp_path / "gz")
+
+
+def test_output_is_reproducible(tmp_path, fake_llm):
+    for name in ("a", "b"):
+        generate_documents(num_patients=6, seed=2, output_dir=str(tmp_path / name), compress="gzip")
+    a = {f: open(tmp_path / "a" / f, "rb").read() for f in os.listdir(tmp_path / "a")}
+    assert a == {f: open(tmp_path / "b" / f, "rb").read() for f in os.listdir(tmp_path / "b")}
+
+
+def test_zstd(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    common = dict(num_patients=10, seed=1, skip_freetext=True)
+    generate_documents(output_dir=str(tmp_path / "plain"), **common)
+    generate_documents(output_dir=str(tmp_path / "zst"), compress="zstd", **common)
+    decompress = zstandard.ZstdDecompressor().decompressobj
+    assert _decompressed(tmp_path / "zst", ".zst", lambda d: decompress().decompress(d)) == _plain(tmp_path / "plain")
+
+
+def test_rotation_keeps_order_with_many_blocks(tmp_path):
+    lines = [f'{{"n": {i}, "text": "{"א" * (i % 50)}"}}\n' for i in range(500)]
+    with IndexWriters(str(tmp_path), buffer_docs=7, compress="gzip", chunk_bytes=2000) as writers:
+        for line in lines:
+            writers.write_line("medical_x_lab", line.encode("utf-8"))
+    writer = writers._writers["medical_x_lab"]
+    assert isinstance(writer, CompressedNdjsonWriter)
+    data = b"".join(gzip.decompress(open(p, "rb").read()) for p in writer.paths)
+    assert data.decode("utf-8") == "".join(lines)
+    assert all(len(gzip.decompress(open(p, "rb").read())) <= 2000 for p in writer.paths)
+
+
+def test_rejected_combinations(tmp_path):
+    with pytest.raises(ValueError, match="Unknown compression"):
+        generate_documents(num_patients=1, seed=1, output_dir=str(tmp_path), compress="lz4", skip_freetext=True)
+    with pytest.raises(ValueError, match="shard"):
+        generate_documents(num_patients=2, seed=1, output_dir=str(tmp_path), compress="gzip",
+                           determinism="v2", shard=(1, 2), skip_freetext=True)
+
+
+
+@pytest.mark.parametrize("extra", [{}, {"determinism": "v2", "workers": 2}])
+def test_force_removes_stale_chunks(tmp_path, extra):
+    common = dict(num_patients=20, seed=8, locale_code="ar_EG", skip_freetext=True, **extra)
+    out = str(tmp_path / "out")
+    generate_documents(output_dir=out, compress="gzip", chunk_bytes=1000, **common)
+    with pytest.raises(FileExistsError, match=r"\.000\.ndjson\.gz"):
+        generate_documents(output_dir=out, **common)
+
+    generate_documents(output_dir=out, compress="gzip", chunk_bytes=1 << 20, force=True, **common)
+    chunks = glob.glob(os.path.join(out, "*.ndjson.gz"))
+    assert sorted(chunks) == sorted(glob.glob(os.path.join(out, "*.000.ndjson.gz")))
+    generate_documents(output_dir=out, force=True, **common)
+    assert not glob.glob(os.path.join(out, "*.ndjson.gz"))
+
+
+def test_cli_rejects_shard(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["medsynth", "--skip-freetext", "--num-patients", "3", "--output-dir",
+                                      str(tmp_path), "--compress", "gzip", "--shard", "1/2", "--determinism", "v2"])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 1
+    assert "Error: --compress cannot be combined with --shard" in capsys.readouterr().err
@@ -0,0 +1,69 @@
+"""Tests for v2 determinism: per-patient and per-document derived RNGs."""
+
+import json
+import os
+import pytest
+from medsynth.generate import generate_documents
+from medsynth.locales import load_locale
+from medsynth.patients import generate_patients, iter_patients
+from medsynth.seeding import RngPlan, derive_seed
+
+
+def _read(path):
+    data = {}
+    for f in sorted(os.listdir(path)):
+        with open(os.path.join(path, f), encoding="utf-8") as fh:
+            data[f] = fh.read().splitlines()
+    return data
+
+
+def test_derive_seed_is_stable():
+    # Pinned value: changing the derivation silently changes every v2 corpus
+    assert derive_seed(42, "doc", 0, "alon", "lab") == 14306263628544272917
+    assert derive_seed(42, "doc", 0, "alon", "lab") != derive_seed(42, "doc", 1, "alon", "lab")
+
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError, match="Unknown determinism mode"):
+        RngPlan(42, "v3")
+
+
+@pytest.mark.parametrize("code", ["he_IL", "es_MX"])
+def test_v2_patients_independent_of_range(code):
+    locale = load_locale(code)
+    full = generate_patients(30, 42, locale, determinism="v2")
+    assert list(iter_patients(30, 42, locale, "v2", start=17)) == full[17:]
+    assert generate_patients(10, 42, locale, determinism="v2") == full[:10]
+
+
+def test_v1_start_skips_prefix():
+    locale = load_locale("he_IL")
+    full = generate_patients(12, 42, locale)
+    assert list(iter_patients(12, 42, locale, start=5)) == full[5:]
+
+
+def test_v2_corpus_is_prefix_stable(tmp_path, fake_llm):
+    """Docs of the first N patients must not depend on how many follow them."""
+    common = dict(seed=42, locale_code="he_IL", determinism="v2")
+    generate_documents(num_patients=6, output_dir=str(tmp_path / "small"), **common)
+    generate_documents(num_patients=20, output_dir=str(tmp_path / "large"), **common)
+    small, large = _read(tmp_path / "small"), _read(tmp_path / "large")
+    for name, lines in small.items():
+        assert large[name][:len(lines)] == lines
+
+
+def test_v2_stream_matches_batch(tmp_path, fake_llm):
+    common = dict(num_patients=10, seed=7, locale_code="ar_SA", determinism="v2")
+    generate_documents(output_dir=str(tmp_path / "batch"), **common)
+    generate_documents(output_dir=str(tmp_path / "stream"), stream=True, **common)
+    assert _read(tmp_path / "batch") == _read(tmp_path / "stream")
+
+
+def test_v2_differs_from_v1(tmp_path):
+    common = dict(num_patients=5, seed=42, locale_code="he_IL", skip_freetext=True)
+    generate_documents(output_dir=str(tmp_path / "v1"), **common)
+    generate_documents(output_dir=str(tmp_path / "v2"), determinism="v2", **common)
+    assert _read(tmp_path / "v1") != _read(tmp_path / "v2")
+    for lines in _read(tmp_path / "v2").values():
+        for line in lines:
+            json.loads(line)
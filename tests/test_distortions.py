@@ -0,0 +1,42 @@
+"""The distortion stages return new documents and never modify their input."""
+
+import copy
+import random
+from datetime import date
+import pytest
+from medsynth.distortions import apply_field_distortions, inject_garbage_typed
+from medsynth.locales import load_locale
+from medsynth.patients import generate_patients
+from medsynth.schemas import build_structured_fields
+
+
+@pytest.mark.parametrize("locale_code", ["he_IL", "es_ES"])
+def test_input_doc_and_patient_untouched(locale_code):
+    locale = load_locale(locale_code)
+    patients = generate_patients(20, 3, locale)
+    before = copy.deepcopy(patients)
+    rng = random.Random(5)
+    doc_date = date(2024, 1, 2).toordinal()
+    changed = 0
+    for patient in patients:
+        for facility in locale.facilities:
+            for doc_type in facility["doc_types"]:
+                doc = build_structured_fields(patient, facility["id"], doc_type, doc_date, rng, locale)
+                original = copy.deepcopy(doc)
+                distorted = apply_field_distortions(doc, facility["id"], doc_type, rng, locale)
+                garbled, _ = inject_garbage_typed(distorted, rng, locale)
+                assert doc == original
+                assert distorted is not doc and garbled.keys() == doc.keys()
+                changed += distorted != doc
+    assert patients == before
+    assert changed > 0
+
+
+def test_icd10_swap_copies_the_list():
+    locale = load_locale("he_IL")
+    facility = locale.facilities[0]
+    codes = ["E11.9", "I10.12", "J45.90"] * 50
+    doc = {"codes": codes, "doc_type": facility["doc_types"][0]}
+    distorted = apply_field_distortions(doc, facility["id"], facility["doc_types"][0], random.Random(2), locale)
+    assert distorted["codes"] != codes and distorted["codes"] is not codes
+    assert codes == ["E11.9", "I10.12", "J45.90"] * 50
@@ -0,0 +1,116 @@
+"""Compiled document builders match the generic builder they replaced."""
+
+import random
+from datetime import date, datetime, timedelta
+import pytest
+from medsynth import config
+from medsynth.generate import _random_doc_date
+from medsynth.locales import REGISTRY, load_locale
+from medsynth.patients import generate_patients
+from medsynth.schemas import build_structured_fields, doc_builder
+
+
+def _reference(patient, facility_id, doc_type, doc_date, rng, locale):
+    """The pre-compilation build_structured_fields, with ISO date strings."""
+    fnames = locale.field_names[facility_id]
+    facility = locale.facility_by_id[facility_id]
+    doc = {}
+
+    def _set(concept, value):
+        field = fnames.get(concept)
+        if field is not None and value is not None:
+            doc[field] = value
+
+    raw = patient["id"]
+    id_value = {"int": lambda: int(raw), "float": lambda: float(int(raw))}.get(facility["id_type"], lambda: raw)()
+    age = (date.fromisoformat(doc_date) - date.fromisoformat(patient["date_of_birth"])).days // 365
+    if facility.get("age_format") == "range":
+        low = (age // config.AGE_RANGE_BUCKET) * config.AGE_RANGE_BUCKET
+        age = f"{low}-{low + config.AGE_RANGE_BUCKET}"
+    _set("patient_id", id_value)
+    _set("patient_name", patient["full_name"])
+    _set("age", age)
+    _set("gender", patient["gender"])
+    _set("date", datetime.fromisoformat(doc_date).strftime(facility["date_format"]))
+    _set("facility", facility["name"])
+    _set("address", patient["address"])
+    _set("smoking", patient["smoking"])
+    _set("blood_type", patient.get("blood_type"))
+    _set("occupation", patient.get("occupation"))
+    _set("conditions", patient.get("conditions"))
+    _set("medications", patient.get("medications"))
+    _set("icd10", patient.get("icd10_codes"))
+
+    conditions = patient["conditions"]
+    if doc_type in ("discharge", "visit"):
+        _set("department", rng.choice(locale.departments))
+        _set("diagnosis", rng.choice(conditions) if conditions else locale.fallback_strings.get("no_diagnosis", ""))
+    elif doc_type == "lab":
+        num_tests = rng.randint(config.MIN_LAB_TESTS_PER_DOC, config.MAX_LAB_TESTS_PER_DOC)
+        lab_results = []
+        for test in rng.sample(locale.lab_tests, min(num_tests, len(locale.lab_tests))):
+            is_abnormal = rng.random() < config.LAB_ABNORMAL_RATE
+            r = test["abnormal_range"] if is_abnormal else test["normal_range"]
+            if isinstance(r[0], float):
+                value = round(rng.uniform(r[0], r[1]), 1)
+            else:
+                value = rng.randint(int(r[0]), int(r[1]))
+            lab_results.append({
+                fnames.get("lab_test_name", "test_name"): test["name"],
+                fnames.get("lab_value", "result"): value,
+                fnames.get("lab_unit", "units"): test["unit"],
+                fnames.get("lab_reference", "ref_range"): f"{test['normal_range'][0]}-{test['normal_range'][1]}",
+                fnames.get("lab_flag", "flag"): "H" if is_abnormal else "N",
+            })
+        doc["lab_results"] = lab_results
+    elif doc_type == "referral":
+        _set("referral_to", rng.choice(locale.departments))
+        _set("referral_reason",
+             rng.choice(conditions) if conditions else locale.fallback_strings.get("referral_default", ""))
+        _set("urgency", rng.choice(locale.urgency_values))
+    doc["doc_type"] = doc_type
+    return doc
+
+
+@pytest.mark.parametrize("code", list(REGISTRY))
+def test_matches_reference(code):
+    locale = load_locale(code)
+    patients = generate_patients(25, 11, locale)
+    patients[0] = {**patients[0], "conditions": [], "blood_type": None}
+    a_rng, b_rng = random.Random(3), random.Random(3)
+    for k, patient in enumerate(patients):
+        doc_date = config.DOC_DATE_START.toordinal() + 97 * k
+        for facility in locale.facilities:
+            for doc_type in facility["doc_types"]:
+                built = build_structured_fields(patient, facility["id"], doc_type, doc_date, a_rng, locale)
+                expected = _reference(patient, facility["id"], doc_type, date.fromordinal(doc_date).isoformat(),
+                                      b_rng, locale)
+                assert list(built.items()) == list(expected.items())
+                assert a_rng.random() == b_rng.random()
+
+
+def test_builders_are_cached_per_locale():
+    locale = load_locale("he_IL")
+    facility = locale.facilities[0]
+    builder = doc_builder(locale, facility["id"], facility["doc_types"][0])
+    assert doc_builder(locale, facility["id"], facility["doc_types"][0]) is builder
+    assert locale.doc_builders[(facility["id"], facility["doc_types"][0])] is builder
+
+
+def test_random_doc_date_is_an_ordinal_in_range():
+    delta = (config.DOC_DATE_END - config.DOC_DATE_START).days
+    for seed in range(200):
+        expected = config.DOC_DATE_START + timedelta(days=random.Random(seed).randint(0, delta))
+        assert _random_doc_date(random.Random(seed)) == expected.toordinal()
+
+
+def test_accepts_iso_date_strings():
+    locale = load_locale("es_ES")
+    patient = generate_patients(1, 2, locale)[0]
+    for facility in locale.facilities:
+        for doc_type in facility["doc_types"]:
+            from_string = build_structured_fields(patient, facility["id"], doc_type, "2024-03-01",
+                                                  random.Random(1), locale)
+            from_ordinal = build_structured_fields(patient, facility["id"], doc_type,
+                                                   date(2024, 3, 1).toordinal(), random.Random(1), locale)
+            assert from_string == from_ordinal
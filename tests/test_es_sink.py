@@ -0,0 +1,168 @@
+"""Tests for the Elasticsearch _bulk sink against a local HTTP stand-in."""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from medsynth import config
+from medsynth.es_sink import EsBulkError, EsSink
+from medsynth.generate import generate_documents
+from medsynth.locales import load_locale
+from medsynth.schemas import all_index_configs
+
+
+class FakeEs:
+    """Minimal _bulk / index-creation endpoint that stores documents by ``_id``.
+
+    ``reject_requests`` answers that many _bulk requests with 429;
+    ``reject_items`` rejects every N-th item of the first response with 429;
+    ``fail_items`` rejects every N-th item for good (400).
+    """
+
+    def __init__(self, reject_requests=0, reject_items=0, fail_items=0):
+        self.indices: dict[str, dict] = {}
+        self.docs: dict[str, dict[str, dict]] = {}
+        self.bodies: list[bytes] = []
+        self.reject_requests = reject_requests
+        self.reject_items = reject_items
+        self.fail_items = fail_items
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_PUT(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                name = self.path.strip("/")
+                if name in fake.indices:
+                    return self._reply(400, {"error": {"type": "resource_already_exists_exception"}})
+                fake.indices[name] = json.loads(body)
+                self._reply(200, {"acknowledged": True})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                self._reply(*fake.bulk(body))
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def bulk(self, body):
+        with self.lock:
+            if self.reject_requests:
+                self.reject_requests -= 1
+                return 429, {"error": "too many requests"}
+            self.bodies.append(body)
+            lines = body.decode("utf-8").splitlines()
+            items, errors = [], False
+            reject_items, self.reject_items = self.reject_items, 0
+            for n, (action, source) in enumerate(zip(lines[::2], lines[1::2]), 1):
+                meta = json.loads(action)["index"]
+                status = 201
+                if reject_items and n % reject_items == 0:
+                    status = 429
+                elif self.fail_items and n % self.fail_items == 0:
+                    status = 400
+                else:
+                    self.docs.setdefault(meta["_index"], {})[meta["_id"]] = json.loads(source)
+                errors |= status >= 300
+                items.append({"index": {"_index": meta["_index"], "_id": meta["_id"], "status": status}})
+            return 200, {"errors": errors, "items": items}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_es(monkeypatch):
+    monkeypatch.setattr(config, "ES_RETRY_BACKOFF", 0)
+    servers = []
+
+    def start(**kwargs):
+        servers.append(FakeEs(**kwargs))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def _files(path):
+    docs = {}
+    for f in sorted(os.listdir(path)):
+        if f.endswith(".ndjson"):
+            with open(os.path.join(path, f), encoding="utf-8") as fh:
+                docs[f.removesuffix(".ndjson")] = {str(i): json.loads(line) for i, line in enumerate(fh)}
+    return docs
+
+
+@pytest.mark.parametrize("extra", [{}, {"stream": True}, {"determinism": "v2", "workers": 2}])
+def test_indexes_same_docs_as_files(tmp_path, fake_es, extra):
+    es = fake_es()
+    with EsSink(es.url, batch_docs=7, connections=3) as sink:
+        counts = generate_documents(num_patients=12, seed=5, output_dir=str(tmp_path),
+                                    skip_freetext=True, sink=sink, **extra)
+    assert sink.indexed == sum(counts.values()) and sink.failed == 0
+    assert es.docs == _files(tmp_path)
+    configs = all_index_configs(load_locale(config.DEFAULT_LOCALE))
+    assert es.indices == {name: mapping for name, _, mapping in configs}
+    assert all(body.count(b"\n") <= 2 * 7 for body in es.bodies)
+
+
+def test_batch_bytes_limit(tmp_path, fake_es):
+    es = fake_es()
+    with EsSink(es.url, batch_bytes=4096) as sink:
+        generate_documents(num_patients=6, seed=1, output_dir=str(tmp_path), skip_freetext=True, sink=sink)
+    assert len(es.bodies) > 1
+    assert all(len(body) <= 4096 for body in es.bodies)
+    assert es.docs == _files(tmp_path)
+
+
+def test_backpressure_retries(tmp_path, fake_es):
+    es = fake_es(reject_requests=3, reject_items=4)
+    with EsSink(es.url, batch_docs=10, connections=1) as sink:
+        counts = generate_documents(num_patients=8, seed=2, output_dir=str(tmp_path),
+                                    skip_freetext=True, sink=sink)
+    assert sink.retries == 4
+    assert sink.indexed == sum(counts.values())
+    assert es.docs == _files(tmp_path)
+
+
+def test_rejected_docs_are_counted(fake_es):
+    es = fake_es(fail_items=3)
+    with EsSink(es.url, batch_docs=6) as sink:
+        for i in range(12):
+            sink.write("medical_x_lab", {"n": i})
+    assert (sink.indexed, sink.failed) == (8, 4)
+    assert len(sink.errors) == 4
+
+
+def test_gives_up_after_max_retries(fake_es):
+    es = fake_es(reject_requests=10)
+    sink = EsSink(es.url, max_retries=2, connections=1)
+    sink.write("medical_x_lab", {"n": 1})
+    with pytest.raises(EsBulkError, match="after 2 retries"):
+        sink.close()
+
+
+def test_unreachable_cluster():
+    sink = EsSink("http://127.0.0.1:9", connections=1)
+    with pytest.raises(EsBulkError, match="Cannot reach"):
+        sink.create_indices([("medical_x_lab", "x", {"mappings": {}})])
+    sink.close()
+    with pytest.raises(ValueError, match="Invalid Elasticsearch URL"):
+        EsSink("localhost:9200")
@@ -0,0 +1,105 @@
+"""Tests for concurrent free-text generation and the LLM rate limiter."""
+
+import os
+import random
+import time
+import pytest
+from medsynth import freetext
+from medsynth.freetext import RateLimiter, iter_clinical_texts
+from medsynth.generate import generate_documents
+from medsynth.locales import load_locale
+
+
+def _items(locale, n):
+    from medsynth.patients import generate_patients
+    patients = generate_patients(n, 3, locale)
+    return [
+        {"patient": p, "facility_id": locale.facilities[0]["id"], "doc_type": locale.facilities[0]["doc_types"][0]}
+        for p in patients
+    ]
+
+
+def test_results_keep_item_order(fake_llm):
+    jitter = random.Random(0)
+    fake_llm.hook = lambda messages: time.sleep(jitter.random() / 100)
+    locale = load_locale("he_IL")
+    items = _items(locale, 20)
+    sequential = [t for _, t in iter_clinical_texts(items, locale)]
+    concurrent = list(iter_clinical_texts(items, locale, concurrency=6))
+    assert [item for item, _ in concurrent] == items
+    assert [t for _, t in concurrent] == sequential
+
+
+def test_retry_keeps_retryable_semantics(fake_llm, monkeypatch):
+    class Transient(Exception):
+        pass
+
+    monkeypatch.setattr(freetext, "_RETRYABLE", (Transient,))
+    monkeypatch.setattr(freetext.time, "sleep", lambda s: None)
+    failures = {"left": 2}
+
+    def flaky(messages):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise Transient()
+
+    fake_llm.hook = flaky
+    locale = load_locale("he_IL")
+    [(_, text)] = list(iter_clinical_texts(_items(locale, 1), locale, concurrency=2))
+    assert isinstance(text, str)
+    assert fake_llm.calls == 3
+
+
+def test_non_retryable_failure_is_yielded(fake_llm):
+    def boom(messages):
+        raise ValueError("bad request")
+
+    fake_llm.hook = boom
+    locale = load_locale("he_IL")
+    results = [t for _, t in iter_clinical_texts(_items(locale, 3), locale, concurrency=2)]
+    assert all(isinstance(t, ValueError) for t in results)
+    assert fake_llm.calls == 3
+
+
+def test_concurrent_corpus_matches_sequential(tmp_path, fake_llm):
+    jitter = random.Random(1)
+    fake_llm.hook = lambda messages: time.sleep(jitter.random() / 200)
+    common = dict(num_patients=8, seed=5, locale_code="he_IL")
+    generate_documents(output_dir=str(tmp_path / "seq"), **common)
+    generate_documents(output_dir=str(tmp_path / "conc"), concurrency=4, **common)
+    for name in os.listdir(tmp_path / "seq"):
+        assert (tmp_path / "seq" / name).read_bytes() == (tmp_path / "conc" / name).read_bytes()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_rate_limiter_requests_per_minute():
+    clock = _Clock()
+    limiter = RateLimiter(requests_per_minute=2, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.slept == []
+    limiter.acquire()
+    assert clock.slept == [pytest.approx(30.0)]
+
+
+def test_rate_limiter_tokens_per_minute():
+    clock = _Clock()
+    limiter = RateLimiter(tokens_per_minute=1000, clock=clock, sleep=clock.sleep)
+    limiter.acquire(600)
+    limiter.acquire(600)
+    assert sum(clock.slept) == pytest.approx(12.0)
+    # A single request larger than the bucket waits for a full bucket, not forever
+    limiter.acquire(5000)
+    assert sum(clock.slept) == pytest.approx(72.0)
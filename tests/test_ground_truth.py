@@ -0,0 +1,90 @@
+"""Tests for the ground-truth export (patients + doc -> patient linkage)."""
+
+import json
+import os
+import random
+import pytest
+from medsynth.distortions import GARBAGE_TYPES, inject_garbage, inject_garbage_typed
+from medsynth.generate import generate_documents
+from medsynth.ground_truth import GROUND_TRUTH_DIR
+from medsynth.locales import load_locale
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def _files(path):
+    return {f: open(os.path.join(path, f), "rb").read() for f in sorted(os.listdir(path)) if f.endswith(".ndjson")}
+
+
+def test_linkage_points_at_the_documents(tmp_path):
+    locale = load_locale("he_IL")
+    counts = generate_documents(num_patients=30, seed=4, output_dir=str(tmp_path), skip_freetext=True,
+                                ground_truth=True)
+    patients = _read(tmp_path / GROUND_TRUTH_DIR / "patients.ndjson")
+    linkage = _read(tmp_path / GROUND_TRUTH_DIR / "linkage.ndjson")
+    assert [p["p_idx"] for p in patients] == list(range(30))
+    assert len(linkage) == sum(counts.values())
+    docs = {name: _read(tmp_path / f"{name}.ndjson") for name in counts}
+    assert sorted((row["index"], row["doc"]) for row in linkage) == sorted(
+        (name, i) for name, count in counts.items() for i in range(count))
+
+    checked = 0
+    for row in linkage:
+        doc = docs[row["index"]][row["doc"]]
+        facility_id = row["index"].split("_")[1]
+        name_field = locale.field_names[facility_id]["patient_name"]
+        assert row["source"] in ("ocr", "digital")
+        assert row["garbage"] in GARBAGE_TYPES + (None,)
+        if row["source"] == "digital" and row["garbage"] is None:
+            assert doc[name_field] == patients[row["p_idx"]]["full_name"]
+            checked += 1
+    assert checked > 0
+    assert {row["garbage"] for row in linkage} > {None}
+    assert {row["contradiction"] for row in linkage} > {None}
+
+
+@pytest.mark.parametrize("determinism, variants", [
+    ("v1", [{"stream": True}, {"freetext_manifest": True}]),
+    ("v2", [{"stream": True}, {"workers": 2}]),
+])
+def test_same_ground_truth_in_every_mode(tmp_path, fake_llm, determinism, variants):
+    common = dict(num_patients=12, seed=6, determinism=determinism, ground_truth=True)
+    generate_documents(output_dir=str(tmp_path / "batch"), **common)
+    expected = _files(tmp_path / "batch" / GROUND_TRUTH_DIR)
+    for k, extra in enumerate(variants):
+        generate_documents(output_dir=str(tmp_path / str(k)), **common, **extra)
+        assert _files(tmp_path / str(k) / GROUND_TRUTH_DIR) == expected
+
+
+def test_documents_unchanged(tmp_path):
+    common = dict(num_patients=10, seed=2, skip_freetext=True)
+    generate_documents(output_dir=str(tmp_path / "a"), **common)
+    generate_documents(output_dir=str(tmp_path / "b"), ground_truth=True, **common)
+    assert _files(tmp_path / "a") == _files(tmp_path / "b")
+
+
+def test_shard_positions_are_local(tmp_path):
+    counts = generate_documents(num_patients=10, seed=2, output_dir=str(tmp_path), skip_freetext=True,
+                                determinism="v2", shard=(2, 2), ground_truth=True)
+    patients = _read(tmp_path / GROUND_TRUTH_DIR / "patients.ndjson")
+    linkage = _read(tmp_path / GROUND_TRUTH_DIR / "linkage.ndjson")
+    assert [p["p_idx"] for p in patients] == list(range(5, 10))
+    for name, count in counts.items():
+        assert [row["doc"] for row in linkage if row["index"] == name] == list(range(count))
+
+
+def test_inject_garbage_typed_matches_inject_garbage():
+    locale = load_locale("es_ES")
+    doc = {"edad": 40, "direccion": "Calle Mayor 1", "nombre": "Ana", "doc_type": "visit"}
+    seen = set()
+    for seed in range(400):
+        a_rng, b_rng = random.Random(seed), random.Random(seed)
+        typed, garbage = inject_garbage_typed(doc, a_rng, locale)
+        assert typed == inject_garbage(doc, b_rng, locale)
+        assert a_rng.random() == b_rng.random()
+        assert (garbage is None) == (typed == doc)
+        seen.add(garbage)
+    assert seen >= {None, "zero_age", "empty_field", "generic_location", "wrong_type"}
@@ -0,0 +1,38 @@
+"""Structured-only runs must not import the LLM stack (checked with ``python -X importtime``)."""
+
+import subprocess
+import sys
+import pytest
+
+# Only needed for free text / Elasticsearch / --workers; each costs tens to hundreds of ms
+DEFERRED = ("openai", "httpx", "pydantic", "dotenv", "http.client", "multiprocessing")
+
+
+def _imported(code: str, cwd) -> set[str]:
+    """Modules imported while running ``code`` in a fresh interpreter."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, check=True, cwd=cwd)
+    return {line.rsplit("|", 1)[1].strip() for line in proc.stderr.splitlines()
+            if line.startswith("import time:") and "|" in line}
+
+
+@pytest.mark.parametrize("code", [
+    "import medsynth.generate",
+    "import medsynth.fill",
+    "import sys; from medsynth.generate import main; "
+    "sys.argv = ['medsynth', '--skip-freetext', '--num-patients', '3', '--output-dir', 'out']; main()",
+])
+def test_structured_paths_skip_llm_stack(tmp_path, code):
+    modules = _imported(code, tmp_path)
+    assert "medsynth.text_slots" in modules
+    assert [m for m in DEFERRED if m in modules] == []
+
+
+def test_fill_does_not_load_generate(tmp_path):
+    assert "medsynth.generate" not in _imported("import medsynth.fill", tmp_path)
+
+
+def test_freetext_imports_openai_on_first_use(tmp_path):
+    pytest.importorskip("openai")
+    modules = _imported("from medsynth import freetext; freetext._retryable()", tmp_path)
+    assert "openai" in modules
@@ -0,0 +1,230 @@
+"""Tests for offline free-text generation via batch JSONL files."""
+
+import json
+import os
+import subprocess
+import sys
+import types
+import pytest
+from medsynth import freetext
+from medsynth.generate import generate_documents, main
+from medsynth.llm_batch import (
+    REQUESTS_FILE,
+    RESULTS_FILE,
+    STATE_FILE,
+    BatchSubmitError,
+    read_batch_results,
+    submit_batch,
+)
+
+
+def _run_batch(requests_path: str, fail_ids=()) -> str:
+    """Local stand-in for a batch runner: echoes like tests/conftest.FakeClient."""
+    lines = []
+    with open(requests_path, encoding="utf-8") as f:
+        for line in f:
+            request = json.loads(line)
+            if request["custom_id"] in fail_ids:
+                lines.append({"custom_id": request["custom_id"], "response": None,
+                              "error": {"code": "server_error", "message": "boom"}})
+                continue
+            content = request["body"]["messages"][1]["content"][:200]
+            lines.append({
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}},
+                "error": None,
+            })
+    return "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines)
+
+
+def _read(path):
+    return {f: open(os.path.join(path, f), "rb").read() for f in sorted(os.listdir(path)) if f.endswith(".ndjson")}
+
+
+def test_write_then_ingest_matches_direct_run(tmp_path, fake_llm):
+    common = dict(num_patients=10, seed=42, locale_code="he_IL")
+    direct = generate_documents(output_dir=str(tmp_path / "direct"), **common)
+    calls = fake_llm.calls
+
+    batch_dir = tmp_path / "batch"
+    out = str(tmp_path / "batched")
+    assert generate_documents(output_dir=out, llm_batch=str(batch_dir), **common) == {}
+    assert not _read(out)
+    requests = batch_dir / REQUESTS_FILE
+    assert len(requests.read_text(encoding="utf-8").splitlines()) == sum(direct.values())
+
+    (batch_dir / RESULTS_FILE).write_text(_run_batch(str(requests)), encoding="utf-8")
+    batched = generate_documents(output_dir=out, llm_batch=str(batch_dir), **common)
+    assert fake_llm.calls == calls  # no interactive requests
+    assert batched == direct
+    assert _read(out) == _read(tmp_path / "direct")
+
+
+def test_compact_pool_ingest_matches_direct_run(tmp_path, fake_llm):
+    common = dict(num_patients=10, seed=7, locale_code="es_MX", ground_truth=True)
+    direct = generate_documents(output_dir=str(tmp_path / "direct"), **common)
+
+    batch_dir = tmp_path / "batch"
+    out = str(tmp_path / "batched")
+    generate_documents(output_dir=out, llm_batch=str(batch_dir), compact_pool=True, **common)
+    requests = batch_dir / REQUESTS_FILE
+    (batch_dir / RESULTS_FILE).write_text(_run_batch(str(requests)), encoding="utf-8")
+    assert generate_documents(output_dir=out, llm_batch=str(batch_dir), compact_pool=True, **common) == direct
+    assert _read(out) == _read(tmp_path / "direct")
+    assert _read(os.path.join(out, "ground_truth")) == _read(tmp_path / "direct" / "ground_truth")
+
+
+def test_failed_results_read_as_errors(tmp_path):
+    requests = tmp_path / "requests.jsonl"
+    requests.write_text(
+        json.dumps({"custom_id": "doc-00000000", "body": {"messages": [{}, {"content": "x"}]}}) + "\n"
+        + json.dumps({"custom_id": "doc-00000001", "body": {"messages": [{}, {"content": "y"}]}}) + "\n",
+        encoding="utf-8",
+    )
+    results = tmp_path / "results.jsonl"
+    refusal = {"custom_id": "doc-00000002", "error": None,
+               "response": {"status_code": 200, "body": {"choices": [{"message": {"content": None}}]}}}
+    results.write_text(_run_batch(str(requests), fail_ids={"doc-00000001"}) + json.dumps(refusal) + "\n",
+                       encoding="utf-8")
+    parsed = read_batch_results(str(results))
+    assert parsed["doc-00000000"] == "x"
+    assert isinstance(parsed["doc-00000001"], Exception)
+    assert isinstance(parsed["doc-00000002"], Exception)
+
+
+def test_stale_results_rejected(tmp_path, monkeypatch, capsys):
+    batch_dir = tmp_path / "batch"
+    common = dict(num_patients=4, locale_code="es_AR", llm_batch=str(batch_dir))
+    generate_documents(seed=1, output_dir=str(tmp_path / "a"), **common)
+    (batch_dir / RESULTS_FILE).write_text(_run_batch(str(batch_dir / REQUESTS_FILE)), encoding="utf-8")
+    with pytest.raises(ValueError, match="different set of batch requests"):
+        generate_documents(seed=2, output_dir=str(tmp_path / "b"), **common)
+
+    monkeypatch.setattr(sys, "argv", ["medsynth", "--num-patients", "4", "--locale", "es_AR", "--seed", "2",
+                                      "--api-key", "x", "--output-dir", str(tmp_path / "b"),
+                                      "--llm-batch", str(batch_dir)])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 1
+    assert "Error: " in capsys.readouterr().err
+
+
+def test_cli_rejects_llm_cache(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["medsynth", "--num-patients", "3", "--api-key", "x", "--output-dir",
+                                      str(tmp_path / "out"), "--llm-batch", str(tmp_path / "batch"),
+                                      "--llm-cache", str(tmp_path / "cache.sqlite")])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 1
+    assert "Error: --llm-batch cannot be combined" in capsys.readouterr().err
+    with pytest.raises(ValueError, match="llm_cache"):
+        generate_documents(num_patients=3, seed=1, output_dir=str(tmp_path / "out"),
+                           llm_batch=str(tmp_path / "batch"), llm_cache=object())
+
+
+class FakeBatchClient:
+    """Minimal files/batches API: completes a batch after two polls."""
+
+    def __init__(self):
+        self.files_store = {}
+        self.created = 0
+        self.polls = 0
+        self.files = types.SimpleNamespace(create=self._upload, content=self._content)
+        self.batches = types.SimpleNamespace(create=self._create, retrieve=self._retrieve)
+
+    def _upload(self, file, purpose):
+        file_id = f"file-{len(self.files_store)}"
+        self.files_store[file_id] = file.read().decode("utf-8")
+        return types.SimpleNamespace(id=file_id)
+
+    def _content(self, file_id):
+        return types.SimpleNamespace(text=self.files_store[file_id])
+
+    def _create(self, input_file_id, endpoint, completion_window):
+        self.created += 1
+        self.input_file_id = input_file_id
+        return types.SimpleNamespace(id="batch-1")
+
+    def _retrieve(self, batch_id):
+        self.polls += 1
+        if self.polls < 3:
+            return types.SimpleNamespace(status="in_progress")
+        path = os.path.join(self.tmp, "in.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.files_store[self.input_file_id])
+        self.files_store["file-out"] = _run_batch(path)
+        return types.SimpleNamespace(status="completed", output_file_id="file-out", error_file_id=None)
+
+
+def test_submit_polls_and_ingests(tmp_path, fake_llm, monkeypatch):
+    common = dict(num_patients=6, seed=7, locale_code="ar_SA")
+    direct = generate_documents(output_dir=str(tmp_path / "direct"), **common)
+
+    client = FakeBatchClient()
+    client.tmp = str(tmp_path)
+    monkeypatch.setattr(freetext, "_get_client", lambda *a, **k: client)
+    monkeypatch.setattr("medsynth.config.LLM_BATCH_POLL_SECONDS", 0)
+    batch_dir = tmp_path / "batch"
+    out = str(tmp_path / "submitted")
+    counts = generate_documents(output_dir=out, llm_batch=str(batch_dir), llm_batch_submit=True, **common)
+    assert counts == direct
+    assert client.created == 1 and client.polls == 3
+    assert json.loads((batch_dir / STATE_FILE).read_text())["batch_id"] == "batch-1"
+    assert _read(out) == _read(tmp_path / "direct")
+
+
+def test_cli_writes_requests_and_explains_next_step(tmp_path):
+    batch_dir = tmp_path / "batch"
+    proc = subprocess.run(
+        [sys.executable, "-m", "medsynth.generate", "--num-patients", "3", "--output-dir", str(tmp_path / "out"),
+         "--llm-batch", str(batch_dir)],
+        capture_output=True, text=True, cwd=tmp_path,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert f"Wrote batch requests to {batch_dir}/{REQUESTS_FILE}" in proc.stdout
+    assert f"{batch_dir}/{RESULTS_FILE}" in proc.stdout
+    assert (batch_dir / REQUESTS_FILE).exists()
+
+
+def test_cli_reports_failed_submission(tmp_path, monkeypatch, capsys):
+    def _fail(**kwargs):
+        raise ConnectionError("upload refused")
+
+    client = types.SimpleNamespace(files=types.SimpleNamespace(create=_fail))
+    monkeypatch.setattr(freetext, "_get_client", lambda *a, **k: client)
+    monkeypatch.setattr(sys, "argv", ["medsynth", "--num-patients", "3", "--output-dir", str(tmp_path / "out"),
+                                      "--llm-batch", str(tmp_path / "batch"), "--llm-batch-submit"])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 1
+    err = capsys.readouterr().err
+    assert "Error: Could not submit" in err and "upload refused" in err
+
+
+@pytest.mark.parametrize("stage", ["poll", "download"])
+def test_wait_failures_raise_submit_error(tmp_path, monkeypatch, stage):
+    batch_dir = tmp_path / "batch"
+    batch_dir.mkdir()
+    (batch_dir / REQUESTS_FILE).write_text(
+        json.dumps({"custom_id": "doc-00000000", "body": {"messages": [{}, {"content": "x"}]}}) + "\n",
+        encoding="utf-8",
+    )
+    client = FakeBatchClient()
+    client.tmp = str(tmp_path)
+    monkeypatch.setattr(freetext, "_get_client", lambda *a, **k: client)
+
+    def _down(*args):
+        raise ConnectionError("connection reset")
+    if stage == "poll":
+        client.batches.retrieve = _down
+    else:
+        client.files.content = _down
+    with pytest.raises(BatchSubmitError, match="connection reset"):
+        submit_batch(str(batch_dir), sleep=lambda s: None)
+
+    # The recorded batch id lets the next run pick up where this one stopped
+    client.batches.retrieve = client._retrieve
+    client.files.content = client._content
+    submit_batch(str(batch_dir), sleep=lambda s: None)
+    assert client.created == 1
+    assert read_batch_results(str(batch_dir / RESULTS_FILE)) == {"doc-00000000": "x"}
@@ -0,0 +1,74 @@
+"""Tests for the persistent LLM text cache."""
+
+import os
+import pytest
+from medsynth.generate import generate_documents
+from medsynth.llm_cache import LlmCache, cache_key
+
+
+def _read(path):
+    return {f: open(os.path.join(path, f), "rb").read() for f in sorted(os.listdir(path))}
+
+
+def test_key_covers_every_request_field():
+    base = ("m", "sys", "prompt", 0.8, 800)
+    keys = {cache_key(*base)}
+    for i, other in enumerate(["m2", "sys2", "prompt2", 0.7, 500]):
+        changed = list(base)
+        changed[i] = other
+        keys.add(cache_key(*changed))
+    assert len(keys) == 6
+    assert cache_key(*base) == cache_key(*base)
+
+
+def test_get_put_and_counters(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with LlmCache(path) as cache:
+        assert cache.get("a") is None
+        cache.put("a", "טקסט קליני")
+        assert cache.get("a") == "טקסט קליני"
+        assert (cache.hits, cache.misses) == (1, 1)
+    with LlmCache(path) as reopened:
+        assert reopened.get("a") == "טקסט קליני"
+        assert len(reopened) == 1
+
+
+def test_lru_eviction(tmp_path):
+    with LlmCache(str(tmp_path / "c.sqlite"), max_bytes=30) as cache:
+        cache.put("old", "x" * 10)
+        cache.put("used", "y" * 10)
+        cache.put("mid", "z" * 10)
+        assert cache.get("old") == "x" * 10  # now most recently used
+        cache.put("new", "w" * 10)
+        assert cache.get("used") is None
+        assert cache.get("old") == "x" * 10
+        assert cache.size_bytes <= 30
+
+
+def test_readonly(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    with pytest.raises(FileNotFoundError):
+        LlmCache(path, readonly=True)
+    with LlmCache(path) as cache:
+        cache.put("a", "text")
+    with LlmCache(path, readonly=True) as cache:
+        cache.put("b", "ignored")
+        assert cache.get("a") == "text"
+        assert cache.get("b") is None
+    with LlmCache(path) as cache:
+        assert len(cache) == 1
+
+
+@pytest.mark.parametrize("extra", [{}, {"determinism": "v2", "workers": 2}])
+def test_warm_run_skips_llm(tmp_path, fake_llm, extra):
+    common = dict(num_patients=8, seed=42, locale_code="es_ES", **extra)
+    with LlmCache(str(tmp_path / "c.sqlite")) as cache:
+        cold = generate_documents(output_dir=str(tmp_path / "cold"), llm_cache=cache, **common)
+    cold_calls = fake_llm.calls
+    with LlmCache(str(tmp_path / "c.sqlite"), readonly=True) as cache:
+        warm = generate_documents(output_dir=str(tmp_path / "warm"), llm_cache=cache, **common)
+        assert cache.misses == 0
+        assert cache.hits == sum(cold.values())
+    assert fake_llm.calls == cold_calls
+    assert warm == cold
+    assert _read(tmp_path / "cold") == _read(tmp_path / "warm")
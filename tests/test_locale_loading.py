@@ -128,3 +128,14 @@ def test_fallback_strings(code):
     locale = load_locale(code)
     assert "no_diagnosis" in locale.fallback_strings
     assert "referral_default" in locale.fallback_strings
+
+
+@pytest.mark.parametrize("code", ALL_LOCALES)
+def test_field_reverse_index(code):
+    locale = load_locale(code)
+    for concept, names in locale.concept_fields.items():
+        assert names == {f[concept] for f in locale.field_names.values() if f.get(concept) is not None}
+    for facility_id, fnames in locale.field_names.items():
+        concepts = locale.field_concepts[facility_id]
+        assert set(concepts) == {name for name in fnames.values() if name is not None}
+        assert all(fnames[concept] == name for name, concept in concepts.items())
@@ -0,0 +1,92 @@
+"""Tests for the vectorized NumPy noise backend."""
+
+import os
+import random
+import pytest
+from medsynth.distortions import apply_field_distortions, apply_ocr_noise
+from medsynth.generate import generate_documents
+from medsynth.locales import load_locale
+from medsynth.seeding import RngPlan
+
+np = pytest.importorskip("numpy")
+from medsynth import noise_numpy  # noqa: E402
+
+
+@pytest.fixture(params=["he_IL", "ar_SA", "es_MX"])
+def locale(request):
+    return load_locale(request.param)
+
+
+def _text(locale):
+    return " ".join(locale.conditions + locale.medications) * 3
+
+
+def test_deterministic_for_same_seed(locale):
+    texts = [_text(locale), "", locale.conditions[0]]
+    a = noise_numpy.ocr_noise(texts, random.Random(7), locale.ocr_model)
+    b = noise_numpy.ocr_noise(texts, random.Random(7), locale.ocr_model)
+    assert a == b
+    assert a[1] == ""
+    assert a[0] != texts[0]
+
+
+def test_consumes_one_draw_per_call(locale):
+    rng = random.Random(7)
+    noise_numpy.ocr_noise([_text(locale)] * 5, rng, locale.ocr_model)
+    noise_numpy.digital_typos([_text(locale)], rng)
+    reference = random.Random(7)
+    reference.getrandbits(64)
+    reference.getrandbits(64)
+    assert rng.random() == reference.random()
+
+
+def test_error_rates_roughly_match(locale):
+    text = _text(locale) * 20
+    zero = noise_numpy.ocr_noise([text], random.Random(1), locale.ocr_model, 0.0, 0.0, 0.0)
+    assert zero == [text]
+    typos = noise_numpy.digital_typos([text], random.Random(1), rate=0.5)[0]
+    assert typos != text
+    # Drops and doubles are equally likely, so the length stays close
+    assert abs(len(typos) - len(text)) < 0.05 * len(text)
+
+
+def test_multi_char_match_stops_at_text_boundary():
+    locale = load_locale("es_MX")
+    # "ri" -> "n" must not merge the last char of one text with the next text
+    noised = noise_numpy.ocr_noise(["r", "i"], random.Random(3), locale.ocr_model, error_rate=1.0,
+                                   space_drop_rate=0.0, space_insert_rate=0.0)
+    assert noised[0] == "r"
+    assert noised[1] != ""
+
+
+def test_field_distortions_batch():
+    locale = load_locale("he_IL")
+    facility = next(f for f in locale.facilities if "ocr" in f["source"].values())
+    doc_type = next(dt for dt, src in facility["source"].items() if src == "ocr")
+    doc = {"name": "ישראל ישראלי" * 5, "conditions": ["סוכרת"] * 20, "lab_results": [{"test": "x"}]}
+    a = apply_field_distortions(doc, facility["id"], doc_type, random.Random(1), locale, "numpy")
+    b = apply_field_distortions(doc, facility["id"], doc_type, random.Random(1), locale, "numpy")
+    assert a == b
+    assert doc["conditions"] == ["סוכרת"] * 20  # input untouched
+    assert a["lab_results"] is not None and len(a["conditions"]) == 20
+
+
+def test_python_backend_unchanged():
+    locale = load_locale("he_IL")
+    text = _text(locale)
+    assert (apply_ocr_noise(text, random.Random(5), locale.ocr_model)
+            == apply_ocr_noise(text, random.Random(5), locale.ocr_patterns))
+
+
+def test_unknown_backend_raises():
+    with pytest.raises(ValueError, match="Unknown noise backend"):
+        RngPlan(42, "v1", "cython")
+
+
+def test_generate_with_numpy_backend(tmp_path, fake_llm):
+    common = dict(num_patients=6, seed=42, locale_code="ar_SA", noise_backend="numpy")
+    a = generate_documents(output_dir=str(tmp_path / "a"), **common)
+    b = generate_documents(output_dir=str(tmp_path / "b"), **common)
+    assert a == b
+    for name in os.listdir(tmp_path / "a"):
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
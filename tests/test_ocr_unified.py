@@ -4,7 +4,7 @@ import random
 import pytest
 from medsynth.distortions import apply_ocr_noise
 from medsynth.locales import load_locale
-from medsynth.locales.base import OcrPattern
+from medsynth.locales.base import OcrPattern, compile_ocr_model
 from medsynth.locales.scripts.hebrew import HEBREW_OCR_PATTERNS
 from medsynth.locales.scripts.latin import LATIN_OCR_PATTERNS
 
@@ -97,3 +97,81 @@ def test_hebrew_patterns_non_empty():
     assert len(HEBREW_OCR_PATTERNS) > 0
     for p in HEBREW_OCR_PATTERNS:
         assert isinstance(p, OcrPattern)
+
+
+def _reference_ocr_noise(text, rng, ocr_patterns, error_rate, space_drop_rate, space_insert_rate):
+    """Verbatim pre-compilation implementation, kept to pin RNG compatibility."""
+    pattern_index = {}
+    max_len = 1
+    for p in ocr_patterns:
+        pattern_index.setdefault(p.source, []).append(p)
+        if len(p.source) > max_len:
+            max_len = len(p.source)
+    chars = text
+    result = []
+    i = 0
+    while i < len(chars):
+        c = chars[i]
+        if c == " " and rng.random() < space_drop_rate:
+            i += 1
+            continue
+        if c != " " and rng.random() < space_insert_rate:
+            result.append(" ")
+        if rng.random() < error_rate:
+            matched = False
+            for window in range(min(max_len, len(chars) - i), 0, -1):
+                candidates = pattern_index.get(chars[i:i + window])
+                if candidates:
+                    total_weight = sum(p.weight for p in candidates)
+                    pick = rng.random() * total_weight
+                    cumulative = 0.0
+                    for p in candidates:
+                        cumulative += p.weight
+                        if pick <= cumulative:
+                            result.append(p.target)
+                            i += window
+                            matched = True
+                            break
+                    if matched:
+                        break
+            if matched:
+                continue
+        result.append(c)
+        i += 1
+    return "".join(result)
+
+
+OVERLAPPING = [
+    OcrPattern("a", "1", 0.3), OcrPattern("ab", "2", 0.7), OcrPattern("abc", "3", 0.2),
+    OcrPattern("ab", "4", 0.1), OcrPattern("bc", "", 1.0), OcrPattern("c", "C", 0.5),
+]
+
+
+@pytest.mark.parametrize("code", ["he_IL", "ar_SA", "es_MX"])
+def test_compiled_model_matches_reference(code):
+    """Compiled engine must consume the RNG exactly like the original scan."""
+    locale = load_locale(code)
+    corpus = " ".join(locale.conditions + locale.medications + locale.cities) + " rn cl vv 0158 ab abc"
+    for seed in range(40):
+        for rates in [(0.03, 0.02, 0.008), (0.6, 0.3, 0.2), (1.0, 0.0, 0.0)]:
+            text = corpus[seed * 7:seed * 7 + 300]
+            rng_a, rng_b = random.Random(seed), random.Random(seed)
+            expected = _reference_ocr_noise(text, rng_a, locale.ocr_patterns, *rates)
+            assert apply_ocr_noise(text, rng_b, locale.ocr_model, *rates) == expected
+            assert rng_a.getstate() == rng_b.getstate()
+
+
+def test_overlapping_patterns_match_reference():
+    text = "abcabxab cbcaabc " * 20
+    for seed in range(50):
+        rng_a, rng_b = random.Random(seed), random.Random(seed)
+        expected = _reference_ocr_noise(text, rng_a, OVERLAPPING, 0.5, 0.1, 0.1)
+        assert apply_ocr_noise(text, rng_b, OVERLAPPING, 0.5, 0.1, 0.1) == expected
+        assert rng_a.getstate() == rng_b.getstate()
+
+
+def test_locale_model_is_cached():
+    locale = load_locale("he_IL")
+    assert locale.ocr_model is compile_ocr_model(list(locale.ocr_patterns))
+    assert locale.ocr_model.field_map["ר"] == "ד"
+    assert "1" not in locale.ocr_model.field_map  # digit sources only apply to full OCR noise
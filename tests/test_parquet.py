@@ -0,0 +1,111 @@
+"""Tests for the Parquet export (--parquet)."""
+
+import json
+import sys
+import pytest
+from medsynth import columnar
+from medsynth.generate import generate_documents
+from medsynth.locales import load_locale
+
+
+def _docs(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def _fits(value, column_value):
+    """Equal, or a garbage value the export coerced (see medsynth.columnar)."""
+    return column_value == value or isinstance(value, (str, int)) and type(column_value) is not type(value)
+
+
+@pytest.mark.parametrize("locale_code", ["he_IL", "es_ES", "ar_EG"])
+def test_export_matches_ndjson(tmp_path, locale_code):
+    pq = pytest.importorskip("pyarrow.parquet")
+    counts = generate_documents(num_patients=40, seed=3, output_dir=str(tmp_path),
+                                locale_code=locale_code, skip_freetext=True)
+    assert columnar.export_parquet(str(tmp_path), load_locale(locale_code), row_group_rows=10) == counts
+    for idx_name, count in counts.items():
+        parquet = pq.ParquetFile(tmp_path / f"{idx_name}.parquet")
+        assert parquet.metadata.num_rows == count
+        assert parquet.num_row_groups == -(-count // 10)
+        rows = parquet.read().to_pylist()
+        for doc, row in zip(_docs(tmp_path / f"{idx_name}.ndjson"), rows):
+            assert all(_fits(value, row[key]) for key, value in doc.items())
+            assert set(row) >= set(doc)
+
+
+def test_column_types_follow_facility_schema():
+    pa = pytest.importorskip("pyarrow")
+    locale = load_locale("he_IL")
+    for facility in locale.facilities:
+        fnames = locale.field_names[facility["id"]]
+        for doc_type in facility["doc_types"]:
+            schema, _ = columnar.index_schema(facility["id"], doc_type, locale)
+            id_type = {"int": pa.int64(), "float": pa.float64()}.get(facility["id_type"], pa.string())
+            assert schema.field(fnames["patient_id"]).type == id_type
+            if fnames.get("age") is not None:
+                age_type = pa.string() if facility.get("age_format") == "range" else pa.int32()
+                assert schema.field(fnames["age"]).type == age_type
+            if fnames.get("conditions") is not None:
+                assert schema.field(fnames["conditions"]).type == pa.list_(pa.string())
+            if doc_type == "lab":
+                lab = schema.field("lab_results").type
+                assert pa.types.is_list(lab) and pa.types.is_struct(lab.value_type)
+
+
+def test_garbage_is_coerced_like_elasticsearch(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    schema = pa.schema([
+        ("id", pa.int64()), ("age", pa.int32()), ("smoker", pa.bool_()), ("name", pa.string()),
+        ("tags", pa.list_(pa.string())),
+        ("labs", pa.list_(pa.struct([("test", pa.string()), ("value", pa.float64())]))),
+    ])
+    coercers = {
+        "id": columnar._to_int, "age": columnar._to_int, "smoker": columnar._to_bool,
+        "name": columnar._to_str, "tags": columnar._to_str_list,
+        "labs": columnar._struct_coercer({"test": columnar._to_str, "value": columnar._to_float}),
+    }
+    docs = [
+        {"id": "123", "age": "", "smoker": "False", "name": 7, "tags": "", "labs": ""},
+        {"id": 5, "age": 40.0, "smoker": "", "name": "x", "tags": ["a", 1],
+         "labs": [{"test": "HGB", "value": "13.5"}]},
+    ]
+    path = str(tmp_path / "t.parquet")
+    assert columnar.write_parquet(docs, path, schema, coercers) == 2
+    assert pq.read_table(path).to_pylist() == [
+        {"id": 123, "age": None, "smoker": None, "name": "7", "tags": [""], "labs": None},
+        {"id": 5, "age": 40, "smoker": False, "name": "x", "tags": ["a", "1"],
+         "labs": [{"test": "HGB", "value": 13.5}]},
+    ]
+    with pytest.raises(ValueError, match="not in the index schema"):
+        columnar.write_parquet([{"other": 1}], path, schema, coercers)
+
+
+def test_reads_compressed_chunks(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    common = dict(num_patients=10, seed=1, skip_freetext=True)
+    generate_documents(output_dir=str(tmp_path / "plain"), **common)
+    generate_documents(output_dir=str(tmp_path / "gz"), compress="gzip", chunk_bytes=2000, **common)
+    locale = load_locale("he_IL")
+    columnar.export_parquet(str(tmp_path / "plain"), locale)
+    counts = columnar.export_parquet(str(tmp_path / "gz"), locale)
+    for idx_name in counts:
+        plain = pq.read_table(tmp_path / "plain" / f"{idx_name}.parquet")
+        assert pq.read_table(tmp_path / "gz" / f"{idx_name}.parquet").equals(plain)
+
+
+def test_missing_pyarrow_hint(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(ImportError, match=r"e2llm-medsynth\[parquet\]"):
+        columnar.require_pyarrow()
+
+
+def test_exports_ground_truth(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    generate_documents(num_patients=15, seed=2, output_dir=str(tmp_path), locale_code="ar_EG",
+                       skip_freetext=True, ground_truth=True)
+    columnar.export_parquet(str(tmp_path), load_locale("ar_EG"))
+    for name in ("patients", "linkage"):
+        table = pq.read_table(tmp_path / "ground_truth" / f"{name}.parquet")
+        assert table.to_pylist() == _docs(tmp_path / "ground_truth" / f"{name}.ndjson")
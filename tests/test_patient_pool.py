@@ -0,0 +1,98 @@
+"""Tests for the compact, array-backed patient pool."""
+
+import os
+import sys
+import pytest
+from medsynth import patient_pool
+from medsynth.generate import generate_documents, main
+from medsynth.locales import load_locale
+from medsynth.patient_pool import PatientPool
+from medsynth.patients import generate_patients
+
+
+def _files(path):
+    return {f: open(os.path.join(path, f), "rb").read() for f in sorted(os.listdir(path)) if f.endswith(".ndjson")}
+
+
+@pytest.mark.parametrize("locale_code", ["he_IL", "es_MX", "ar_SA"])
+def test_rows_read_back_the_patients(locale_code):
+    patients = generate_patients(200, 5, load_locale(locale_code))
+    pool = PatientPool(patients)
+    assert len(pool) == 200
+    for row, patient in zip(pool, patients):
+        assert row == patient and list(row.items()) == list(patient.items())
+        assert all(type(row[k]) is type(v) for k, v in patient.items())
+    assert pool[-1] == patients[-1]
+    with pytest.raises(IndexError):
+        pool[200]
+
+
+def test_mixed_shapes_and_types():
+    patients = [
+        {"id": "1", "smoking": True, "conditions": ["a", "b"]},
+        {"id": "2", "smoking": 1, "extra": None},
+        {"conditions": [], "id": "3", "smoking": False, "extra": 1.0},
+    ]
+    pool = PatientPool(patients)
+    assert [dict(row) for row in pool] == patients
+    assert [list(row) for row in pool] == [list(p) for p in patients]
+    assert type(pool[0]["smoking"]) is bool and type(pool[1]["smoking"]) is int
+    assert pool[1].get("conditions", "missing") == "missing"
+    assert "extra" not in pool[0]
+    with pytest.raises(KeyError):
+        pool[0]["extra"]
+    with pytest.raises(TypeError, match="mixes list"):
+        pool.append({"conditions": "a"})
+
+
+def test_distinct_columns_switch_to_plain_values(monkeypatch):
+    monkeypatch.setattr(patient_pool, "_MAX_DISTINCT", 8)
+    patients = [{"id": f"P{i}", "city": "abc"[i % 3]} for i in range(50)]
+    pool = PatientPool(patients)
+    assert pool._columns["id"].codes is None
+    assert pool._columns["city"].codes is not None
+    assert [dict(row) for row in pool] == patients
+
+
+def test_row_lists_are_fresh():
+    pool = PatientPool([{"conditions": ["a"]}])
+    pool[0]["conditions"].append("b")
+    assert pool[0]["conditions"] == ["a"]
+
+
+@pytest.mark.parametrize("extra", [{"skip_freetext": True}, {"determinism": "v2"}])
+def test_same_corpus_as_dict_pool(tmp_path, fake_llm, extra):
+    common = dict(num_patients=15, seed=8, ground_truth=True, **extra)
+    generate_documents(output_dir=str(tmp_path / "dicts"), **common)
+    generate_documents(output_dir=str(tmp_path / "pool"), compact_pool=True, **common)
+    assert _files(tmp_path / "pool") == _files(tmp_path / "dicts")
+    assert _files(tmp_path / "pool" / "ground_truth") == _files(tmp_path / "dicts" / "ground_truth")
+
+
+def test_cli_same_corpus_as_dict_pool(tmp_path, fake_llm, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for out, extra in (("dicts", []), ("pool", ["--compact-pool"])):
+        monkeypatch.setattr(sys, "argv", ["medsynth", "--num-patients", "8", "--seed", "4", "--api-key", "x",
+                                          "--output-dir", out, *extra])
+        main()
+    assert _files(tmp_path / "pool") == _files(tmp_path / "dicts")
+
+
+@pytest.mark.parametrize("extra", [
+    {"stream": True},
+    {"workers": 2, "determinism": "v2"},
+    {"shard": (1, 2), "determinism": "v2"},
+    {"freetext_manifest": "manifest.jsonl"},
+])
+def test_rejected_where_the_pool_is_never_held(tmp_path, extra):
+    with pytest.raises(ValueError, match="compact_pool"):
+        generate_documents(num_patients=3, seed=1, output_dir=str(tmp_path), compact_pool=True, **extra)
+
+
+def test_cli_rejects_streaming_modes(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["medsynth", "--skip-freetext", "--num-patients", "3",
+                                      "--output-dir", str(tmp_path), "--compact-pool", "--stream"])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 1
+    assert "Error: --compact-pool" in capsys.readouterr().err
@@ -0,0 +1,70 @@
+"""Tests for the NDJSON serialization layer."""
+
+import json
+import os
+import pytest
+from medsynth import serialize
+from medsynth.generate import generate_documents
+from medsynth.serialize import line_encoder
+
+EDGE_DOCS = [
+    {"text": "tab\there\nnew \"quoted\" \\ \x00\x1f\x7f    😀 שלום مرحبا"},
+    {"values": [0.1, 1e-05, 0.0001, 123456789.0, 1e15, 1e16, -0.0, 2.5e-300, 1.5e300]},
+    {"value": float("nan"), "other": [{"x": float("-inf")}]},
+    {"sep": "line\u2028para\u2029 \U0001f600 \u00e9 \u200f"},
+    {"big": 2 ** 70, "neg": -(2 ** 63), "none": None, "flags": [True, False]},
+    {"lab_results": [{"test_name": "HbA1c", "result": 6.1, "flag": ""}], "e1": "1e5 in text"},
+    {1: "int key", "nested": {"a": [[], {}]}},
+]
+
+
+def _corpus_docs(path):
+    docs = []
+    for f in sorted(os.listdir(path)):
+        with open(os.path.join(path, f), encoding="utf-8") as fh:
+            docs.extend(json.loads(line) for line in fh)
+    return docs
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    docs = []
+    for code in ("he_IL", "ar_EG", "es_MX"):
+        out = tmp_path_factory.mktemp(code)
+        generate_documents(num_patients=15, seed=9, output_dir=str(out), locale_code=code, skip_freetext=True)
+        docs.extend(_corpus_docs(out))
+    return docs
+
+
+def test_default_matches_json_dumps(corpus):
+    encode = line_encoder("default")
+    for doc in corpus + EDGE_DOCS:
+        assert encode(doc) == (json.dumps(doc, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def test_compact_orjson_matches_stdlib(corpus):
+    pytest.importorskip("orjson")
+    fast, stdlib = line_encoder("compact"), line_encoder("compact", fast=False)
+    assert fast is not stdlib
+    for doc in corpus + EDGE_DOCS:
+        assert fast(doc) == stdlib(doc)
+        assert stdlib(doc) == (json.dumps(doc, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+
+
+def test_compact_without_orjson(monkeypatch, corpus):
+    monkeypatch.setattr(serialize, "orjson", None)
+    encode = line_encoder("compact")
+    assert encode(corpus[0]) == (json.dumps(corpus[0], ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+
+
+def test_compact_corpus(tmp_path):
+    common = dict(num_patients=10, seed=4, skip_freetext=True)
+    generate_documents(output_dir=str(tmp_path / "default"), **common)
+    generate_documents(output_dir=str(tmp_path / "compact"), json_style="compact", **common)
+    for f in os.listdir(tmp_path / "default"):
+        default = (tmp_path / "default" / f).read_text(encoding="utf-8").splitlines()
+        compact = (tmp_path / "compact" / f).read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in default] == [json.loads(line) for line in compact]
+        assert compact == [json.dumps(json.loads(line), ensure_ascii=False, separators=(",", ":")) for line in default]
+    with pytest.raises(ValueError, match="Unknown JSON style"):
+        line_encoder("pretty")
@@ -0,0 +1,84 @@
+"""Tests for node-level sharding (--shard K/N) and shard manifests."""
+
+import json
+import os
+import sys
+import pytest
+from medsynth.generate import generate_documents, main
+from medsynth.shards import parse_shard, shard_range, verify_shards
+
+COMMON = dict(num_patients=17, seed=42, locale_code="he_IL", skip_freetext=True, determinism="v2")
+
+
+@pytest.fixture(scope="module")
+def sharded(tmp_path_factory):
+    root = tmp_path_factory.mktemp("shards")
+    generate_documents(output_dir=str(root / "full"), **COMMON)
+    for k in (1, 2, 3):
+        generate_documents(output_dir=str(root / f"s{k}"), shard=(k, 3), **COMMON)
+    return root
+
+
+def test_shards_concatenate_to_full_run(sharded):
+    full = sharded / "full"
+    for name in os.listdir(full):
+        merged = b"".join(
+            (sharded / f"s{k}" / name).read_bytes()
+            for k in (1, 2, 3)
+            if (sharded / f"s{k}" / name).exists()
+        )
+        assert merged == (full / name).read_bytes()
+
+
+def test_verify_complete_set(sharded):
+    summary = verify_shards([str(sharded / f"s{k}") for k in (1, 2, 3)])
+    assert summary["num_shards"] == 3
+    full_docs = sum(1 for f in os.listdir(sharded / "full") for _ in open(sharded / "full" / f))
+    assert summary["docs"] == full_docs
+
+
+def test_verify_missing_shard(sharded):
+    with pytest.raises(ValueError, match="Missing shards: 2/3"):
+        verify_shards([str(sharded / "s1"), str(sharded / "s3")])
+
+
+def test_verify_inconsistent_params(sharded, tmp_path):
+    generate_documents(output_dir=str(tmp_path), shard=(2, 3), **{**COMMON, "seed": 7})
+    with pytest.raises(ValueError, match="params"):
+        verify_shards([str(sharded / "s1"), str(tmp_path), str(sharded / "s3")])
+
+
+def test_verify_checksum_mismatch(sharded, tmp_path):
+    import shutil
+    shutil.copytree(sharded / "s2", tmp_path / "s2")
+    manifest = next(p for p in os.listdir(tmp_path / "s2") if p.endswith(".json"))
+    victim = next(iter(json.load(open(tmp_path / "s2" / manifest))["files"]))
+    with open(tmp_path / "s2" / victim, "a", encoding="utf-8") as f:
+        f.write("{}\n")
+    with pytest.raises(ValueError, match="checksum mismatch"):
+        verify_shards([str(sharded / "s1"), str(tmp_path / "s2"), str(sharded / "s3")])
+
+
+def test_shard_requires_v2(tmp_path):
+    with pytest.raises(ValueError, match="v2"):
+        generate_documents(output_dir=str(tmp_path), shard=(1, 2), **{**COMMON, "determinism": "v1"})
+
+
+@pytest.mark.parametrize("spec", ["0/3", "4/3", "1", "a/b", "1/0"])
+def test_parse_shard_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_shard(spec)
+
+
+def test_shard_range_covers_small_corpus():
+    ranges = [shard_range(2, (k, 4)) for k in range(1, 5)]
+    assert ranges == [(0, 1), (1, 2), (2, 2), (2, 2)]
+
+
+def test_cli_rejects_shard_without_v2(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["medsynth", "--skip-freetext", "--num-patients", "3",
+                                      "--output-dir", str(tmp_path), "--shard", "1/2"])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 1
+    assert "require --determinism v2" in capsys.readouterr().err
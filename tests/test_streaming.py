@@ -0,0 +1,54 @@
+"""Tests for streaming generation — must be byte-identical to batch mode."""
+
+import os
+import pytest
+from medsynth.generate import generate_documents
+from medsynth.writers import NdjsonWriter
+
+
+def _read_dir(path):
+    return {
+        f: open(os.path.join(path, f), "rb").read()
+        for f in sorted(os.listdir(path))
+    }
+
+
+def _generate(path, **kwargs):
+    return generate_documents(
+        num_patients=15, seed=42, output_dir=str(path), locale_code="he_IL", **kwargs,
+    )
+
+
+def test_stream_matches_batch_structured(tmp_path):
+    batch = _generate(tmp_path / "batch", skip_freetext=True)
+    stream = _generate(tmp_path / "stream", skip_freetext=True, stream=True, buffer_docs=1)
+    assert batch == stream
+    assert _read_dir(tmp_path / "batch") == _read_dir(tmp_path / "stream")
+
+
+def test_stream_matches_batch_freetext(tmp_path, fake_llm):
+    batch = _generate(tmp_path / "batch")
+    stream = _generate(tmp_path / "stream", stream=True, buffer_docs=2)
+    assert batch == stream
+    assert _read_dir(tmp_path / "batch") == _read_dir(tmp_path / "stream")
+
+
+def test_stream_leaves_no_spool(tmp_path, fake_llm):
+    _generate(tmp_path, stream=True)
+    assert all(f.endswith(".ndjson") for f in os.listdir(tmp_path))
+
+
+def test_writer_output(tmp_path):
+    path = tmp_path / "out.ndjson"
+    with NdjsonWriter(str(path), buffer_docs=2) as writer:
+        for i in range(3):
+            writer.write({"a": i, "b": "שלום"})
+    assert writer.count == 3
+    assert path.read_text(encoding="utf-8") == (
+        '{"a": 0, "b": "שלום"}\n{"a": 1, "b": "שלום"}\n{"a": 2, "b": "שלום"}\n'
+    )
+
+
+def test_writer_rejects_empty_buffer(tmp_path):
+    with pytest.raises(ValueError, match="buffer_docs"):
+        NdjsonWriter(str(tmp_path / "out.ndjson"), buffer_docs=0)
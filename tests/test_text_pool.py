@@ -0,0 +1,105 @@
+"""Tests for the prompt-class text pool."""
+
+import pytest
+from medsynth.freetext import iter_clinical_texts
+from medsynth.generate import generate_documents
+from medsynth.locales import load_locale
+from medsynth.patients import generate_patients
+from medsynth.text_pool import NAME_PLACEHOLDER, TextPool
+
+
+def _items(locale, n, contradiction=None):
+    facility = locale.facilities[0]
+    return [
+        {
+            "patient": dict(p, conditions=[], medications=[]),
+            "p_idx": i,
+            "facility_id": facility["id"],
+            "doc_type": facility["doc_types"][0],
+            "contradiction": contradiction,
+        }
+        for i, p in enumerate(generate_patients(n, 5, locale))
+    ]
+
+
+def test_equivalent_prompts_share_texts(fake_llm):
+    locale = load_locale("he_IL")
+    items = [item for item in _items(locale, 40) if item["patient"]["gender"] == "female"]
+    items = [dict(item, patient=dict(item["patient"], smoking=False)) for item in items]
+    pool = TextPool(2, seed=1)
+    results = list(iter_clinical_texts(items, locale, pool=pool))
+    assert fake_llm.calls == pool.requests == 2
+    assert pool.reused == len(items) - 2
+    for item, text in results:
+        # FakeClient echoes the prompt, so the filled-in name must be the item's own
+        assert item["patient"]["full_name"] in text
+        assert NAME_PLACEHOLDER not in text
+
+
+def test_fill_failure_is_a_per_item_error(fake_llm, monkeypatch):
+    locale = load_locale("he_IL")
+    items = _items(locale, 6)
+    pool = TextPool(1, seed=1)
+
+    def _fill(text, item):
+        if item["p_idx"] == 2:
+            raise ValueError("bad template")
+        return text
+
+    monkeypatch.setattr(pool, "fill", _fill)
+    results = list(iter_clinical_texts(items, locale, pool=pool, concurrency=2))
+    assert [item["p_idx"] for item, _ in results] == list(range(6))
+    errors = [(item["p_idx"], str(text)) for item, text in results if isinstance(text, Exception)]
+    assert errors == [(2, "bad template")]
+
+
+def test_variant_choice_is_order_independent():
+    locale = load_locale("es_ES")
+    pool = TextPool(4, seed=9)
+    items = _items(locale, 30)
+    picks = [pool.variant(item, pool.prompt_class(pool.template(item, locale), locale)) for item in items]
+    again = [pool.variant(item, pool.prompt_class(pool.template(item, locale), locale))
+             for item in reversed(items)]
+    assert picks == again[::-1]
+    assert set(picks) == {0, 1, 2, 3}
+
+
+def test_age_contradiction_survives_pooling():
+    locale = load_locale("es_MX")
+    pool = TextPool(1)
+    contradiction = {
+        "type": "age", "structured_value": 40, "text_value": 55,
+        "text_should_say": locale.contradiction_templates["age"].format(age=55),
+    }
+    item = _items(locale, 1, contradiction)[0]
+    template = pool.template(item, locale)
+    prompt = pool.prompt_class(template, locale)
+    assert "55" not in prompt
+    filled = pool.fill(template["contradiction"]["text_should_say"], item)
+    assert filled == contradiction["text_should_say"]
+
+
+def test_list_fields_placeholders():
+    locale = load_locale("he_IL")
+    pool = TextPool(1, fields=("name", "age", "conditions", "medications"))
+    item = _items(locale, 1)[0]
+    item["patient"].update(conditions=locale.conditions[:2], medications=locale.medications[:1])
+    template = pool.template(item, locale)
+    assert locale.conditions[0] not in pool.prompt_class(template, locale)
+    assert pool.fill("[[CONDITIONS]] / [[MEDICATIONS]]", item) == (
+        f"{', '.join(locale.conditions[:2])} / {locale.medications[0]}"
+    )
+    with pytest.raises(ValueError, match="Unknown text pool field"):
+        TextPool(1, fields=("name", "address"))
+
+
+def test_pooled_corpus_same_across_workers(tmp_path, fake_llm):
+    common = dict(num_patients=12, seed=3, locale_code="ar_EG", determinism="v2")
+    fields = ("name", "age", "conditions", "medications")
+    single = generate_documents(output_dir=str(tmp_path / "a"), text_pool=TextPool(2, 3, fields), **common)
+    multi = generate_documents(output_dir=str(tmp_path / "b"), workers=2,
+                               text_pool=TextPool(2, 3, fields), **common)
+    assert single == multi
+    for name in single:
+        a = (tmp_path / "a" / f"{name}.ndjson").read_bytes()
+        assert a == (tmp_path / "b" / f"{name}.ndjson").read_bytes()
@@ -0,0 +1,124 @@
+"""Tests for the two-phase pipeline (free-text manifest + medsynth.fill)."""
+
+import json
+import os
+import sys
+import types
+import pytest
+from medsynth import fill, freetext
+from medsynth.fill import apply_patches, fill_freetext
+from medsynth.generate import generate_documents, main
+from medsynth.llm_cache import LlmCache
+from medsynth.text_pool import POOL_FIELDS, TextPool
+from medsynth.manifest import MANIFEST_FILE, iter_manifest
+
+
+def _ndjson(path):
+    return {f: open(os.path.join(path, f), "rb").read() for f in sorted(os.listdir(path)) if f.endswith(".ndjson")}
+
+
+@pytest.mark.parametrize("determinism", ["v1", "v2"])
+def test_two_phases_match_one_shot(tmp_path, fake_llm, determinism):
+    common = dict(num_patients=10, seed=11, locale_code="he_IL", determinism=determinism)
+    one_shot = generate_documents(output_dir=str(tmp_path / "a"), **common)
+    calls = fake_llm.calls
+    phase1 = generate_documents(output_dir=str(tmp_path / "b"), freetext_manifest=True, **common)
+    assert fake_llm.calls == calls
+    assert phase1 == one_shot
+    rows = list(iter_manifest(str(tmp_path / "b")))
+    assert len(rows) == sum(one_shot.values())
+    assert set(rows[0]) >= {"index", "doc", "patient_id", "facility_id", "doc_type", "contradiction", "source"}
+
+    fill_freetext(str(tmp_path / "b"))
+    assert apply_patches(str(tmp_path / "b")) == one_shot
+    assert _ndjson(tmp_path / "a") == _ndjson(tmp_path / "b")
+
+
+def test_parts_fill_independently(tmp_path, fake_llm):
+    common = dict(num_patients=9, seed=4, locale_code="ar_EG", determinism="v2")
+    generate_documents(output_dir=str(tmp_path / "a"), **common)
+    out = str(tmp_path / "b")
+    generate_documents(output_dir=out, freetext_manifest=True, **common)
+    for k in (3, 1):
+        fill_freetext(out, part=(k, 3))
+    with pytest.raises(ValueError, match="Incomplete"):
+        apply_patches(out)
+    fill_freetext(out, part=(2, 3))
+    apply_patches(out)
+    assert _ndjson(tmp_path / "a") == _ndjson(out)
+    assert not [f for f in os.listdir(out) if f.startswith("medsynth-patches-")]
+
+
+def test_v1_cannot_split(tmp_path):
+    out = str(tmp_path)
+    generate_documents(num_patients=2, seed=1, output_dir=out, freetext_manifest=True)
+    with pytest.raises(ValueError, match="v2"):
+        fill_freetext(out, part=(1, 2))
+
+
+def test_refill_with_other_model(tmp_path, monkeypatch):
+    def create(model, messages, **kwargs):
+        message = types.SimpleNamespace(content=f"[{model}]")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+    monkeypatch.setattr(freetext, "_get_client", lambda *a, **k: client)
+    out = str(tmp_path)
+    generate_documents(num_patients=3, seed=2, output_dir=out, locale_code="es_ES",
+                       determinism="v2", freetext_manifest=True)
+    texts = {}
+    for model in ("model-a", "model-b"):
+        fill_freetext(out, model=model)
+        apply_patches(out)
+        row = next(iter_manifest(out))
+        with open(os.path.join(out, f"{row['index']}.ndjson"), encoding="utf-8") as f:
+            texts[model] = json.loads(f.readline())
+    field = set(texts["model-a"]) - {k for k, v in texts["model-a"].items() if v == texts["model-b"][k]}
+    assert len(field) == 1
+    assert os.path.exists(os.path.join(out, MANIFEST_FILE))
+
+
+def test_manifest_rejects_other_modes(tmp_path):
+    with pytest.raises(ValueError, match="freetext_manifest"):
+        generate_documents(num_patients=2, seed=1, output_dir=str(tmp_path), freetext_manifest=True,
+                           skip_freetext=True)
+
+
+def test_cli_rejects_manifest_with_other_modes(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["medsynth", "--num-patients", "2", "--output-dir", str(tmp_path),
+                                      "--freetext-manifest", "--skip-freetext"])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 1
+    assert "Error: --freetext-manifest cannot be combined" in capsys.readouterr().err
+
+
+def test_fill_cli_text_pool_and_readonly_cache(tmp_path, fake_llm, monkeypatch):
+    common = dict(num_patients=12, seed=6, locale_code="es_MX")
+    generate_documents(output_dir=str(tmp_path / "a"), text_pool=TextPool(2, seed=6, fields=POOL_FIELDS), **common)
+    out = str(tmp_path / "b")
+    generate_documents(output_dir=out, freetext_manifest=True, **common)
+    cache = str(tmp_path / "cache.sqlite")
+    LlmCache(cache).close()
+
+    monkeypatch.setattr(sys, "argv", ["medsynth-fill", out, "--api-key", "x", "--text-pool", "2",
+                                      "--text-pool-fields", ",".join(POOL_FIELDS), "--llm-cache", cache,
+                                      "--llm-cache-readonly"])
+    slots = len(list(iter_manifest(out)))
+    calls = fake_llm.calls
+    fill.main()
+    assert fake_llm.calls - calls < slots  # pooled
+    assert _ndjson(tmp_path / "a") == _ndjson(out)
+    with LlmCache(cache) as c:
+        assert len(c) == 0
+
+
+def test_fill_cli_requires_api_key(tmp_path, monkeypatch, capsys):
+    for var in ("LLM_API_KEY", "OPENAI_API_KEY", "MOONSHOT_API_KEY", "LLM_API_BASE"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.chdir(tmp_path)  # no .env
+    monkeypatch.setattr(sys, "argv", ["medsynth-fill", str(tmp_path), "--api-base", "https://api.example.com/v1"])
+    with pytest.raises(SystemExit) as exc:
+        fill.main()
+    assert exc.value.code == 1
+    assert "Error: API key not set" in capsys.readouterr().err
@@ -0,0 +1,44 @@
+"""Tests for multi-process generation (--workers)."""
+
+import os
+import sys
+import pytest
+from medsynth.generate import generate_documents, main
+from medsynth.shards import split_range
+
+
+def _read(path):
+    return {f: open(os.path.join(path, f), "rb").read() for f in sorted(os.listdir(path))}
+
+
+def test_workers_match_single_process(tmp_path):
+    common = dict(num_patients=23, seed=42, locale_code="es_AR", skip_freetext=True, determinism="v2")
+    single = generate_documents(output_dir=str(tmp_path / "single"), **common)
+    multi = generate_documents(output_dir=str(tmp_path / "multi"), workers=2, **common)
+    assert multi == single
+    assert list(multi) == list(single)  # same first-appearance index order
+    assert _read(tmp_path / "single") == _read(tmp_path / "multi")
+
+
+def test_workers_require_v2(tmp_path):
+    with pytest.raises(ValueError, match="v2"):
+        generate_documents(
+            num_patients=5, seed=42, output_dir=str(tmp_path), skip_freetext=True, workers=2,
+        )
+
+
+@pytest.mark.parametrize("num_patients,num_chunks", [(10, 3), (2, 8), (100, 1), (0, 4)])
+def test_split_range_covers_range(num_patients, num_chunks):
+    chunks = split_range(num_patients, num_chunks)
+    covered = [i for start, stop in chunks for i in range(start, stop)]
+    assert covered == list(range(num_patients))
+    assert len(chunks) <= max(1, num_chunks)
+
+
+def test_cli_rejects_workers_without_v2(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["medsynth", "--skip-freetext", "--num-patients", "3",
+                                      "--output-dir", str(tmp_path), "--workers", "2"])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 1
+    assert "Error: --workers > 1 and --shard require --determinism v2" in capsys.readouterr().err